@@ -1,55 +1,107 @@
 """
 Examples package for Python Concurrency demonstrations.
 Contains various concurrency examples including deadlock, livelock, starvation, and threadpool.
-"""
 
-# Import from the deadlock package
-from .deadlock import (
-    DeadlockExample,
-    DeadlockFixResourceOrdering,
-    DeadlockFixTimeout,
-    DeadlockFixAsymmetricBehavior,
-    DeadlockFixWaiter,
-)
+Example classes are imported on first access, so importing this package (or
+examples.registry) does not pull in every example module.
+"""
 
-# Import from the livelock package
-from .livelock import LivelockExample, LivelockFixRandomBackoff, LivelockFixPriority
+from typing import TYPE_CHECKING
 
-# Import from the starvation package
-from .starvation import (
-    StarvationExample,
-    StarvationFixFairScheduling,
-    StarvationFixAging,
-)
+from .registry import lazy_attributes
 
-# Import from the threadpool package
-from .threadpool import (
-    ThreadPoolExample,
-    ThreadPoolPollingPeriodic,
-    ThreadPoolPollingAdaptive,
-    ThreadPoolPollingEventDriven,
-    ThreadPoolPollingBatch,
-)
+if TYPE_CHECKING:
+    from .deadlock import (  # noqa: F401
+        DeadlockExample,
+        DeadlockFixResourceOrdering,
+        DeadlockFixTimeout,
+        DeadlockFixAsymmetricBehavior,
+        DeadlockFixWaiter,
+        DeadlockFixWaiterPolling,
+        DeadlockFixChandyMisra,
+        DeadlockFixSemaphore,
+        DeadlockFixResourceOrderingProcess,
+        DeadlockFixTimeoutProcess,
+        DeadlockFixAsymmetricBehaviorProcess,
+        DeadlockFixSemaphoreProcess,
+        DeadlockFixResourceOrderingAsyncio,
+    )
+    from .livelock import (  # noqa: F401
+        LivelockExample,
+        LivelockFixRandomBackoff,
+        LivelockFixPriority,
+        LivelockFixArbiter,
+        LivelockFixRandomBackoffProcess,
+        LivelockFixRandomBackoffAsyncio,
+    )
+    from .starvation import (  # noqa: F401
+        StarvationExample,
+        StarvationFixFairScheduling,
+        StarvationFixFairSchedulingRace,
+        StarvationFixAging,
+        StarvationFixAgingSweep,
+        StarvationFixWeightedFair,
+        StarvationReadersWriters,
+        StarvationFixWriterPreference,
+        StarvationFixPhaseFair,
+        StarvationExampleProcess,
+        StarvationExampleAsyncio,
+    )
+    from .threadpool import (  # noqa: F401
+        ThreadPoolExample,
+        ThreadPoolPollingPeriodic,
+        ThreadPoolPollingAdaptive,
+        ThreadPoolPollingEventDriven,
+        ThreadPoolPollingBatch,
+        ThreadPoolPollingEventDrivenProcess,
+        ThreadPoolPollingEventDrivenAsyncio,
+    )
 
-__all__ = [
+# Exported class name -> subpackage that provides it
+_EXPORTS = {
     # Deadlock examples
-    "DeadlockExample",
-    "DeadlockFixResourceOrdering",
-    "DeadlockFixTimeout",
-    "DeadlockFixAsymmetricBehavior",
-    "DeadlockFixWaiter",
+    "DeadlockExample": ".deadlock",
+    "DeadlockFixResourceOrdering": ".deadlock",
+    "DeadlockFixTimeout": ".deadlock",
+    "DeadlockFixAsymmetricBehavior": ".deadlock",
+    "DeadlockFixWaiter": ".deadlock",
+    "DeadlockFixWaiterPolling": ".deadlock",
+    "DeadlockFixChandyMisra": ".deadlock",
+    "DeadlockFixSemaphore": ".deadlock",
+    "DeadlockFixResourceOrderingProcess": ".deadlock",
+    "DeadlockFixTimeoutProcess": ".deadlock",
+    "DeadlockFixAsymmetricBehaviorProcess": ".deadlock",
+    "DeadlockFixSemaphoreProcess": ".deadlock",
+    "DeadlockFixResourceOrderingAsyncio": ".deadlock",
     # Livelock examples
-    "LivelockExample",
-    "LivelockFixRandomBackoff",
-    "LivelockFixPriority",
+    "LivelockExample": ".livelock",
+    "LivelockFixRandomBackoff": ".livelock",
+    "LivelockFixPriority": ".livelock",
+    "LivelockFixArbiter": ".livelock",
+    "LivelockFixRandomBackoffProcess": ".livelock",
+    "LivelockFixRandomBackoffAsyncio": ".livelock",
     # Starvation examples
-    "StarvationExample",
-    "StarvationFixFairScheduling",
-    "StarvationFixAging",
+    "StarvationExample": ".starvation",
+    "StarvationFixFairScheduling": ".starvation",
+    "StarvationFixFairSchedulingRace": ".starvation",
+    "StarvationFixAging": ".starvation",
+    "StarvationFixAgingSweep": ".starvation",
+    "StarvationFixWeightedFair": ".starvation",
+    "StarvationReadersWriters": ".starvation",
+    "StarvationFixWriterPreference": ".starvation",
+    "StarvationFixPhaseFair": ".starvation",
+    "StarvationExampleProcess": ".starvation",
+    "StarvationExampleAsyncio": ".starvation",
     # ThreadPool examples
-    "ThreadPoolExample",
-    "ThreadPoolPollingPeriodic",
-    "ThreadPoolPollingAdaptive",
-    "ThreadPoolPollingEventDriven",
-    "ThreadPoolPollingBatch",
-]
+    "ThreadPoolExample": ".threadpool",
+    "ThreadPoolPollingPeriodic": ".threadpool",
+    "ThreadPoolPollingAdaptive": ".threadpool",
+    "ThreadPoolPollingEventDriven": ".threadpool",
+    "ThreadPoolPollingBatch": ".threadpool",
+    "ThreadPoolPollingEventDrivenProcess": ".threadpool",
+    "ThreadPoolPollingEventDrivenAsyncio": ".threadpool",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_attributes(__name__, _EXPORTS)
@@ -0,0 +1,5 @@
+"""
+Common package - Shared infrastructure used by the example families.
+Holds the measurement and benchmarking helpers; modules are imported directly
+(e.g. ``from examples.common.metrics import WorkMetrics``) to keep startup cheap.
+"""
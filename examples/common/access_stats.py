@@ -0,0 +1,129 @@
+"""
+Access Stats
+How long each worker waited for a shared resource and held it, and how
+long its worst starvation streak ran.
+
+Each worker records into its own WorkerAccess: a Histogram of acquire
+waits, one of hold times, and its longest streak. Every worker writes only
+its own record, so recording takes no lock. A wait starts when the worker
+first asks for the resource and ends when it gets it, across any timed-out
+attempts in between. A starvation streak is the number of times the
+resource went to somebody else while one worker waited. The grant counter
+is read and bumped only by the worker holding the resource, so it needs no
+lock of its own. Where several workers hold the resource at once, as the
+readers of a ReaderWriterLock do, the lock counts its own grants instead
+and AccessStats only reads the count.
+
+A process worker records into an AccessStats of its own, sharing the grant
+counter through SharedCounters, and sends its WorkerAccess back to the
+parent, which adds it with add(). report() prints p50/p90/p99/p99.9/max of
+the waits and holds per worker, with all workers merged, and the longest
+streak.
+"""
+
+from array import array
+from typing import Dict, List, Optional
+
+from .clock import get_clock
+from .histogram import Histogram, format_percentiles
+
+REPORT_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class WorkerAccess:
+    """One worker's waits for and holds of the resource, and its longest starvation streak."""
+
+    __slots__ = ("name", "wait", "hold", "longest_streak", "longest_streak_wait", "_asked_at", "_grants_then", "_acquired_at")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wait = Histogram()
+        self.hold = Histogram()
+        # Most grants to other workers during one wait, and how long that wait was
+        self.longest_streak = 0
+        self.longest_streak_wait = 0.0
+        self._asked_at: Optional[float] = None
+        self._grants_then = 0
+        self._acquired_at = 0.0
+
+
+class AccessStats:
+    """Per-worker acquire-wait and hold histograms for one shared resource."""
+
+    def __init__(self, clock=None, grants=None, lock_counts_grants: bool = False):
+        self.clock = clock if clock is not None else get_clock()
+        # Grants of the resource so far; SharedCounters(1) when workers are processes
+        self.grants = grants if grants is not None else array("q", [0])
+        # The lock bumps grants itself, including for the worker being recorded
+        self.lock_counts_grants = lock_counts_grants
+        self.workers: Dict[str, WorkerAccess] = {}
+
+    def worker(self, name: str) -> WorkerAccess:
+        """Return a new record for the worker called name; each worker thread takes one before it starts."""
+        access = self.workers[name] = WorkerAccess(name)
+        return access
+
+    def add(self, access: WorkerAccess):
+        """Add a record made elsewhere, e.g. by a worker process."""
+        self.workers[access.name] = access
+
+    def waiting(self, access: WorkerAccess):
+        """Mark that the worker has started asking for the resource, unless it already is."""
+        if access._asked_at is None:
+            access._asked_at = self.clock.time()
+            access._grants_then = self.grants[0]
+
+    def acquired(self, access: WorkerAccess) -> float:
+        """Record the end of the worker's wait; call holding the resource. Returns the seconds waited."""
+        now = self.clock.time()
+        waited = now - access._asked_at
+        access.wait.record(waited)
+        passed_over = self.grants[0] - access._grants_then
+        if self.lock_counts_grants:
+            passed_over -= 1
+        else:
+            self.grants[0] += 1
+        if passed_over > access.longest_streak:
+            access.longest_streak = passed_over
+            access.longest_streak_wait = waited
+        access._asked_at = None
+        access._acquired_at = now
+        return waited
+
+    def released(self, access: WorkerAccess) -> float:
+        """Record how long the worker held the resource; call just before releasing it. Returns the seconds held."""
+        held = self.clock.time() - access._acquired_at
+        access.hold.record(held)
+        return held
+
+    def longest_streak(self) -> Optional[WorkerAccess]:
+        """The worker passed over most times in a row, or None if nobody ever was."""
+        worst = max(self.workers.values(), key=lambda access: access.longest_streak, default=None)
+        return worst if worst is not None and worst.longest_streak else None
+
+    def report(self, limit: int = 20) -> str:
+        """Return the waits and holds per worker at p50/p90/p99/p99.9/max, and the longest starvation streak.
+
+        With more than limit workers only the limit with the longest waits
+        are listed; the "all" row always covers every worker.
+        """
+        shown: List[WorkerAccess] = list(self.workers.values())
+        if len(shown) > limit:
+            shown = sorted(shown, key=lambda access: access.wait.max, reverse=True)[:limit]
+        lines = []
+        for title, kind in (("Wait for the resource", "wait"), ("Time holding it", "hold")):
+            histograms = {access.name: getattr(access, kind) for access in shown}
+            histograms["all"] = Histogram.merged(getattr(access, kind) for access in self.workers.values())
+            lines.append(f"{title}:")
+            lines.append(format_percentiles(histograms, REPORT_PERCENTILES))
+        if len(self.workers) > limit:
+            lines.append(f"({len(self.workers) - limit} more workers not listed)")
+        worst = self.longest_streak()
+        if worst is None:
+            lines.append("Longest starvation streak: no worker was ever passed over")
+        else:
+            lines.append(
+                f"Longest starvation streak: {worst.name} was passed over {worst.longest_streak} times in a row, "
+                f"waiting {worst.longest_streak_wait:.3f}s"
+            )
+        return "\n".join(lines)
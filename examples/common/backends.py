@@ -0,0 +1,235 @@
+"""
+Backends
+Helpers shared by the process and asyncio implementations of the examples.
+
+The thread backend is the examples themselves. The process backend runs each
+worker in its own process with multiprocessing primitives; since workers can
+no longer record into the parent's WorkMetrics, each one keeps a local
+WorkMetrics and sends it back through a results queue when it stops, along
+with whatever its body returned (per-worker histograms, say). A
+process may also run a shard of several workers on threads, and publish
+live counts in SharedCounters, an array in shared memory that every process
+maps. The asyncio backend runs every worker as a task on one event loop.
+
+Neither backend can run on the VirtualClock: real processes and event loops
+keep wall-clock time. Latencies use time.perf_counter(), which on Linux is the
+system-wide monotonic clock and so comparable between processes.
+"""
+
+import asyncio
+import multiprocessing
+import queue
+import random
+import threading
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional
+
+from .clock import get_clock
+from .log import log
+from .metrics import WorkMetrics
+
+
+def require_real_clock(clock, backend: str):
+    """Return the clock to use, refusing the virtual clock for real processes or event loops."""
+    clock = clock if clock is not None else get_clock()
+    if clock.virtual:
+        raise ValueError(f"the {backend} backend runs in real time and cannot use the virtual clock")
+    return clock
+
+
+def process_worker(body: Callable, worker_key: Any, stop, results, log_level: int, seed: int, *args: Any):
+    """Entry point of a worker process: run body(worker_key, stop, metrics, *args) and report back its metrics and result.
+
+    body must be a module-level function so it can be pickled for the spawn
+    and forkserver start methods.
+    """
+    log.level = log_level
+    random.seed(seed)
+    metrics = WorkMetrics("")
+    result = None
+    try:
+        result = body(worker_key, stop, metrics, *args)
+    finally:
+        log.flush()
+        results.put((worker_key, metrics, result))
+
+
+class ProcessGroup:
+    """Worker processes that share a stop event and report their metrics on one queue."""
+
+    def __init__(self, context=None):
+        self.context = context if context is not None else multiprocessing.get_context()
+        self.stop = self.context.Event()
+        self.results = self.context.Queue()
+        self.processes: List[Any] = []
+
+    def start(self, body: Callable, worker_key: Any, *args: Any):
+        """Start one worker process running body."""
+        process = self.context.Process(
+            target=process_worker,
+            args=(body, worker_key, self.stop, self.results, log.level, random.getrandbits(32)) + args,
+            name=f"worker-{worker_key}",
+            daemon=True,
+        )
+        process.start()
+        self.processes.append(process)
+
+    def stop_and_collect(self, metrics: WorkMetrics, timeout: float = 5.0) -> Dict[Any, Any]:
+        """Stop every worker, merge the metrics they report into metrics and return their bodies' results by worker key."""
+        self.stop.set()
+
+        # Drain results before joining: a child cannot exit while its queue feeder is blocked
+        deadline = time.perf_counter() + timeout
+        returned = {}
+        for _ in self.processes:
+            try:
+                worker_key, reported, result = self.results.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            metrics.merge(reported)
+            returned[worker_key] = result
+
+        for process in self.processes:
+            process.join(timeout=1.0)
+            if process.is_alive():
+                # Still blocked in an acquire that will never succeed
+                process.terminate()
+                process.join()
+        return returned
+
+
+class SharedCounters:
+    """An array of int64 counters in shared memory, readable by every process while workers run.
+
+    The parent creates it; pickling it for a child process passes only the
+    block's name, and the child maps the same memory. Each counter must have
+    a single writer, as a += on shared memory is not atomic between
+    processes; readers may see it mid-run but never torn, since an aligned
+    8-byte store is a single write. The creator unlinks the block with
+    unlink(), every process closes its mapping with close().
+    """
+
+    def __init__(self, size: int, name: Optional[str] = None):
+        self.size = size
+        self.owner = name is None
+        self.memory = shared_memory.SharedMemory(name=name, create=self.owner, size=max(8, 8 * size))
+        buffer = self.memory.buf
+        if buffer is None:
+            raise RuntimeError(f"shared memory block {self.memory.name} is closed")
+        # The block may be rounded up to whole pages; view exactly size counters
+        self.counts = buffer[: 8 * size].cast("q")
+        if self.owner:
+            self.counts[:] = array("q", bytes(8 * size))  # fresh blocks are zeroed on Linux, not everywhere
+
+    def __reduce__(self):
+        return (SharedCounters, (self.size, self.memory.name))
+
+    def increment(self, index: int, n: int = 1):
+        self.counts[index] += n
+
+    def __getitem__(self, index: int) -> int:
+        return self.counts[index]
+
+    def __setitem__(self, index: int, value: int):
+        self.counts[index] = value
+
+    def __len__(self) -> int:
+        return self.size
+
+    def tolist(self) -> List[int]:
+        return self.counts.tolist()
+
+    def close(self):
+        """Unmap the block from this process; the counters cannot be used afterwards."""
+        self.counts.release()
+        self.memory.close()
+
+    def unlink(self):
+        """Close, and free the block once every process has closed it. Only the creator should call this."""
+        self.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def shard(count: int, parts: int) -> List[range]:
+    """Split range(count) into parts contiguous ranges whose sizes differ by at most one."""
+    parts = max(1, min(parts, count)) if count else 1
+    size, extra = divmod(count, parts)
+    bounds = [i * size + min(i, extra) for i in range(parts + 1)]
+    return [range(bounds[i], bounds[i + 1]) for i in range(parts)]
+
+
+def _hammer(lock, iterations: int, start, finished):
+    """Acquire and release lock iterations times once start is set, then put the finish time on finished."""
+    start.wait()
+    for _ in range(iterations):
+        lock.acquire()
+        lock.release()
+    finished.put(time.perf_counter())
+
+
+def measure_lock_overhead(iterations: int = 20000, contenders: int = 2) -> Dict[str, float]:
+    """Return the mean cost in ns of an acquire/release pair of threading and multiprocessing locks.
+
+    "uncontended" takes the lock from one thread, best of five runs.
+    "threads" and "processes" have contenders threads or processes taking
+    one lock iterations times each; the cost is their total time over every
+    acquisition, including the hand-offs between them.
+    """
+    results = {}
+    for name, lock in (("threading.Lock", threading.Lock()), ("multiprocessing.Lock", multiprocessing.Lock())):
+        best = float("inf")
+        for _ in range(5):  # best of five, so warm-up and scheduling noise do not decide the order
+            started = time.perf_counter()
+            for _ in range(iterations):
+                lock.acquire()
+                lock.release()
+            best = min(best, time.perf_counter() - started)
+        results[f"{name} uncontended"] = best / iterations * 1e9
+
+    for kind in ("threads", "processes"):
+        workers: List[Any]
+        if kind == "threads":
+            lock, start, finished = threading.Lock(), threading.Event(), queue.Queue()
+            workers = [threading.Thread(target=_hammer, args=(lock, iterations, start, finished)) for _ in range(contenders)]
+        else:
+            lock, start, finished = multiprocessing.Lock(), multiprocessing.Event(), multiprocessing.Queue()
+            workers = [multiprocessing.Process(target=_hammer, args=(lock, iterations, start, finished)) for _ in range(contenders)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.1)  # let every process reach start.wait()
+        started = time.perf_counter()
+        start.set()
+        last = max(finished.get() for _ in workers)
+        for worker in workers:
+            worker.join()
+        results[f"{contenders} contending {kind}"] = (last - started) / (iterations * contenders) * 1e9
+    return results
+
+
+async def acquire_async(lock: asyncio.Lock, timeout: float) -> bool:
+    """Acquire an asyncio lock with a timeout, like threading.Lock.acquire(timeout=...)."""
+    try:
+        await asyncio.wait_for(lock.acquire(), timeout)
+        return True
+    except asyncio.TimeoutError:
+        return False
+
+
+async def run_tasks(coroutines: List[Any], duration: float, stop: asyncio.Event):
+    """Run worker coroutines for duration seconds, then set stop and wait for them to finish."""
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    await asyncio.sleep(duration)
+    stop.set()
+
+    done, pending = await asyncio.wait(tasks, timeout=1.0)
+    for task in pending:
+        # Blocked on a lock that will never be released
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+    for task in done:
+        if not task.cancelled() and task.exception() is not None:
+            raise task.exception()
@@ -0,0 +1,351 @@
+"""
+Benchmark Runner
+Runs examples with their narration suppressed and fixed seeds, repeats each
+run, and reports throughput (mean/stddev) and pooled latency percentiles as
+JSON. Results can be compared against a saved baseline to catch regressions.
+"""
+
+import contextlib
+import os
+import platform
+import random
+import statistics
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..registry import create_example, has_backend, load_example
+from .clock import make_clock
+from .histogram import Histogram
+from .instrument import InstrumentedClock
+from .log import OFF, log
+from .metrics import WorkMetrics, percentile
+
+
+def run_example(
+    name: str,
+    duration: float,
+    seed: int,
+    clock_kind: str = "real",
+    backend: str = "thread",
+    instrument_locks: bool = False,
+    **options: Any,
+) -> Tuple[Any, float]:
+    """Run one example quietly and return the example itself and the elapsed time on its clock.
+
+    Extra keyword options (num_workers, batch_size, ...) are passed to the
+    constructor when it accepts them. instrument_locks runs the example with
+    InstrumentedLock, to measure its overhead under load. For reports that
+    need more than the metrics, e.g. an example's AccessStats.
+    """
+    random.seed(seed)
+    example_class = load_example(name, backend)
+    clock = make_clock(clock_kind, seed=seed)
+    if instrument_locks:
+        clock = InstrumentedClock(clock)
+    level, log.level = log.level, OFF
+
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            example = create_example(example_class, clock=clock, **options)
+            started = clock.time()
+            example.run(duration)
+            elapsed = clock.time() - started
+    finally:
+        log.level = level
+        if clock.virtual:
+            clock.close()
+
+    return example, elapsed
+
+
+def run_once(
+    name: str,
+    duration: float,
+    seed: int,
+    clock_kind: str = "real",
+    backend: str = "thread",
+    instrument_locks: bool = False,
+    **options: Any,
+) -> Tuple[Optional[WorkMetrics], float]:
+    """Run one example quietly and return its metrics and elapsed time on its clock, as run_example() does."""
+    example, elapsed = run_example(name, duration, seed, clock_kind, backend, instrument_locks, **options)
+    metrics = getattr(example, "metrics", None)
+    if metrics is not None and metrics.num_workers is None:
+        metrics.num_workers = getattr(example, "num_philosophers", None) or getattr(example, "num_workers", None)
+    return metrics, elapsed
+
+
+def bench_example(
+    name: str,
+    duration: float,
+    repeat: int,
+    seed: int,
+    clock_kind: str = "real",
+    backend: str = "thread",
+    instrument_locks: bool = False,
+    **options: Any,
+) -> dict:
+    """Run an example repeat times and aggregate throughput and latency."""
+    throughputs: List[float] = []
+    fairness: List[float] = []
+    event_rates: Dict[str, List[float]] = {}
+    per_worker: Dict[str, int] = {}
+    num_workers = 0
+    latencies: List[float] = []
+    # Pooled buckets of runs whose metrics keep a Histogram instead of samples
+    histogram: Optional[Histogram] = None
+    unit = None
+    errors = []
+
+    for run in range(repeat):
+        try:
+            metrics, elapsed = run_once(name, duration, seed + run, clock_kind, backend, instrument_locks, **options)
+        except Exception as e:
+            errors.append(f"run {run + 1}: {e!r}")
+            print(f"  {name} run {run + 1}/{repeat}: error {e!r}", file=sys.stderr)
+            continue
+
+        if metrics is None:
+            errors.append(f"run {run + 1}: example has no metrics attribute")
+            continue
+
+        unit = metrics.unit
+        throughputs.append(metrics.count / elapsed)
+        fairness.append(metrics.fairness())
+        for event in metrics.events:
+            event_rates.setdefault(event, []).append(metrics.event_count(event) / elapsed)
+        for worker, count in metrics.per_worker.items():
+            per_worker[str(worker)] = per_worker.get(str(worker), 0) + count
+        num_workers = max(num_workers, metrics.num_workers or 0, len(metrics.per_worker))
+        if metrics.histogram is not None:
+            histogram = (histogram or Histogram()).merge(metrics.histogram)
+        else:
+            latencies.extend(metrics.latencies)
+        print(f"  {name} run {run + 1}/{repeat}: {throughputs[-1]:.2f} {unit}/s", file=sys.stderr)
+
+    if histogram is not None:
+        # Any samples from other runs go into the buckets too, at the histogram's precision
+        for latency in latencies:
+            histogram.record(latency)
+        latency_summary = {q: histogram.summary()[q] for q in ("p50", "p90", "p99", "max")}
+        samples = histogram.count
+    else:
+        latencies.sort()
+        latency_summary = {
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        }
+        samples = len(latencies)
+    result = {
+        "unit": unit,
+        "runs": throughputs,
+        "throughput": {
+            "mean": statistics.mean(throughputs) if throughputs else 0.0,
+            "stddev": statistics.stdev(throughputs) if len(throughputs) > 1 else 0.0,
+        },
+        "latency": latency_summary,
+        "samples": samples,
+        "fairness": statistics.mean(fairness) if fairness else 0.0,
+        # Units of work per worker, summed over runs; workers that never finished one are missing
+        "workers": num_workers,
+        "per_worker": per_worker,
+    }
+    if event_rates:
+        # Per second, mean of the runs; a run that never saw an event counts as zero
+        result["events"] = {event: sum(rates) / len(throughputs) for event, rates in event_rates.items()}
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+def result_key(name: str, backend: str) -> str:
+    """Key of an example's results in the report; thread results keep the plain name."""
+    return name if backend == "thread" else f"{name}@{backend}"
+
+
+def run_benchmarks(
+    names: Iterable[str],
+    duration: float,
+    repeat: int,
+    seed: int,
+    clock_kind: str = "real",
+    backends: Sequence[str] = ("thread",),
+    instrument_locks: bool = False,
+    **options: Any,
+) -> dict:
+    """Benchmark every named example on each backend and return the JSON-ready report.
+
+    With more than one backend the report also has a "backends" section giving
+    the mean throughput of each example per backend, for a side-by-side view.
+    """
+    results: Dict[str, dict] = {}
+    comparison: Dict[str, Dict[str, float]] = {}
+    for name in names:
+        for backend in backends:
+            if not has_backend(name, backend):
+                print(f"Skipping {name}: no {backend} backend", file=sys.stderr)
+                continue
+            key = result_key(name, backend)
+            print(f"Benchmarking {key}...", file=sys.stderr)
+            results[key] = bench_example(name, duration, repeat, seed, clock_kind, backend, instrument_locks, **options)
+            comparison.setdefault(name, {})[backend] = results[key]["throughput"]["mean"]
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration": duration,
+            "repeat": repeat,
+            "seed": seed,
+            "clock": clock_kind,
+            "backends": list(backends),
+            "instrument_locks": instrument_locks,
+            "options": options,
+        },
+        "results": results,
+    }
+    if len(backends) > 1:
+        report["backends"] = {name: by_backend for name, by_backend in comparison.items() if len(by_backend) > 1}
+    return report
+
+
+def format_backends(comparison: Dict[str, Dict[str, float]], backends: Sequence[str]) -> str:
+    """Render the per-backend throughput of each example as a table."""
+    width = max((len(name) for name in comparison), default=7)
+    lines = [f"{'example':<{width}}" + "".join(f"  {backend:>10}" for backend in backends)]
+    for name, by_backend in comparison.items():
+        cells = "".join(f"  {by_backend[b]:>8.2f}/s" if b in by_backend else f"  {'-':>10}" for b in backends)
+        lines.append(f"{name:<{width}}{cells}")
+    return "\n".join(lines)
+
+
+def format_results(results: Dict[str, dict]) -> str:
+    """Render benchmark results as one row per example: throughput, fairness, work per worker and max wait."""
+    width = max([len("example")] + [len(name) for name in results])
+    lines = [
+        f"{'example':<{width}}  {'throughput':>12}  {'fairness':>8}  {'min/worker':>10}  {'mean/worker':>11}  "
+        f"{'max/worker':>10}  {'p99 wait':>9}  {'max wait':>9}"
+    ]
+    unit = None
+    for name, result in results.items():
+        unit = unit or result["unit"]
+        counts = list(result["per_worker"].values())
+        workers = max(result["workers"], len(counts))
+        # A worker that never finished anything is not in per_worker, and is the minimum
+        least = min(counts) if counts and len(counts) >= workers else 0
+        mean = sum(counts) / workers if workers else 0.0
+        lines.append(
+            f"{name:<{width}}  {result['throughput']['mean']:>10.2f}/s  {result['fairness']:>8.3f}  {least:>10}  {mean:>11.1f}  "
+            f"{max(counts, default=0):>10}  {result['latency']['p99']:>8.3f}s  {result['latency']['max']:>8.3f}s"
+        )
+    if unit:
+        lines.append(f"(throughput in {unit} per second, mean of runs; {unit} per worker summed over runs; Jain's fairness index)")
+    return "\n".join(lines)
+
+
+def run_sweep(
+    name: str,
+    option: str,
+    values: Sequence[int],
+    duration: float,
+    seed: int,
+    clock_kind: str = "real",
+    backend: str = "thread",
+    **options: Any,
+) -> List[dict]:
+    """Run an example once per value of one constructor option and return a row per value."""
+    rows = []
+    for value in values:
+        print(f"Sweeping {name} {option}={value}...", file=sys.stderr)
+        metrics, elapsed = run_once(name, duration, seed, clock_kind, backend, **{**options, option: value})
+        if metrics is None:
+            raise ValueError(f"example {name!r} has no metrics attribute")
+        summary = metrics.summary(elapsed)
+        rows.append(
+            {"value": value, "unit": summary["unit"], "count": summary["count"], "throughput": summary["throughput"], "latency": summary["latency"]}
+        )
+    return rows
+
+
+def run_benchmark_sweep(
+    names: Sequence[str],
+    option: str,
+    values: Sequence[int],
+    duration: float,
+    repeat: int,
+    seed: int,
+    clock_kind: str = "real",
+    backend: str = "thread",
+    **options: Any,
+) -> dict:
+    """Benchmark every named example at each value of one constructor option and return the JSON-ready report."""
+    results: Dict[str, Dict[str, dict]] = {}
+    for value in values:
+        for name in names:
+            print(f"Benchmarking {name} {option}={value}...", file=sys.stderr)
+            results.setdefault(str(value), {})[name] = bench_example(name, duration, repeat, seed, clock_kind, backend, **{**options, option: value})
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration": duration,
+            "repeat": repeat,
+            "seed": seed,
+            "clock": clock_kind,
+            "backends": [backend],
+            "options": options,
+        },
+        "sweep": {"option": option, "values": list(values), "results": results},
+    }
+
+
+def format_sweep_comparison(sweep: dict, label: str) -> str:
+    """Render a benchmark sweep as one row per value and example: mean throughput and wait percentiles."""
+    names = [name for by_name in sweep["results"].values() for name in by_name]
+    width = max([len("example")] + [len(name) for name in names])
+    lines = [f"{label:>12}  {'example':<{width}}  {'throughput':>12}  {'p50':>9}  {'p99':>9}  {'max':>9}  {'fairness':>8}"]
+    unit = None
+    for value, by_name in sweep["results"].items():
+        for name, result in by_name.items():
+            unit = unit or result["unit"]
+            latency = result["latency"]
+            lines.append(
+                f"{value:>12}  {name:<{width}}  {result['throughput']['mean']:>10.2f}/s  "
+                f"{latency['p50']:>8.3f}s  {latency['p99']:>8.3f}s  {latency['max']:>8.3f}s  {result['fairness']:>8.3f}"
+            )
+    if unit:
+        lines.append(f"(throughput in {unit} per second, mean of runs; latency percentiles pooled over runs; Jain's fairness index)")
+    return "\n".join(lines)
+
+
+def format_sweep(rows: List[dict], label: str, width: int = 40) -> str:
+    """Render sweep rows as a table with a bar per row, giving a throughput-vs-concurrency curve."""
+    peak = max((row["throughput"] for row in rows), default=0.0) or 1.0
+    lines = [f"{label:>10}  {'throughput':>12}  {'p50':>9}  {'p99':>9}", "-" * (48 + width)]
+    for row in rows:
+        bar = "#" * round(width * row["throughput"] / peak)
+        lines.append(f"{row['value']:>10}  {row['throughput']:>10.2f}/s  {row['latency']['p50']:>8.3f}s  {row['latency']['p99']:>8.3f}s  {bar}")
+    if rows:
+        lines.append(f"(throughput in {rows[0]['unit']} per second)")
+    return "\n".join(lines)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Return examples whose mean throughput dropped more than threshold (a fraction) below baseline."""
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+
+        base_mean = base["throughput"]["mean"]
+        mean = result["throughput"]["mean"]
+        if base_mean <= 0:
+            continue
+
+        change = (mean - base_mean) / base_mean
+        if change < -threshold:
+            regressions.append({"example": name, "baseline": base_mean, "current": mean, "change": change})
+    return regressions
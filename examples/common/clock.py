@@ -0,0 +1,719 @@
+"""
+Clock
+Pluggable time source and synchronization primitives for the examples.
+
+RealClock (the default) sleeps in wall-clock time and hands out the ordinary
+threading, queue and concurrent.futures primitives.
+
+VirtualClock is a deterministic discrete-event simulator. Example threads still
+run on OS threads, but only one of them runs at a time: sleeping or waiting on a
+clock primitive hands control to the next runnable thread, and when every thread
+is waiting the clock jumps straight to the earliest pending wake-up. Runs take
+as long as the work in between the waits, not as long as the waits themselves,
+and the interleaving (and therefore the output) is the same on every run.
+
+Examples take the clock as a constructor argument and create their locks,
+threads and queues through it:
+
+    with VirtualClock() as clock:
+        DeadlockFixWaiter(clock=clock).run(3600)
+
+Two knobs keep the simulation close to real scheduling:
+- jitter: threads that sleep for the same time would otherwise wake in perfect
+  lockstep, which real schedulers never manage (DeadlockFixTimeout, for one,
+  would retry in step forever). Each virtual sleep is stretched by a random
+  fraction of up to jitter, drawn from the clock's own seeded generator.
+- resolution: wake-ups are rounded up to this timer granularity, so threads
+  that wake at nearly the same time run at the same instant and interleave at
+  every lock acquisition, the way racing threads do.
+Set both to 0 for exact, lockstep timing.
+
+Limitations of the virtual backend: there is no preemption, so a thread that
+loops without sleeping or waiting keeps control forever; Condition uses a plain
+(non-reentrant) lock by default; and queues are unbounded.
+"""
+
+import collections
+import concurrent.futures
+import heapq
+import itertools
+import math
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional
+
+
+class RealClock:
+    """Wall-clock time and the standard threading primitives."""
+
+    virtual = False
+
+    def time(self) -> float:
+        """Return a monotonic timestamp in seconds."""
+        return time.perf_counter()
+
+    def sleep(self, seconds: float):
+        """Sleep for the given number of seconds."""
+        time.sleep(seconds)
+
+    def Lock(self, name: Optional[str] = None):
+        # name identifies the lock in diagnostics (see examples.common.instrument)
+        return threading.Lock()
+
+    def Event(self):
+        return threading.Event()
+
+    def Condition(self, lock=None):
+        return threading.Condition(lock)
+
+    def Semaphore(self, value: int = 1):
+        return threading.Semaphore(value)
+
+    def Queue(self):
+        return queue.Queue()
+
+    def Thread(self, target: Callable, args: tuple = (), name: Optional[str] = None, daemon: bool = True):
+        return threading.Thread(target=target, args=args, name=name, daemon=daemon)
+
+    def Executor(self, max_workers: int):
+        return concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+
+    def as_completed(self, futures: Iterable, timeout: Optional[float] = None) -> Iterator:
+        return concurrent.futures.as_completed(futures, timeout=timeout)
+
+
+_default_clock: Any = RealClock()
+
+
+def get_clock():
+    """Return the clock used by examples that are not given one explicitly."""
+    return _default_clock
+
+
+def set_clock(clock):
+    """Replace the default clock and return the previous one."""
+    global _default_clock
+    previous, _default_clock = _default_clock, clock
+    return previous
+
+
+def make_clock(kind: str = "real", seed: int = 0):
+    """Create a clock by name: "real" or "virtual"."""
+    if kind == "real":
+        return RealClock()
+    if kind == "virtual":
+        return VirtualClock(seed=seed)
+    raise ValueError(f"Unknown clock {kind!r}, expected 'real' or 'virtual'")
+
+
+class ClockClosed(BaseException):
+    """Raised inside virtual threads that are still parked when their clock is closed."""
+
+
+class VirtualDeadlockError(RuntimeError):
+    """Raised when every virtual thread is waiting and no timeout is pending."""
+
+
+class _Participant:
+    """A thread taking part in a virtual clock's schedule."""
+
+    __slots__ = ("name", "resume", "timer", "blocked", "woken")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.resume = threading.Event()
+        self.timer: Optional[list] = None  # pending [wake_at, seq, participant] heap entry
+        self.blocked = False
+        self.woken = False
+
+
+class VirtualClock:
+    """Deterministic discrete-event clock; see the module docstring."""
+
+    virtual = True
+
+    def __init__(self, start: float = 0.0, jitter: float = 0.01, resolution: float = 0.0001, seed: int = 0):
+        self._now = start
+        self._jitter = jitter
+        self._resolution = resolution
+        self._random = random.Random(seed)
+        self._mutex = threading.Lock()
+        self._timers: List[list] = []
+        self._seq = itertools.count()
+        self._runnable: Deque[_Participant] = collections.deque()
+        self._running: Optional[_Participant] = None
+        self._participants: List[_Participant] = []
+        self._local = threading.local()
+        self._closed = False
+        self.switches = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def time(self) -> float:
+        """Return the current virtual time in seconds."""
+        return self._now
+
+    def sleep(self, seconds: float):
+        """Suspend the calling thread for seconds of virtual time."""
+        me = self._current()
+        if seconds > 0:
+            if self._jitter:
+                seconds *= 1.0 + self._jitter * self._random.random()
+            self._block(me, seconds)
+        else:
+            self._yield(me)
+
+    def Lock(self, name: Optional[str] = None):
+        return _VirtualLock(self)
+
+    def Event(self):
+        return _VirtualEvent(self)
+
+    def Condition(self, lock=None):
+        return _VirtualCondition(self, lock)
+
+    def Semaphore(self, value: int = 1):
+        return _VirtualSemaphore(self, value)
+
+    def Queue(self):
+        return _VirtualQueue(self)
+
+    def Thread(self, target: Callable, args: tuple = (), name: Optional[str] = None, daemon: bool = True):
+        return VirtualThread(self, target, args, name, daemon)
+
+    def Executor(self, max_workers: int):
+        return VirtualExecutor(self, max_workers)
+
+    def as_completed(self, futures: Iterable, timeout: Optional[float] = None) -> Iterator:
+        """Yield futures as they finish, like concurrent.futures.as_completed."""
+        pending = list(dict.fromkeys(futures))
+        total = len(pending)
+        deadline = None if timeout is None else self._now + timeout
+        signal = self.Event()
+        for future in pending:
+            future.add_done_callback(lambda _: signal.set())
+
+        while pending:
+            signal.clear()
+            finished = [future for future in pending if future.done()]
+            if finished:
+                for future in finished:
+                    pending.remove(future)
+                    yield future
+                continue
+
+            remaining = None if deadline is None else deadline - self._now
+            if (remaining is not None and remaining <= 0) or not signal.wait(remaining):
+                raise concurrent.futures.TimeoutError(f"{len(pending)} (of {total}) futures unfinished")
+
+    def close(self):
+        """Stop the clock, making threads still parked in it exit with ClockClosed."""
+        with self._mutex:
+            if self._closed:
+                return
+            self._closed = True
+            me = getattr(self._local, "participant", None)
+            parked = [p for p in self._participants if p is not me]
+        for participant in parked:
+            participant.resume.set()
+
+    # Scheduler. Only the running participant calls these, apart from the
+    # registration of threads that are new to the clock.
+
+    def _current(self) -> _Participant:
+        """Return the calling thread's participant, registering the thread on first use."""
+        me = getattr(self._local, "participant", None)
+        if me is not None:
+            return me
+
+        me = _Participant(threading.current_thread().name)
+        self._local.participant = me
+        with self._mutex:
+            self._check_open()
+            self._participants.append(me)
+            if self._running is None:
+                self._running = me
+                return me
+            self._runnable.append(me)
+        self._park(me)
+        return me
+
+    def _check_open(self):
+        if self._closed:
+            raise RuntimeError("virtual clock is closed")
+
+    def _park(self, me: _Participant):
+        """Wait until the scheduler hands control to me."""
+        me.resume.wait()
+        me.resume.clear()
+        if self._closed:
+            raise ClockClosed()
+
+    def _next(self) -> Optional[_Participant]:
+        """Pop the next runnable participant, advancing time if nothing is runnable."""
+        if not self._runnable:
+            self._advance()
+        return self._runnable.popleft() if self._runnable else None
+
+    def _advance(self):
+        """Jump to the earliest pending timeout and make every participant due then runnable."""
+        timers = self._timers
+        while timers and timers[0][2] is None:
+            heapq.heappop(timers)
+        if not timers:
+            return
+
+        wake_at = timers[0][0]
+        self._now = max(self._now, wake_at)
+        while timers and timers[0][0] <= wake_at:
+            participant = heapq.heappop(timers)[2]
+            if participant is not None:
+                participant.timer = None
+                participant.blocked = False
+                participant.woken = False
+                self._runnable.append(participant)
+
+    def _switch(self, me: _Participant):
+        """Hand control to the next runnable participant and park until rescheduled."""
+        with self._mutex:
+            if self._closed:
+                raise ClockClosed()
+            nxt = self._next()
+            if nxt is None:
+                raise VirtualDeadlockError(f"every virtual thread is waiting and no timeout is pending (last: {me.name})")
+            self._running = nxt
+            if nxt is me:
+                return
+            self.switches += 1
+            nxt.resume.set()
+        self._park(me)
+
+    def _block(self, me: _Participant, timeout: Optional[float]) -> bool:
+        """Suspend me until another participant wakes it (True) or timeout expires (False)."""
+        if timeout is not None:
+            if timeout <= 0:
+                return False
+            wake_at = self._now + timeout
+            if self._resolution:
+                wake_at = math.ceil(wake_at / self._resolution - 1e-9) * self._resolution
+                # A positive timeout always lets time move on, or deadline loops would spin
+                if wake_at <= self._now:
+                    wake_at = self._now + self._resolution
+            with self._mutex:
+                entry = [wake_at, next(self._seq), me]
+                heapq.heappush(self._timers, entry)
+                me.timer = entry
+        me.blocked = True
+        me.woken = False
+        self._switch(me)
+        return me.woken
+
+    def _wake(self, participant: _Participant) -> bool:
+        """Make a blocked participant runnable, cancelling its timeout.
+
+        Returns False if the participant's timeout already fired; it is then
+        runnable and will notice the timeout itself.
+        """
+        with self._mutex:
+            if not participant.blocked:
+                return False
+            if participant.timer is not None:
+                participant.timer[2] = None
+                participant.timer = None
+            participant.blocked = False
+            participant.woken = True
+            self._runnable.append(participant)
+            return True
+
+    def _yield(self, me: _Participant):
+        """Let other participants that are runnable at this instant go first."""
+        with self._mutex:
+            if not self._runnable:
+                return
+            self._runnable.append(me)
+        self._switch(me)
+
+    def _exit(self, me: _Participant):
+        """Remove a finished participant and hand control to the next one."""
+        with self._mutex:
+            self._participants.remove(me)
+            nxt = self._next()
+            self._running = nxt
+            if nxt is not None:
+                self.switches += 1
+                nxt.resume.set()
+
+
+class _WaitList:
+    """FIFO of participants blocked on a virtual primitive."""
+
+    __slots__ = ("clock", "waiters")
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.waiters: Deque[_Participant] = collections.deque()
+
+    def wait(self, me: _Participant, timeout: Optional[float]) -> bool:
+        self.waiters.append(me)
+        woken = self.clock._block(me, timeout)
+        if not woken and me in self.waiters:
+            self.waiters.remove(me)
+        return woken
+
+    def notify(self, n: int = 1) -> int:
+        """Wake up to n waiters, skipping any whose timeout has already fired."""
+        woken = 0
+        while self.waiters and woken < n:
+            if self.clock._wake(self.waiters.popleft()):
+                woken += 1
+        return woken
+
+    def __len__(self) -> int:
+        return len(self.waiters)
+
+
+def _timeout(blocking: bool, timeout: float) -> Optional[float]:
+    """Convert threading-style (blocking, timeout) arguments to a timeout or None."""
+    if not blocking:
+        return 0.0
+    return None if timeout is None or timeout < 0 else timeout
+
+
+class _VirtualLock:
+    """Virtual-time counterpart of threading.Lock, handing off to waiters in FIFO order."""
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._locked = False
+        self._waiters = _WaitList(clock)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        me = self._clock._current()
+        # Every acquisition is a scheduling point, so threads that become
+        # runnable together interleave between their acquisitions
+        self._clock._yield(me)
+        if not self._locked:
+            self._locked = True
+            return True
+        # release() hands the lock straight to the woken waiter
+        return self._waiters.wait(me, _timeout(blocking, timeout))
+
+    def release(self):
+        if not self._locked:
+            raise RuntimeError("release unlocked lock")
+        if not self._waiters.notify():
+            self._locked = False
+
+    def locked(self) -> bool:
+        return self._locked
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class _VirtualSemaphore:
+    """Virtual-time counterpart of threading.Semaphore."""
+
+    def __init__(self, clock: VirtualClock, value: int = 1):
+        if value < 0:
+            raise ValueError("semaphore initial value must be >= 0")
+        self._clock = clock
+        self._value = value
+        self._waiters = _WaitList(clock)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        me = self._clock._current()
+        self._clock._yield(me)
+        if self._value > 0:
+            self._value -= 1
+            return True
+        return self._waiters.wait(me, _timeout(blocking, timeout))
+
+    def release(self, n: int = 1):
+        for _ in range(n):
+            if not self._waiters.notify():
+                self._value += 1
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class _VirtualEvent:
+    """Virtual-time counterpart of threading.Event."""
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._flag = False
+        self._waiters = _WaitList(clock)
+
+    def is_set(self) -> bool:
+        return self._flag
+
+    def set(self):
+        self._flag = True
+        self._waiters.notify(len(self._waiters))
+
+    def clear(self):
+        self._flag = False
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        if self._flag:
+            return True
+        self._waiters.wait(self._clock._current(), timeout)
+        return self._flag
+
+
+class _VirtualCondition:
+    """Virtual-time counterpart of threading.Condition."""
+
+    def __init__(self, clock: VirtualClock, lock=None):
+        self._clock = clock
+        self._lock = lock if lock is not None else _VirtualLock(clock)
+        self._waiters = _WaitList(clock)
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        return self._lock.acquire(blocking, timeout)
+
+    def release(self):
+        self._lock.release()
+
+    def __enter__(self):
+        self._lock.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._lock.release()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        me = self._clock._current()
+        self._lock.release()
+        try:
+            return self._waiters.wait(me, timeout)
+        finally:
+            self._lock.acquire()
+
+    def wait_for(self, predicate: Callable[[], Any], timeout: Optional[float] = None):
+        deadline = None if timeout is None else self._clock.time() + timeout
+        result = predicate()
+        while not result:
+            remaining = None if deadline is None else deadline - self._clock.time()
+            if remaining is not None and remaining <= 0:
+                break
+            woken = self.wait(remaining)
+            result = predicate()
+            if not woken:
+                break
+        return result
+
+    def notify(self, n: int = 1):
+        self._waiters.notify(n)
+
+    def notify_all(self):
+        self._waiters.notify(len(self._waiters))
+
+
+class _VirtualQueue:
+    """Virtual-time counterpart of an unbounded queue.Queue."""
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._items: Deque[Any] = collections.deque()
+        self._getters = _WaitList(clock)
+        self._unfinished = 0
+        self._all_done = _VirtualEvent(clock)
+        self._all_done.set()
+
+    def put(self, item: Any, block: bool = True, timeout: Optional[float] = None):
+        self._items.append(item)
+        self._unfinished += 1
+        self._all_done.clear()
+        self._getters.notify()
+
+    def put_nowait(self, item: Any):
+        self.put(item)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        clock = self._clock
+        deadline = None if timeout is None else clock.time() + timeout
+        while not self._items:
+            remaining = None if deadline is None else deadline - clock.time()
+            if not block or (remaining is not None and remaining <= 0):
+                raise queue.Empty
+            # A wake-up can be stolen by another getter, but a timeout is final
+            if not self._getters.wait(clock._current(), remaining) and not self._items:
+                raise queue.Empty
+        return self._items.popleft()
+
+    def get_nowait(self) -> Any:
+        return self.get(block=False)
+
+    def task_done(self):
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._all_done.set()
+
+    def join(self):
+        self._all_done.wait()
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+
+class VirtualThread:
+    """Thread whose execution is scheduled by a VirtualClock."""
+
+    _counter = itertools.count(1)
+
+    def __init__(self, clock: VirtualClock, target: Callable, args: tuple = (), name: Optional[str] = None, daemon: bool = True):
+        self.name = name or f"VirtualThread-{next(self._counter)}"
+        # Kept for API compatibility; the underlying OS threads are always daemons
+        self.daemon = daemon
+        self._clock = clock
+        self._target = target
+        self._args = args
+        self._done = _VirtualEvent(clock)
+        self._started = False
+
+    def start(self):
+        if self._started:
+            raise RuntimeError("threads can only be started once")
+        self._started = True
+
+        clock = self._clock
+        me = _Participant(self.name)
+        with clock._mutex:
+            clock._check_open()
+            clock._participants.append(me)
+            clock._runnable.append(me)
+        threading.Thread(target=self._bootstrap, args=(me,), name=self.name, daemon=True).start()
+
+    def _bootstrap(self, me: _Participant):
+        clock = self._clock
+        clock._local.participant = me
+        try:
+            clock._park(me)
+            try:
+                self._target(*self._args)
+            finally:
+                if not clock._closed:
+                    self._done.set()
+                    clock._exit(me)
+        except ClockClosed:
+            pass
+
+    def is_alive(self) -> bool:
+        return self._started and not self._done.is_set()
+
+    def join(self, timeout: Optional[float] = None):
+        self._done.wait(timeout)
+
+
+class VirtualFuture:
+    """Result of a task submitted to a VirtualExecutor."""
+
+    def __init__(self, clock: VirtualClock):
+        self._done = _VirtualEvent(clock)
+        self._result: Any = None
+        self._exception: Optional[BaseException] = None
+        self._callbacks: List[Callable] = []
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> bool:
+        return False
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        if not self._done.wait(timeout):
+            raise concurrent.futures.TimeoutError()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        if not self._done.wait(timeout):
+            raise concurrent.futures.TimeoutError()
+        return self._exception
+
+    def add_done_callback(self, fn: Callable):
+        if self.done():
+            fn(self)
+        else:
+            self._callbacks.append(fn)
+
+    def _finish(self, result: Any, exception: Optional[BaseException]):
+        self._result = result
+        self._exception = exception
+        self._done.set()
+        for fn in self._callbacks:
+            fn(self)
+
+
+class VirtualExecutor:
+    """Virtual-time counterpart of concurrent.futures.ThreadPoolExecutor."""
+
+    def __init__(self, clock: VirtualClock, max_workers: int):
+        self._clock = clock
+        self._max_workers = max_workers
+        self._work = _VirtualQueue(clock)
+        self._workers: List[VirtualThread] = []
+
+    def submit(self, fn: Callable, *args, **kwargs) -> VirtualFuture:
+        future = VirtualFuture(self._clock)
+        self._work.put((future, fn, args, kwargs))
+        if len(self._workers) < self._max_workers:
+            worker = VirtualThread(self._clock, self._worker, name=f"VirtualExecutor-{len(self._workers)}")
+            worker.start()
+            self._workers.append(worker)
+        return future
+
+    def map(self, fn: Callable, *iterables, timeout: Optional[float] = None) -> Iterator:
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return (future.result(timeout) for future in futures)
+
+    def shutdown(self, wait: bool = True):
+        for _ in self._workers:
+            self._work.put(None)
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown(wait=True)
+
+    def _worker(self):
+        while True:
+            work = self._work.get()
+            if work is None:
+                return
+            future, fn, args, kwargs = work
+            try:
+                result = fn(*args, **kwargs)
+            except ClockClosed:
+                raise
+            except BaseException as e:
+                future._finish(None, e)
+            else:
+                future._finish(result, None)
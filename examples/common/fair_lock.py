@@ -0,0 +1,177 @@
+"""
+Fair Lock
+A FIFO lock with direct hand-off, for examples where who gets the lock next
+matters as much as how fast.
+
+threading.Lock makes no promise about order: a thread that releases it and
+asks again at once usually gets it back before a waiter has even woken, so
+a busy thread can starve the others indefinitely. FairLock keeps waiters in
+a queue, each blocked on its own event. release() never makes the lock
+free while anyone waits; it pops the first waiter and sets its event, so the
+lock passes straight to that thread and a late arrival cannot barge in
+ahead of it. The price is a context switch on every contended hand-off.
+
+A waiter that gives up after a timeout leaves the queue, unless the lock
+was handed to it while it was giving up, in which case it keeps the lock.
+Each thread reuses one event per lock, so waiting allocates nothing.
+
+Locks and events come from the clock, so a FairLock runs on virtual time
+like the rest of the examples. "python3 -m examples.common.fair_lock"
+compares hand-off latency, throughput and per-thread waits against a plain
+threading.Lock.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from .clock import get_clock
+from .histogram import Histogram
+from .metrics import jain_index
+
+
+class FairLock:
+    """A lock granted in arrival order, handed directly from each holder to the next waiter."""
+
+    def __init__(self, name: Optional[str] = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.name = name
+        # Guards held and the queue; never held while anyone sleeps
+        self._mutex = self.clock.Lock(f"{name}-queue" if name else None)
+        self._held = False
+        self._waiters: Deque[Any] = deque()
+        self._local = threading.local()
+        self.handoffs = 0
+
+    def _event(self):
+        try:
+            return self._local.event
+        except AttributeError:
+            event = self._local.event = self.clock.Event()
+            return event
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        with self._mutex:
+            # While anyone waits the lock stays held, so a newcomer can never barge in
+            if not self._held:
+                self._held = True
+                return True
+            if not blocking:
+                return False
+            event = self._event()
+            event.clear()
+            self._waiters.append(event)
+        if event.wait(None if timeout < 0 else timeout):
+            return True
+        with self._mutex:
+            if event.is_set():
+                return True  # handed over just as we gave up
+            self._waiters.remove(event)
+            return False
+
+    def release(self):
+        with self._mutex:
+            if not self._held:
+                raise RuntimeError("release unlocked lock")
+            if self._waiters:
+                # The lock stays held: ownership passes straight to the first waiter
+                self._waiters.popleft().set()
+                self.handoffs += 1
+            else:
+                self._held = False
+
+    def locked(self) -> bool:
+        return self._held
+
+    def waiting(self) -> int:
+        """Number of threads queued for the lock."""
+        return len(self._waiters)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"<FairLock {self.name} {'locked' if self._held else 'unlocked'}, {len(self._waiters)} waiting>"
+
+
+def _contend(lock, duration: float, hold: int, waits: Histogram, handoffs: Histogram, last: list, counts: list, index: int):
+    """Take lock repeatedly for duration seconds, holding it for hold iterations of a busy loop."""
+    clock_ns = time.perf_counter_ns
+    deadline = clock_ns() + int(duration * 1e9)
+    name = threading.current_thread().name
+    while True:
+        asked = clock_ns()
+        if asked > deadline:
+            break
+        lock.acquire()
+        acquired = clock_ns()
+        waits.record_nanos(acquired - asked)
+        owner, released = last
+        if owner != name and released > asked:
+            # Freed by another thread while we waited: the gap is the hand-off
+            handoffs.record_nanos(acquired - released)
+        counts[index] += 1
+        for _ in range(hold):
+            pass
+        last[0], last[1] = name, clock_ns()
+        lock.release()
+
+
+def measure_handoff(threads: int = 4, duration: float = 1.0, hold: int = 200) -> Dict[str, Dict[str, float]]:
+    """Contend for a threading.Lock and a FairLock from threads threads; return throughput and wait statistics.
+
+    For each lock: acquisitions per second, Jain's fairness index of the
+    acquisitions per thread, the p50/p99/max wait for the lock, the worst
+    thread's p99 wait, and the p50/p99 hand-off latency (from one thread's
+    release to the next thread's return from acquire, when that thread was
+    already waiting).
+    """
+    results = {}
+    for label, lock in (("threading.Lock", threading.Lock()), ("FairLock", FairLock())):
+        waits = [Histogram() for _ in range(threads)]
+        handoffs = [Histogram() for _ in range(threads)]
+        counts = [0] * threads
+        last = [None, 0]
+        workers = [
+            threading.Thread(target=_contend, args=(lock, duration, hold, waits[i], handoffs[i], last, counts, i), name=f"contender-{i}")
+            for i in range(threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        merged, handoff = Histogram.merged(waits), Histogram.merged(handoffs)
+        results[label] = {
+            "throughput": sum(counts) / duration,
+            "fairness": jain_index(counts),
+            "wait p50": merged.percentile(50),
+            "wait p99": merged.percentile(99),
+            "wait max": merged.max / 1e9,
+            "worst thread p99": max(histogram.percentile(99) for histogram in waits),
+            "handoff p50": handoff.percentile(50),
+            "handoff p99": handoff.percentile(99),
+        }
+    return results
+
+
+def format_handoff(results: Dict[str, Dict[str, float]]) -> str:
+    """Render measure_handoff() results, times in microseconds."""
+    columns = ("throughput", "fairness", "wait p50", "wait p99", "wait max", "worst thread p99", "handoff p50", "handoff p99")
+    lines = [f"{'lock':<16}" + "".join(f"{column:>18}" for column in columns)]
+    for label, result in results.items():
+        cells = [f"{result['throughput']:>16.0f}/s", f"{result['fairness']:>18.3f}"]
+        cells.extend(f"{result[column] * 1e6:>16.1f}us" for column in columns[2:])
+        lines.append(f"{label:<16}" + "".join(cells))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    for threads in (2, 4, 16):
+        print(f"{threads} threads:")
+        print(format_handoff(measure_handoff(threads)))
+        print()
@@ -0,0 +1,108 @@
+"""
+Grant Monitor
+A scheduler that grants a shared resource to whichever waiting worker its
+policy picks, for examples where the order of grants is the whole point.
+
+The monitor is one lock guarding the policy's state, a condition variable
+per worker on that lock, and a granted flag per worker. A worker that
+cannot be granted at once waits on its own condition; whoever frees
+something asks the policy whom to grant next and wakes exactly those
+workers, so a newcomer never races a waiter for the resource. stop() wakes
+every waiter, and a worker woken without a grant withdraws its request.
+
+GrantMonitor leaves the policy to subclasses: submit() records a request
+and grants what it can, withdraw() takes back one that was never granted.
+HandOffMonitor is the common case of one resource with one holder: a
+request while the resource is free takes it at once, and release() hands
+it straight to the waiter the subclass's dequeue() picks, so the resource
+is never free while anyone waits.
+"""
+
+from typing import Optional
+
+from .clock import get_clock
+
+
+class GrantMonitor:
+    """Workers 0..num_workers-1, each waiting on its own condition for a grant the subclass's policy decides."""
+
+    def __init__(self, num_workers: int, name: str = "scheduler", clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.monitor = self.clock.Lock(name)
+        self.granted = bytearray(num_workers)
+        self.running = True
+        self._wakeups = [self.clock.Condition(self.monitor) for _ in range(num_workers)]
+
+    def submit(self, worker_id: int):
+        """Record worker_id's request and grant whatever the policy allows. Called with the monitor held."""
+        raise NotImplementedError
+
+    def withdraw(self, worker_id: int):
+        """Take back worker_id's request, which the example stopped before granting. Called with the monitor held."""
+        raise NotImplementedError
+
+    def grant(self, worker_id: int):
+        """Grant worker_id its request and wake it. Call with the monitor held."""
+        self.granted[worker_id] = 1
+        self._wakeups[worker_id].notify()
+
+    def request(self, worker_id: int) -> bool:
+        """Wait until worker_id is granted its request; False if the example stopped first."""
+        with self.monitor:
+            self.submit(worker_id)
+            while self.running and not self.granted[worker_id]:
+                self._wakeups[worker_id].wait()
+            if not self.granted[worker_id]:
+                self.withdraw(worker_id)
+                return False
+            self.granted[worker_id] = 0
+            return True
+
+    def stop(self):
+        """Stop the example and wake every waiter, so each withdraws its request."""
+        with self.monitor:
+            self.running = False
+            for wakeup in self._wakeups:
+                wakeup.notify()
+
+
+class HandOffMonitor(GrantMonitor):
+    """One resource with one holder, handed on release straight to the waiter the subclass picks."""
+
+    def __init__(self, num_workers: int, name: str = "scheduler", clock=None):
+        super().__init__(num_workers, name, clock)
+        self.holder: Optional[int] = None
+        self.handoffs = 0
+
+    def enqueue(self, worker_id: int):
+        """Queue worker_id, which found the resource held. Called with the monitor held."""
+        raise NotImplementedError
+
+    def dequeue(self) -> int:
+        """Remove and return the waiter to grant the resource to next. Called with the monitor held and someone waiting."""
+        raise NotImplementedError
+
+    def waiting(self) -> bool:
+        """Whether anyone is queued. Called with the monitor held."""
+        raise NotImplementedError
+
+    def submit(self, worker_id: int):
+        if self.holder is None:
+            self.holder = worker_id
+            self.granted[worker_id] = 1
+        else:
+            self.enqueue(worker_id)
+
+    def hand_over(self):
+        """Hand the resource to the next waiter, or free it if nobody waits. Call with the monitor held."""
+        if not self.waiting():
+            self.holder = None
+            return
+        self.holder = self.dequeue()
+        self.handoffs += 1
+        self.grant(self.holder)
+
+    def release(self, worker_id: int):
+        """Release the resource worker_id holds, handing it to the next waiter."""
+        with self.monitor:
+            self.hand_over()
@@ -0,0 +1,175 @@
+"""
+Histogram
+Log-linear latency histogram in the style of HdrHistogram.
+
+Values are recorded in integer nanoseconds. Values below 2**precision get a
+bucket each; above that every power of two is split into 2**(precision - 1)
+equal sub-buckets, so each bucket is at most 1 / 2**(precision - 1) wide
+relative to its value (about 3% with the default precision of 6) at every
+magnitude. Counts live in one page of 2**(precision - 1) buckets per power of
+two, each allocated the first time a value of that magnitude is recorded, so
+a histogram costs a few hundred bytes per magnitude it has seen rather than
+about 9.5 KB for the whole range up front; workers that each keep their own
+histograms stay small. Recording is a handful of integer operations and only
+allocates on meeting a new magnitude, and histograms with the same precision
+merge by adding their pages, so each thread can record into its own and the
+reports combine them afterwards.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Largest recordable value, in nanoseconds (about 36 minutes)
+MAX_NANOS = (1 << 41) - 1
+
+
+class Histogram:
+    """Log-linear histogram of durations in seconds, stored as nanoseconds."""
+
+    __slots__ = ("precision", "count", "total", "max", "_sub", "_half", "_pages")
+
+    def __init__(self, precision: int = 6):
+        if precision < 2:
+            raise ValueError("precision must be at least 2 bits")
+        self.precision = precision
+        self._sub = 1 << precision
+        self._half = self._sub >> 1
+        # Bucket index i lives in page i // half, which is None until something is recorded there
+        self._pages: List[Optional[array]] = [None] * (self._index(MAX_NANOS) // self._half + 1)
+        self.count = 0
+        self.total = 0  # nanoseconds
+        self.max = 0
+
+    def _index(self, nanos: int) -> int:
+        if nanos < self._sub:
+            return nanos
+        shift = nanos.bit_length() - self.precision
+        # shift >= 1 here and nanos >> shift lies in [half, sub)
+        return self._sub + (shift - 1) * self._half + (nanos >> shift) - self._half
+
+    def _lowest(self, index: int) -> int:
+        """Smallest value (nanoseconds) that falls in bucket index."""
+        if index < self._sub:
+            return index
+        shift, offset = divmod(index - self._sub, self._half)
+        return (offset + self._half) << (shift + 1)
+
+    def _highest(self, index: int) -> int:
+        """Largest value (nanoseconds) that falls in bucket index."""
+        return self._lowest(index + 1) - 1
+
+    def _page(self, number: int) -> array:
+        page = self._pages[number]
+        if page is None:
+            page = self._pages[number] = array("Q", bytes(8 * self._half))
+        return page
+
+    def _nonzero(self) -> Iterator[Tuple[int, int]]:
+        """Yield (index, count) for every non-empty bucket, in order."""
+        half = self._half
+        for number, page in enumerate(self._pages):
+            if page is not None:
+                for slot, n in enumerate(page):
+                    if n:
+                        yield number * half + slot, n
+
+    def record(self, seconds: float):
+        """Record one duration in seconds (negative values count as 0)."""
+        self.record_nanos(int(seconds * 1e9))
+
+    def record_nanos(self, nanos: int):
+        """Record one duration in integer nanoseconds, e.g. a difference of time.perf_counter_ns()."""
+        # _index() inlined, split into page and slot: this is the hot path
+        half = self._half
+        if nanos < self._sub:
+            if nanos < 0:
+                nanos = 0
+            number, slot = divmod(nanos, half)
+        else:
+            if nanos > MAX_NANOS:
+                nanos = MAX_NANOS
+            shift = nanos.bit_length() - self.precision
+            # Bucket sub + (shift - 1) * half + (nanos >> shift) - half, i.e. page shift + 1
+            number, slot = shift + 1, (nanos >> shift) - half
+        page = self._pages[number]
+        if page is None:
+            page = self._page(number)
+        page[slot] += 1
+        self.count += 1
+        self.total += nanos
+        if nanos > self.max:
+            self.max = nanos
+
+    def merge(self, other: "Histogram") -> "Histogram":
+        """Add the counts of another histogram with the same precision into this one."""
+        if other.precision != self.precision:
+            raise ValueError("cannot merge histograms with different precision")
+        for number, theirs in enumerate(other._pages):
+            if theirs is not None:
+                page = self._page(number)
+                for slot, n in enumerate(theirs):
+                    if n:
+                        page[slot] += n
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    @classmethod
+    def merged(cls, histograms: Iterable["Histogram"], precision: int = 6) -> "Histogram":
+        """Return a new histogram holding the sum of histograms."""
+        result = cls(precision)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    def percentile(self, q: float) -> float:
+        """Return the value at percentile q (0-100) in seconds, accurate to the bucket width."""
+        if not self.count:
+            return 0.0
+        rank = max(1, -(-q * self.count // 100))  # ceil without floats drifting past count
+        seen = 0
+        for index, n in self._nonzero():
+            seen += n
+            if seen >= rank:
+                return min(self._highest(index), self.max) / 1e9
+        return self.max / 1e9
+
+    @property
+    def min(self) -> float:
+        """Lower bound of the smallest recorded value in seconds."""
+        for index, _ in self._nonzero():
+            return self._lowest(index) / 1e9
+        return 0.0
+
+    def mean(self) -> float:
+        """Mean recorded value in seconds."""
+        return self.total / self.count / 1e9 if self.count else 0.0
+
+    def buckets(self) -> Iterator[Tuple[float, float, int]]:
+        """Yield (low, high, count) in seconds for every non-empty bucket."""
+        for index, n in self._nonzero():
+            yield self._lowest(index) / 1e9, self._highest(index) / 1e9, n
+
+    def summary(self) -> dict:
+        """Return count, mean and p50/p90/p99/p99.9/max in seconds."""
+        return {
+            "count": self.count,
+            "mean": self.mean(),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p99.9": self.percentile(99.9),
+            "max": self.max / 1e9 if self.count else 0.0,
+        }
+
+
+def format_percentiles(histograms: Dict[str, Histogram], percentiles: Sequence[float] = (50, 99), label: str = "worker") -> str:
+    """Render one row per named histogram: count, the given percentiles and max, in seconds."""
+    width = max([len(label)] + [len(name) for name in histograms])
+    headers = [f"p{q:g}" for q in percentiles] + ["max"]
+    lines = [f"{label:<{width}}  {'count':>7}" + "".join(f"  {header:>9}" for header in headers)]
+    for name, histogram in histograms.items():
+        values = [histogram.percentile(q) for q in percentiles] + [histogram.max / 1e9]
+        lines.append(f"{name:<{width}}  {histogram.count:>7}" + "".join(f"  {value:>8.3f}s" for value in values))
+    return "\n".join(lines)
@@ -0,0 +1,124 @@
+"""
+Indexed Heap
+A binary min-heap of the integers 0..capacity-1 (worker ids, say), each
+present at most once, whose keys can be changed in place.
+
+A plain heapq can only hold duplicates: to change an entry's priority you
+push it again and skip the stale copy when it surfaces, so a queue that is
+re-prioritised often grows without bound. IndexedHeap keeps each item's
+position in the heap, so push() of an item already present updates its key
+and moves it up (decrease-key) or down in O(log n), and remove() takes out
+any item. Keys and positions live in arrays allocated once for capacity
+items, so memory does not grow however long it runs.
+"""
+
+from array import array
+from typing import Iterator, List, Tuple
+
+
+class IndexedHeap:
+    """Min-heap of items 0..capacity-1 with float keys, at most one entry per item."""
+
+    __slots__ = ("_items", "_keys", "_position")
+
+    def __init__(self, capacity: int):
+        self._items: List[int] = []
+        self._keys = array("d", bytes(8 * capacity))
+        self._position = array("i", [-1]) * capacity
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item: int) -> bool:
+        return self._position[item] >= 0
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the items in heap order (not sorted)."""
+        return iter(list(self._items))
+
+    def key(self, item: int) -> float:
+        if self._position[item] < 0:
+            raise KeyError(item)
+        return self._keys[item]
+
+    def push(self, item: int, key: float):
+        """Insert item with key, or change its key if it is already in the heap."""
+        position = self._position[item]
+        if position >= 0:
+            old, self._keys[item] = self._keys[item], key
+            if key < old:
+                self._sift_up(position)
+            else:
+                self._sift_down(position)
+            return
+        self._keys[item] = key
+        self._items.append(item)
+        self._position[item] = len(self._items) - 1
+        self._sift_up(len(self._items) - 1)
+
+    def peek(self) -> Tuple[int, float]:
+        """Return the item with the smallest key, and its key, without removing it."""
+        if not self._items:
+            raise IndexError("peek from an empty heap")
+        item = self._items[0]
+        return item, self._keys[item]
+
+    def pop(self) -> int:
+        """Remove and return the item with the smallest key."""
+        if not self._items:
+            raise IndexError("pop from an empty heap")
+        item = self._items[0]
+        self._remove_at(0)
+        return item
+
+    def remove(self, item: int):
+        """Remove item from the heap; KeyError if it is not there."""
+        position = self._position[item]
+        if position < 0:
+            raise KeyError(item)
+        self._remove_at(position)
+
+    def _remove_at(self, position: int):
+        items, positions = self._items, self._position
+        positions[items[position]] = -1
+        last = items.pop()
+        if position < len(items):
+            items[position] = last
+            positions[last] = position
+            self._sift_down(position)
+            self._sift_up(positions[last])
+
+    def _sift_up(self, position: int):
+        items, keys, positions = self._items, self._keys, self._position
+        item = items[position]
+        key = keys[item]
+        while position:
+            parent = (position - 1) >> 1
+            above = items[parent]
+            if keys[above] <= key:
+                break
+            items[position] = above
+            positions[above] = position
+            position = parent
+        items[position] = item
+        positions[item] = position
+
+    def _sift_down(self, position: int):
+        items, keys, positions = self._items, self._keys, self._position
+        size = len(items)
+        item = items[position]
+        key = keys[item]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and keys[items[child + 1]] < keys[items[child]]:
+                child += 1
+            below = items[child]
+            if key <= keys[below]:
+                break
+            items[position] = below
+            positions[below] = position
+            position = child
+        items[position] = item
+        positions[item] = position
@@ -0,0 +1,49 @@
+"""
+Lock Sets
+Which locks each worker needs, for examples where N workers share M locks.
+
+Every worker needs a fixed subset of the locks, drawn once from a seeded
+generator so a run is reproducible; two workers conflict when their subsets
+overlap. Each subset is sorted by lock index: workers that take their locks
+in that order take them in one global order, and workers that take them in
+another order are what makes lock-order livelocks and deadlocks possible.
+
+With the default of two locks for two locks in total, every worker needs
+both, which is the classic two-lock setup.
+"""
+
+import random
+from typing import List, Optional, Tuple
+
+
+def lock_sets(num_workers: int, num_locks: int, locks_per_worker: Optional[int] = None, seed: int = 0) -> List[Tuple[int, ...]]:
+    """Return, for every worker, the sorted indexes of the locks it needs.
+
+    Each worker needs locks_per_worker distinct locks (default two, or every
+    lock when there are fewer), chosen uniformly at random.
+    """
+    if num_locks < 1:
+        raise ValueError("need at least one lock")
+    size = min(locks_per_worker or 2, num_locks)
+    if size < 1:
+        raise ValueError("every worker needs at least one lock")
+    if size == num_locks:
+        return [tuple(range(num_locks))] * num_workers
+    rng = random.Random(seed)
+    return [tuple(sorted(rng.sample(range(num_locks), size))) for _ in range(num_workers)]
+
+
+def conflicts(sets: List[Tuple[int, ...]]) -> List[int]:
+    """Return, for every worker, how many other workers need at least one of its locks."""
+    holders: List[List[int]] = []
+    for worker, needed in enumerate(sets):
+        for lock in needed:
+            while len(holders) <= lock:
+                holders.append([])
+            holders[lock].append(worker)
+    counts = []
+    for worker, needed in enumerate(sets):
+        others = {other for lock in needed for other in holders[lock]}
+        others.discard(worker)
+        counts.append(len(others))
+    return counts
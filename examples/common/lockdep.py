@@ -0,0 +1,209 @@
+"""
+Lockdep
+Lock-order validation for the examples, after the Linux kernel's lockdep.
+
+LockdepClock wraps any clock and hands out ValidatedLock objects from Lock();
+everything else is delegated to the wrapped clock, so it works the same on
+real and virtual time. Whenever a thread waits for a lock while holding
+others, each held lock -> wanted lock pair is an edge of the global
+acquisition-order graph. The first time an edge is seen the validator
+searches the graph for a path back the other way; if there is one, the two
+orders together can deadlock, and the inversion is reported with the cycle
+and the stack that first established each edge. This happens before the
+acquisition blocks, so an inversion is caught on the first run that exercises
+both orders, whether or not the threads ever collide.
+
+Only acquisitions that can wait add edges: a non-blocking attempt cannot
+deadlock. Timed attempts do, because an inversion that times out is still the
+livelock or stall the timeout is papering over.
+
+Known edges cost one set lookup per held lock, so the check stays cheap once
+the graph has been learned. Each thread's held locks are an array of small
+integer lock ids, and memory grows only with the number of distinct edges, so
+the validator can stay on for long soak runs.
+"""
+
+import sys
+import threading
+import traceback
+from array import array
+from collections import deque
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .deadlock_detector import caller_frames
+from .log import log
+
+
+class LockOrderViolation:
+    """An acquisition that closes a cycle in the lock-order graph."""
+
+    def __init__(self, thread: str, held: str, acquiring: str, cycle: List[Tuple[str, str, str, List[str]]]):
+        self.thread = thread
+        self.held = held
+        self.acquiring = acquiring
+        # (from lock, to lock, thread that first took them in that order, its stack)
+        self.cycle = cycle
+
+    def locks(self) -> List[str]:
+        return [edge[0] for edge in self.cycle]
+
+    def format(self, max_edges: int = 4) -> str:
+        if self.held == self.acquiring:
+            header = f"Recursive locking in {self.thread}: acquiring {self.acquiring} while already holding it"
+        else:
+            header = f"Lock order inversion in {self.thread}: acquiring {self.acquiring} while holding {self.held}"
+        order = " -> ".join(self.locks() + [self.cycle[0][0]])
+        lines = [header, f"  cycle: {order}"]
+        for first, second, thread, stack in self.cycle[:max_edges]:
+            lines.append(f"  {first} -> {second} taken by {thread}:")
+            lines.extend("    " + line for entry in stack for line in entry.rstrip().splitlines())
+        if len(self.cycle) > max_edges:
+            lines.append(f"  ... {len(self.cycle) - max_edges} more edges")
+        return "\n".join(lines)
+
+
+class LockOrderValidator:
+    """Learns the order in which ValidatedLocks are nested and flags cycles."""
+
+    def __init__(self):
+        self.lock_names: List[str] = []
+        self.violations: List[LockOrderViolation] = []
+        # after[a] holds every lock taken while holding a; read without a lock on the fast path
+        self.after: List[Set[int]] = []
+        self._witness: Dict[Tuple[int, int], Tuple[str, List[str]]] = {}
+        self._local = threading.local()
+        self._mutex = threading.Lock()
+
+    def add_lock(self, name: Optional[str]) -> int:
+        """Register a lock and return its id."""
+        with self._mutex:
+            lock_id = len(self.lock_names)
+            self.lock_names.append(name or f"lock-{lock_id}")
+            self.after.append(set())
+        return lock_id
+
+    def held(self) -> array:
+        """Return the calling thread's stack of held lock ids."""
+        try:
+            return self._local.held
+        except AttributeError:
+            held = self._local.held = array("I")
+            return held
+
+    @property
+    def num_edges(self) -> int:
+        return len(self._witness)
+
+    def add_order(self, held_id: int, lock_id: int) -> Optional[LockOrderViolation]:
+        """Record that lock_id is being taken while holding held_id; report it if it closes a cycle."""
+        with self._mutex:
+            if lock_id in self.after[held_id]:
+                return None
+            path = self._path(lock_id, held_id)
+            thread = threading.current_thread().name
+            self._witness[held_id, lock_id] = (thread, traceback.format_list(caller_frames(sys._getframe(1))))
+            # Added even when it closes a cycle, so the inversion is reported once
+            self.after[held_id].add(lock_id)
+            if path is None:
+                return None
+            names = self.lock_names
+            edges = list(zip(path, path[1:])) + [(held_id, lock_id)]
+            cycle = [(names[a], names[b]) + self._witness[a, b] for a, b in edges]
+            violation = LockOrderViolation(thread, names[held_id], names[lock_id], cycle)
+            self.violations.append(violation)
+        log.error("%s", violation.format())
+        return violation
+
+    def _path(self, start: int, goal: int) -> Optional[List[int]]:
+        """Breadth-first search of the order graph; return the lock ids from start to goal, if connected."""
+        if start == goal:
+            return [start]
+        parent = {start: start}
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for following in self.after[node]:
+                if following in parent:
+                    continue
+                parent[following] = node
+                if following == goal:
+                    path = [goal]
+                    while path[-1] != start:
+                        path.append(parent[path[-1]])
+                    return path[::-1]
+                queue.append(following)
+        return None
+
+    def report(self) -> str:
+        """Return every inversion found so far."""
+        if not self.violations:
+            return f"Lock order validator: no inversions ({len(self.lock_names)} locks, {self.num_edges} orderings learned)"
+        lines = [f"Lock order validator: {len(self.violations)} inversion(s) ({len(self.lock_names)} locks, {self.num_edges} orderings learned)"]
+        for violation in self.violations:
+            lines.append("")
+            lines.append(violation.format())
+        return "\n".join(lines)
+
+
+class ValidatedLock:
+    """Lock wrapper that checks every blocking acquisition against the learned lock order."""
+
+    __slots__ = ("_lock", "_validator", "_id", "_held", "name")
+
+    def __init__(self, lock: Any, validator: LockOrderValidator, name: Optional[str] = None):
+        self._lock = lock
+        self._validator = validator
+        self._id = validator.add_lock(name)
+        self._held: Optional[array] = None  # held-lock stack of the owning thread
+        self.name = validator.lock_names[self._id]
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        validator = self._validator
+        held = validator.held()
+        if blocking and held:
+            lock_id, after = self._id, validator.after
+            for held_id in held:
+                if lock_id not in after[held_id]:
+                    validator.add_order(held_id, lock_id)
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            held.append(self._id)
+            self._held = held
+        return acquired
+
+    def release(self):
+        held, self._held = self._held, None
+        if held is not None:
+            # Usually the most recent acquisition; released by whichever thread holds it
+            if held and held[-1] == self._id:
+                held.pop()
+            elif self._id in held:
+                held.remove(self._id)
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def __repr__(self) -> str:
+        return f"<ValidatedLock {self.name} {'locked' if self.locked() else 'unlocked'}>"
+
+
+class LockdepClock:
+    """Clock wrapper whose Lock() returns ValidatedLock objects sharing one LockOrderValidator."""
+
+    def __init__(self, clock: Any, validator: Optional[LockOrderValidator] = None):
+        self.clock = clock
+        self.validator = validator if validator is not None else LockOrderValidator()
+
+    def Lock(self, name: Optional[str] = None):
+        return ValidatedLock(self.clock.Lock(name), self.validator, name)
+
+    def __getattr__(self, attr: str):
+        return getattr(self.clock, attr)
@@ -0,0 +1,163 @@
+"""
+Log
+Non-blocking log sink for the example worker threads.
+
+Printing from many threads makes stdout's internal lock the most contended lock
+in the process, which distorts the very behaviour the examples demonstrate.
+Workers instead write records into a preallocated ring buffer: claiming a slot
+is a single itertools.count() step and storing a record is a single list item
+assignment, both atomic under the GIL, so writers never block. Messages use
+%-style arguments and are only formatted by the background thread that drains
+the buffer to stdout.
+
+When writers lap the drainer the oldest unread records are overwritten; the
+number lost is kept in RingBufferLog.dropped. Records below the current level
+are discarded before touching the buffer.
+
+A forked child process starts with an empty buffer and its own drainer. Child
+processes do not run atexit handlers, so they should call flush() before they
+exit.
+"""
+
+import atexit
+import itertools
+import os
+import sys
+import threading
+from typing import Any, List, Optional
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR}
+
+
+class RingBufferLog:
+    """Lock-free ring buffer of log records drained by a single background thread."""
+
+    def __init__(self, capacity: int = 65536, level: int = DEBUG, interval: float = 0.02):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.level = level
+        self.interval = interval
+        self._mask = capacity - 1
+        self._reset()
+
+    def _reset(self):
+        """Empty the buffer and forget the drainer (also used after fork)."""
+        self.dropped = 0  # records overwritten before they were drained
+        self.drained = 0  # records written to the stream
+
+        self._slots: List[Any] = [None] * (self._mask + 1)
+        self._counter = itertools.count()
+        self._read = 0  # sequence number of the next record to drain
+
+        self._wakeup = threading.Event()
+        self._progress = threading.Condition()
+        self._drainer: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    def debug(self, fmt: str, *args: Any):
+        if self.level <= DEBUG:
+            self._write(fmt, args)
+
+    def info(self, fmt: str, *args: Any):
+        if self.level <= INFO:
+            self._write(fmt, args)
+
+    def warning(self, fmt: str, *args: Any):
+        if self.level <= WARNING:
+            self._write(fmt, args)
+
+    def error(self, fmt: str, *args: Any):
+        if self.level <= ERROR:
+            self._write(fmt, args)
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every record written so far has reached stdout."""
+        if self._drainer is None:
+            return True
+        # Claim a sequence number as a marker; the drainer skips it
+        marker = self._write(None, ())
+        self._wakeup.set()
+        with self._progress:
+            return self._progress.wait_for(lambda: self._read > marker, timeout)
+
+    def _write(self, fmt: Optional[str], args: tuple) -> int:
+        seq = next(self._counter)
+        self._slots[seq & self._mask] = (seq, fmt, args)
+        if self._drainer is None:
+            self._start()
+        return seq
+
+    def _start(self):
+        with self._start_lock:
+            if self._drainer is not None:
+                return
+            self._drainer = threading.Thread(target=self._drain_loop, name="log-drainer", daemon=True)
+            self._drainer.start()
+            atexit.register(self.flush)
+
+    def _drain_loop(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def _drain(self):
+        """Write every record that is ready, in sequence order, as one batch."""
+        slots, mask, capacity = self._slots, self._mask, self._mask + 1
+        expected = self._read
+        lines = []
+
+        while True:
+            record = slots[expected & mask]
+            if record is None or record[0] < expected:
+                break  # not written yet
+            seq, fmt, args = record
+            if seq > expected:
+                # Writers lapped us: everything older than the last full lap is gone
+                oldest = seq - capacity + 1
+                self.dropped += oldest - expected
+                expected = oldest
+                continue
+            expected += 1
+            if fmt is None:
+                continue
+            try:
+                lines.append(fmt % args if args else fmt)
+            except (TypeError, ValueError):
+                lines.append(f"{fmt!r} % {args!r}")
+
+        if lines:
+            stream = sys.stdout
+            stream.write("\n".join(lines) + "\n")
+            stream.flush()
+            self.drained += len(lines)
+
+        with self._progress:
+            self._read = expected
+            self._progress.notify_all()
+
+
+# Shared sink used by all examples
+log = RingBufferLog()
+
+if hasattr(os, "register_at_fork"):
+    # The drainer thread does not survive fork; the child starts a new one on its first write
+    os.register_at_fork(after_in_child=log._reset)
+
+
+def configure(level: Optional[int] = None, quiet: bool = False):
+    """Set the level of the shared log; quiet turns worker output off entirely."""
+    if quiet:
+        log.level = OFF
+    elif level is not None:
+        log.level = level
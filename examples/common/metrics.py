@@ -0,0 +1,126 @@
+"""
+Work Metrics
+Counts completed units of work (meals, critical sections, events, ...) and the
+latency of each one, so examples can be compared by throughput instead of by
+reading their narration.
+"""
+
+import math
+from typing import Dict, Hashable, List, Optional, Sequence
+
+from .histogram import Histogram
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Return the nearest-rank percentile q (0-100) of already sorted values."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def jain_index(counts: Sequence[float], n: Optional[int] = None) -> float:
+    """Return Jain's fairness index of counts over n workers (default len(counts)).
+
+    1.0 when every worker got the same share, 1/n when one worker got
+    everything. Workers missing from counts count as zero.
+    """
+    n = max(n or 0, len(counts))
+    total = sum(counts)
+    squares = sum(count * count for count in counts)
+    return total * total / (n * squares) if squares else 0.0
+
+
+class WorkMetrics:
+    """Records one latency sample per completed unit of work.
+
+    With histogram=True the latencies go into a Histogram instead of a list,
+    so memory stays fixed however long the run, at the cost of percentiles
+    accurate only to the bucket width and an empty latencies list.
+    """
+
+    def __init__(self, unit: str, histogram: bool = False):
+        self.unit = unit
+        # list.append and per-key dict updates from the owning worker are
+        # atomic under the GIL, so workers record without taking a lock
+        self.latencies: List[float] = []
+        self.histogram: Optional[Histogram] = Histogram() if histogram else None
+        self.per_worker: Dict[Hashable, int] = {}
+        # Workers expected to record, so fairness() counts the ones that never did
+        self.num_workers: Optional[int] = None
+        # Other countable events (retries, wasted acquisitions, ...): event -> worker -> count
+        self.events: Dict[str, Dict[Hashable, int]] = {}
+
+    def record(self, latency: float, worker: Optional[Hashable] = None):
+        """Record one completed unit of work that took latency seconds to obtain."""
+        if self.histogram is not None:
+            self.histogram.record(latency)
+        else:
+            self.latencies.append(latency)
+        if worker is not None:
+            self.per_worker[worker] = self.per_worker.get(worker, 0) + 1
+
+    def tally(self, event: str, worker: Optional[Hashable] = None, n: int = 1):
+        """Count n occurrences of an event that is not a completed unit of work."""
+        counts = self.events.setdefault(event, {})
+        counts[worker] = counts.get(worker, 0) + n
+
+    def merge(self, other: "WorkMetrics"):
+        """Add the samples and counts of other, e.g. the metrics a worker process reported."""
+        if self.histogram is not None:
+            for latency in other.latencies:
+                self.histogram.record(latency)
+            if other.histogram is not None:
+                self.histogram.merge(other.histogram)
+        elif other.histogram is not None:
+            raise ValueError("cannot merge histogram metrics into metrics that keep every sample")
+        else:
+            self.latencies.extend(other.latencies)
+        for worker, count in other.per_worker.items():
+            self.per_worker[worker] = self.per_worker.get(worker, 0) + count
+        for event, counts in other.events.items():
+            for worker, count in counts.items():
+                self.tally(event, worker, count)
+
+    def event_count(self, event: str) -> int:
+        """Number of times event was tallied, over all workers."""
+        return sum(self.events.get(event, {}).values())
+
+    @property
+    def count(self) -> int:
+        """Number of completed units of work."""
+        if self.histogram is not None:
+            return self.histogram.count
+        return len(self.latencies)
+
+    def fairness(self) -> float:
+        """Jain's fairness index of the work completed per worker."""
+        return jain_index(list(self.per_worker.values()), self.num_workers)
+
+    def summary(self, elapsed: float) -> dict:
+        """Return throughput over elapsed seconds and latency percentiles."""
+        if self.histogram is not None:
+            histogram = self.histogram
+            return {
+                "unit": self.unit,
+                "count": histogram.count,
+                "throughput": histogram.count / elapsed if elapsed > 0 else 0.0,
+                "latency": {
+                    "p50": histogram.percentile(50),
+                    "p90": histogram.percentile(90),
+                    "p99": histogram.percentile(99),
+                    "max": histogram.max / 1e9,
+                },
+            }
+        ordered = sorted(self.latencies)
+        return {
+            "unit": self.unit,
+            "count": len(ordered),
+            "throughput": len(ordered) / elapsed if elapsed > 0 else 0.0,
+            "latency": {
+                "p50": percentile(ordered, 50),
+                "p90": percentile(ordered, 90),
+                "p99": percentile(ordered, 99),
+                "max": ordered[-1] if ordered else 0.0,
+            },
+        }
@@ -0,0 +1,17 @@
+"""
+Priorities
+How the starvation examples divide their workers between high and low
+priority. Every backend and fix uses the same split, so their results
+compare on the same workload.
+"""
+
+from typing import Optional, Tuple
+
+
+def split_priorities(num_workers: int, num_low_priority: Optional[int] = None) -> Tuple[int, int]:
+    """Return (high, low) worker counts: two in five low priority by default (3 high, 2 low of 5).
+
+    An explicit num_low_priority is clamped to 0..num_workers.
+    """
+    low = num_workers * 2 // 5 if num_low_priority is None else max(0, min(num_low_priority, num_workers))
+    return num_workers - low, low
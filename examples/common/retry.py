@@ -0,0 +1,206 @@
+"""
+Retry Policies
+How long a worker waits for a contended resource, and how long it backs off
+after giving up, for examples that acquire with a timeout and retry.
+
+A policy answers two questions for a worker that wants resource r:
+timeout(r), how long one acquire() may wait, and delay(r, attempt,
+previous), how long to sleep after the attempt-th consecutive failure, given
+the previous delay. Policies are shared by every worker of an example and
+keep no per-worker state; randomness comes from the random module, which the
+benchmark seeds.
+
+- fixed: the same timeout and delay every time
+- exponential: the delay doubles with each consecutive failure, up to a cap
+- full-jitter: a uniformly random delay up to the exponential one, so
+  workers that failed together do not retry together
+- decorrelated-jitter: a random delay between the base and three times the
+  previous one, capped
+- adaptive: the timeout follows the hold times seen on each resource,
+  estimated like TCP's retransmission timeout (smoothed mean plus four
+  mean deviations), and the delay is full jitter scaled by the mean hold
+
+A timeout shorter than the time the holder keeps a resource is always
+wasted, so the adaptive policy learns the hold time instead of guessing it.
+Holders report a hold through observe() before releasing, so updates to one
+resource's estimate are serialized by the resource itself.
+
+Run "python3 -m examples.common.retry" to compare meals and wasted
+acquisitions of each policy in DeadlockFixTimeout as the table grows.
+"""
+
+import random
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Type, Union
+
+
+class RetryPolicy:
+    """Fixed timeout and delay; the base class of the other policies."""
+
+    name = "fixed"
+
+    def __init__(self, timeout: float = 0.1, delay: float = 0.05):
+        self.base_timeout = timeout
+        self.base_delay = delay
+
+    @classmethod
+    def for_resources(cls, num_resources: int) -> "RetryPolicy":
+        """Return the policy with its default parameters, for workers contending for num_resources resources."""
+        return cls()
+
+    def timeout(self, resource: int) -> float:
+        """Return how long one acquisition of resource may wait."""
+        return self.base_timeout
+
+    def delay(self, resource: int, attempt: int, previous: float) -> float:
+        """Return how long to back off after the attempt-th consecutive failure on resource."""
+        return self.base_delay
+
+    def observe(self, resource: int, held: float):
+        """Record that resource was held for held seconds; call it before releasing."""
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.name}>"
+
+
+class ExponentialBackoff(RetryPolicy):
+    """Doubles the delay with each consecutive failure, up to cap."""
+
+    name = "exponential"
+
+    def __init__(self, timeout: float = 0.1, delay: float = 0.01, cap: float = 1.0):
+        super().__init__(timeout, delay)
+        self.cap = cap
+
+    def ceiling(self, attempt: int) -> float:
+        # Past 2**20 the cap has long been reached; keep the float small
+        return min(self.cap, self.base_delay * 2.0 ** min(attempt - 1, 20))
+
+    def delay(self, resource: int, attempt: int, previous: float) -> float:
+        return self.ceiling(attempt)
+
+
+class FullJitterBackoff(ExponentialBackoff):
+    """A uniformly random delay between zero and the exponential one."""
+
+    name = "full-jitter"
+
+    def delay(self, resource: int, attempt: int, previous: float) -> float:
+        return random.uniform(0.0, self.ceiling(attempt))
+
+
+class DecorrelatedJitterBackoff(ExponentialBackoff):
+    """A random delay between the base and three times the previous delay, up to cap."""
+
+    name = "decorrelated-jitter"
+
+    def delay(self, resource: int, attempt: int, previous: float) -> float:
+        return min(self.cap, random.uniform(self.base_delay, max(previous, self.base_delay) * 3.0))
+
+
+class AdaptiveTimeout(RetryPolicy):
+    """Timeouts from each resource's observed hold times, backoff scaled by the mean hold.
+
+    timeout = smoothed hold + 4 * mean deviation, clamped to
+    [min_timeout, max_timeout], with the usual gains of 1/8 and 1/4.
+    Until a resource has been observed its timeout is the initial one.
+    """
+
+    name = "adaptive"
+
+    def __init__(self, num_resources: int, timeout: float = 0.1, min_timeout: float = 0.01, max_timeout: float = 2.0, cap: float = 1.0):
+        super().__init__(timeout, timeout / 2)
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.cap = cap
+        self.mean = array("d", bytes(8 * num_resources))
+        self.deviation = array("d", bytes(8 * num_resources))
+        self.samples = array("Q", bytes(8 * num_resources))
+
+    @classmethod
+    def for_resources(cls, num_resources: int) -> "AdaptiveTimeout":
+        return cls(num_resources)
+
+    def timeout(self, resource: int) -> float:
+        if not self.samples[resource]:
+            return self.base_timeout
+        return min(self.max_timeout, max(self.min_timeout, self.mean[resource] + 4.0 * self.deviation[resource]))
+
+    def delay(self, resource: int, attempt: int, previous: float) -> float:
+        mean = self.mean[resource] if self.samples[resource] else self.base_delay
+        return random.uniform(0.0, min(self.cap, mean * 2.0 ** min(attempt - 1, 20)))
+
+    def observe(self, resource: int, held: float):
+        if self.samples[resource]:
+            error = held - self.mean[resource]
+            self.mean[resource] += error / 8.0
+            self.deviation[resource] += (abs(error) - self.deviation[resource]) / 4.0
+        else:
+            self.mean[resource] = held
+            self.deviation[resource] = held / 2.0
+        self.samples[resource] += 1
+
+
+RETRY_POLICIES: Dict[str, Type[RetryPolicy]] = {
+    policy.name: policy for policy in (RetryPolicy, ExponentialBackoff, FullJitterBackoff, DecorrelatedJitterBackoff, AdaptiveTimeout)
+}
+
+
+def make_retry_policy(policy: Union[str, RetryPolicy], num_resources: int) -> RetryPolicy:
+    """Return policy itself if it is a RetryPolicy, else the named policy with its default parameters."""
+    if isinstance(policy, RetryPolicy):
+        return policy
+    if policy not in RETRY_POLICIES:
+        raise ValueError(f"Unknown retry policy {policy!r}, expected one of {', '.join(RETRY_POLICIES)}")
+    return RETRY_POLICIES[policy].for_resources(num_resources)
+
+
+def compare_policies(
+    counts: Sequence[int] = (5, 50, 500),
+    policies: Optional[Sequence[str]] = None,
+    duration: float = 60.0,
+    seed: int = 0,
+    example: str = "deadlock-fix-timeout",
+) -> List[Dict[str, Any]]:
+    """Run example on the virtual clock with each policy and philosopher count; return one row per run."""
+    # Deferred: the benchmark runner imports the example registry
+    from .bench import run_once
+
+    rows = []
+    for count in counts:
+        for policy in policies or list(RETRY_POLICIES):
+            metrics, elapsed = run_once(example, duration, seed, "virtual", num_philosophers=count, retry_policy=policy)
+            if metrics is None:
+                raise ValueError(f"example {example!r} has no metrics attribute")
+            summary = metrics.summary(elapsed)
+            rows.append(
+                {
+                    "philosophers": count,
+                    "policy": policy,
+                    "meals": summary["throughput"],
+                    "wasted": metrics.event_count("wasted acquisitions") / elapsed,
+                    "timeouts": metrics.event_count("timeouts") / elapsed,
+                    "p99": summary["latency"]["p99"],
+                    "fairness": metrics.fairness(),
+                }
+            )
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Render compare_policies() rows as a table."""
+    lines = [
+        f"{'philosophers':>12}  {'policy':<20}  {'meals/s':>9}  {'wasted/s':>9}  {'wasted/meal':>11}  "
+        f"{'timeouts/s':>10}  {'p99 wait':>9}  {'fairness':>8}"
+    ]
+    for row in rows:
+        per_meal = row["wasted"] / row["meals"] if row["meals"] else float("inf")
+        lines.append(
+            f"{row['philosophers']:>12}  {row['policy']:<20}  {row['meals']:>9.2f}  {row['wasted']:>9.2f}  {per_meal:>11.2f}  "
+            f"{row['timeouts']:>10.2f}  {row['p99']:>8.3f}s  {row['fairness']:>8.3f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_comparison(compare_policies()))
@@ -0,0 +1,168 @@
+"""
+Reader-Writer Lock
+A lock that many readers may hold at once but a writer holds alone, with a
+choice of who goes first when both are waiting.
+
+- reader-preference: a reader gets in whenever no writer holds the lock,
+  even if writers are waiting. Readers never wait for each other, but a
+  steady stream of them keeps the lock busy and starves the writers.
+- writer-preference: a reader arriving while any writer holds or waits for
+  the lock waits, and a writer releasing it hands it to the next writer.
+  Writers never starve; a steady stream of them starves the readers.
+- phase-fair: reader and writer phases alternate. Readers arriving while a
+  writer holds or waits for the lock wait, and a writer releasing it lets
+  every waiting reader in at once, even if more writers wait. A writer
+  waits for at most one reader phase and a reader for at most one writer.
+
+The lock is a monitor: one mutex guarding the counts, one condition for
+waiting readers, and a FIFO queue of waiting writers, each blocked on a
+ticket with a condition of its own. Like FairLock it hands the lock over
+rather than freeing it: a releasing writer admits the waiting readers or
+the first queued writer itself, and the last reader out admits the first
+queued writer, marking that writer's ticket, so a newcomer cannot barge in
+between, not even before the writer it was handed to wakes up. Each thread
+reuses one ticket per lock. Locks and conditions come from the clock, so it
+runs on virtual time like the rest of the examples.
+"""
+
+import contextlib
+import threading
+from array import array
+from collections import deque
+from typing import Deque, Iterator, Optional
+
+from .clock import get_clock
+
+READER_PREFERENCE = "reader-preference"
+WRITER_PREFERENCE = "writer-preference"
+PHASE_FAIR = "phase-fair"
+
+RW_POLICIES = (READER_PREFERENCE, WRITER_PREFERENCE, PHASE_FAIR)
+
+
+class _WriteTicket:
+    """A waiting writer's place in the queue: its own condition and whether the lock was handed to it."""
+
+    __slots__ = ("ready", "granted")
+
+    def __init__(self, ready):
+        self.ready = ready
+        self.granted = False
+
+
+class ReaderWriterLock:
+    """A reader-writer lock with reader-preference, writer-preference or phase-fair admission."""
+
+    def __init__(self, policy: str = PHASE_FAIR, name: Optional[str] = None, clock=None):
+        if policy not in RW_POLICIES:
+            raise ValueError(f"unknown policy {policy!r}, expected one of {', '.join(RW_POLICIES)}")
+        self.clock = clock if clock is not None else get_clock()
+        self.policy = policy
+        self.name = name
+        # Guards everything below; never held while anyone reads or writes
+        self._mutex = self.clock.Lock(f"{name}-state" if name else None)
+        self._read_ok = self.clock.Condition(self._mutex)
+        self.readers = 0
+        self.writing = False
+        self.waiting_readers = 0
+        # Bumped each time the waiting readers are let in, so each of them knows it was
+        self._read_batch = 0
+        self._writers: Deque[_WriteTicket] = deque()
+        self._local = threading.local()
+        # Read and write grants so far, counted under the mutex
+        self.grants = array("q", [0])
+
+    @property
+    def waiting_writers(self) -> int:
+        return len(self._writers)
+
+    def _ticket(self) -> _WriteTicket:
+        try:
+            return self._local.ticket
+        except AttributeError:
+            ticket = self._local.ticket = _WriteTicket(self.clock.Condition(self._mutex))
+            return ticket
+
+    def acquire_read(self):
+        with self._mutex:
+            if not self.writing and (self.policy == READER_PREFERENCE or not self.waiting_writers):
+                self.readers += 1
+                self.grants[0] += 1
+                return
+            batch = self._read_batch
+            self.waiting_readers += 1
+            while self._read_batch == batch:
+                self._read_ok.wait()
+            # Let in by whoever released: already counted in readers
+
+    def release_read(self):
+        with self._mutex:
+            if self.readers <= 0:
+                raise RuntimeError("release_read without a reader")
+            self.readers -= 1
+            if not self.readers:
+                self._hand_over()
+
+    def acquire_write(self):
+        with self._mutex:
+            if not self.writing and not self.readers and not self._writers:
+                self.writing = True
+                self.grants[0] += 1
+                return
+            ticket = self._ticket()
+            ticket.granted = False
+            self._writers.append(ticket)
+            while not ticket.granted:
+                ticket.ready.wait()
+            # Handed over by whoever released: writing is already set for us
+
+    def release_write(self):
+        with self._mutex:
+            if not self.writing:
+                raise RuntimeError("release_write without a writer")
+            self.writing = False
+            if self.policy == WRITER_PREFERENCE:
+                self._hand_over()
+            elif self.waiting_readers:
+                # Reader preference, or phase-fair: a reader phase follows every writer
+                self._admit_readers()
+            else:
+                self._hand_over()
+
+    def _hand_over(self):
+        """Pass the free lock to the first queued writer, or else to the waiting readers. Call with the mutex held."""
+        if self._writers:
+            ticket = self._writers.popleft()
+            self.writing = True
+            self.grants[0] += 1
+            ticket.granted = True
+            ticket.ready.notify()
+        elif self.waiting_readers:
+            self._admit_readers()
+
+    def _admit_readers(self):
+        self.readers += self.waiting_readers
+        self.grants[0] += self.waiting_readers
+        self.waiting_readers = 0
+        self._read_batch += 1
+        self._read_ok.notify_all()
+
+    @contextlib.contextmanager
+    def for_reading(self) -> Iterator["ReaderWriterLock"]:
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextlib.contextmanager
+    def for_writing(self) -> Iterator["ReaderWriterLock"]:
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
+    def __repr__(self) -> str:
+        state = "writing" if self.writing else f"{self.readers} readers"
+        return f"<ReaderWriterLock {self.name} {self.policy}, {state}, {self.waiting_readers}+{self.waiting_writers} waiting>"
@@ -0,0 +1,301 @@
+"""
+Topology
+Conflict graphs for the dining philosophers: philosophers are vertices and
+every fork is an edge shared by the two philosophers it joins. A philosopher
+needs all of its forks to eat, so its degree is how many resources it must
+hold at once.
+
+ConflictGraph stores the graph in compact arrays: the edge endpoints in two
+int arrays, and the adjacency in CSR form, an offsets array plus flat arrays
+of neighbours and fork ids. A 100k-vertex graph is a few MB and builds in a
+fraction of a second.
+
+Edges are directed from tail to head only to fix each philosopher's fork
+order: a philosopher lists the forks it is the head of, then the forks it is
+the tail of. Edge e of the ring joins philosopher e-1 to philosopher e, so
+philosopher i's forks are i then i+1, the classic left then right fork.
+
+Graphs come from generators (ring, grid, random-regular, power-law) or from
+a file of "tail head" lines; make_graph() turns a --graph spec into one.
+"""
+
+import math
+import random
+from array import array
+from itertools import accumulate
+from typing import Iterable, List, Optional, Tuple, Union
+
+# random_regular: endpoint swaps tried per edge before starting again from fresh stubs, and how many fresh starts
+SWAP_ATTEMPTS_PER_EDGE = 50
+RANDOM_REGULAR_RESTARTS = 100
+
+
+class ConflictGraph:
+    """An undirected multigraph of philosophers (vertices) and forks (edges) in CSR arrays."""
+
+    def __init__(self, num_vertices: int, tails: Iterable[int], heads: Iterable[int], name: str = "graph"):
+        self.name = name
+        self.num_vertices = num_vertices
+        self.tails = tails if isinstance(tails, array) else array("i", tails)
+        self.heads = heads if isinstance(heads, array) else array("i", heads)
+        if len(self.tails) != len(self.heads):
+            raise ValueError("tails and heads must have the same length")
+        for endpoints in (self.tails, self.heads):
+            if endpoints and not 0 <= min(endpoints) <= max(endpoints) < num_vertices:
+                raise ValueError(f"edge endpoint out of range for {num_vertices} vertices")
+
+        degree = [0] * num_vertices
+        for v in self.heads:
+            degree[v] += 1
+        for v in self.tails:
+            degree[v] += 1
+        self.offsets = array("i", [0])
+        self.offsets.extend(accumulate(degree))
+
+        # Heads first, then tails, each in edge order; plain lists are faster to index than arrays
+        size = self.offsets[-1]
+        neighbours, forks = [0] * size, [0] * size
+        fill = self.offsets.tolist()
+        tails, heads = self.tails.tolist(), self.heads.tolist()
+        for e, v in enumerate(heads):
+            position = fill[v]
+            fill[v] = position + 1
+            neighbours[position] = tails[e]
+            forks[position] = e
+        for e, v in enumerate(tails):
+            position = fill[v]
+            fill[v] = position + 1
+            neighbours[position] = heads[e]
+            forks[position] = e
+        self.adjacent = array("i", neighbours)
+        self.incident = array("i", forks)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.tails)
+
+    def edges(self) -> List[Tuple[int, int]]:
+        """Return every edge as (tail, head), indexed by fork id."""
+        return list(zip(self.tails, self.heads))
+
+    def degree(self, vertex: int) -> int:
+        return self.offsets[vertex + 1] - self.offsets[vertex]
+
+    def neighbours(self, vertex: int) -> array:
+        """Return the philosophers vertex shares a fork with, once per shared fork."""
+        return self.adjacent[self.offsets[vertex] : self.offsets[vertex + 1]]
+
+    def forks(self, vertex: int) -> array:
+        """Return the fork ids of vertex in its pick-up order: forks it is the head of, then the tail of."""
+        return self.incident[self.offsets[vertex] : self.offsets[vertex + 1]]
+
+    def describe(self) -> str:
+        degrees = [self.degree(v) for v in range(self.num_vertices)]
+        low, high = (min(degrees), max(degrees)) if degrees else (0, 0)
+        return f"{self.name}: {self.num_vertices} philosophers, {self.num_edges} forks, degree {low}-{high}"
+
+    def __repr__(self) -> str:
+        return f"<ConflictGraph {self.describe()}>"
+
+
+def ring(num_vertices: int) -> ConflictGraph:
+    """The classic table: fork e between philosophers e-1 and e (a self-loop for one, two forks for two)."""
+    heads = array("i", range(num_vertices))
+    tails = array("i", range(-1, num_vertices - 1))
+    if num_vertices:
+        tails[0] = num_vertices - 1
+    return ConflictGraph(num_vertices, tails, heads, "ring")
+
+
+def grid(num_vertices: int, columns: Optional[int] = None) -> ConflictGraph:
+    """Philosophers in rows of columns (default about the square root), sharing a fork with right and lower neighbours."""
+    columns = columns or max(1, math.isqrt(num_vertices - 1) + 1 if num_vertices > 1 else 1)
+    tails, heads = array("i"), array("i")
+    for v in range(num_vertices):
+        if (v + 1) % columns and v + 1 < num_vertices:
+            tails.append(v)
+            heads.append(v + 1)
+        if v + columns < num_vertices:
+            tails.append(v)
+            heads.append(v + columns)
+    return ConflictGraph(num_vertices, tails, heads, "grid")
+
+
+def random_regular(num_vertices: int, degree: int = 3, seed: int = 0) -> ConflictGraph:
+    """A random simple graph where every philosopher has degree forks.
+
+    Pairs shuffled edge stubs (the configuration model), then removes
+    self-loops and repeated edges by swapping endpoints with random edges.
+    Dense graphs can leave no swap that helps, so after a bounded number of
+    tries it starts again from fresh stubs. degree num_vertices - 1 is the
+    complete graph, which has no randomness to draw.
+    """
+    if degree >= num_vertices or num_vertices * degree % 2:
+        raise ValueError(f"no simple {degree}-regular graph on {num_vertices} vertices")
+    if degree == num_vertices - 1:
+        pairs = [(u, v) for u in range(num_vertices) for v in range(u + 1, num_vertices)]
+        return ConflictGraph(num_vertices, [u for u, _ in pairs], [v for _, v in pairs], "random-regular")
+    rng = random.Random(seed)
+    for _ in range(RANDOM_REGULAR_RESTARTS):
+        edges = _regular_edges(num_vertices, degree, rng)
+        if edges is not None:
+            return ConflictGraph(num_vertices, edges[0], edges[1], "random-regular")
+    raise ValueError(f"no simple {degree}-regular graph on {num_vertices} vertices found in {RANDOM_REGULAR_RESTARTS} tries")
+
+
+def _regular_edges(num_vertices: int, degree: int, rng: random.Random) -> Optional[Tuple[List[int], List[int]]]:
+    """One configuration-model try: (tails, heads) of a simple degree-regular graph, or None if the swaps got stuck."""
+    # A shuffle of the stubs, sorting on random keys: one C call per stub instead of a Python loop
+    keys = [rng.random() for _ in range(num_vertices * degree)]
+    stubs = [stub // degree for stub in sorted(range(len(keys)), key=keys.__getitem__)]
+    tails, heads = stubs[0::2], stubs[1::2]
+
+    n = num_vertices
+    counts: dict = {}
+    for u, v in zip(tails, heads):
+        key = u * n + v if u < v else v * n + u
+        counts[key] = counts.get(key, 0) + 1
+
+    # Loops and repeated edges; a repeat may be fixed by the time it is popped
+    num_edges = len(tails)
+    pending = [e for e, (u, v) in enumerate(zip(tails, heads)) if u == v or counts[u * n + v if u < v else v * n + u] > 1]
+    # Swaps tried before giving up on these stubs; sparse graphs need a handful per bad edge
+    attempts = SWAP_ATTEMPTS_PER_EDGE * num_edges
+    while pending:
+        e = pending.pop()
+        u, v = tails[e], heads[e]
+        if u != v and counts[u * n + v if u < v else v * n + u] == 1:
+            continue
+        # Swap heads with a random edge so that both new edges are new and not loops
+        while True:
+            if attempts <= 0:
+                return None
+            attempts -= 1
+            f = int(rng.random() * num_edges)
+            a, b, c, d = tails[e], heads[e], tails[f], heads[f]
+            if a == d or c == b or f == e:
+                continue
+            first = a * n + d if a < d else d * n + a
+            second = c * n + b if c < b else b * n + c
+            if first == second or counts.get(first) or counts.get(second):
+                continue
+            for key in (a * n + b if a < b else b * n + a, c * n + d if c < d else d * n + c):
+                counts[key] -= 1
+            counts[first] = 1
+            counts[second] = 1
+            heads[e], heads[f] = d, b
+            break
+    return tails, heads
+
+
+def power_law(num_vertices: int, edges_per_vertex: int = 2, seed: int = 0) -> ConflictGraph:
+    """A Barabasi-Albert graph: each new philosopher shares forks with edges_per_vertex earlier ones,
+    chosen in proportion to their degree, so a few hubs need very many forks."""
+    m = edges_per_vertex
+    if not 1 <= m < num_vertices:
+        raise ValueError(f"need 1 <= edges per vertex < {num_vertices}")
+    rng = random.Random(seed)
+    tails, heads = array("i"), array("i")
+    # Every vertex appears once per edge end, so a uniform pick is a pick by degree
+    repeated: List[int] = []
+    targets = list(range(m))
+    for source in range(m, num_vertices):
+        for target in targets:
+            tails.append(source)
+            heads.append(target)
+        repeated.extend(targets)
+        repeated.extend([source] * m)
+        chosen = set()
+        size = len(repeated)
+        while len(chosen) < m:
+            chosen.add(repeated[int(rng.random() * size)])
+        targets = sorted(chosen)
+    return ConflictGraph(num_vertices, tails, heads, "power-law")
+
+
+def load_graph(path: str) -> ConflictGraph:
+    """Read a graph from lines of "tail head" vertex ids; blank lines and # comments are skipped."""
+    tails, heads = array("i"), array("i")
+    with open(path, "r", encoding="utf-8") as fh:
+        for number, line in enumerate(fh, 1):
+            fields = line.split("#", 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) != 2:
+                raise ValueError(f"{path}:{number}: expected two vertex ids, got {line.strip()!r}")
+            tails.append(int(fields[0]))
+            heads.append(int(fields[1]))
+    num_vertices = max(max(tails, default=-1), max(heads, default=-1)) + 1
+    return ConflictGraph(num_vertices, tails, heads, path)
+
+
+def save_graph(graph: ConflictGraph, path: str):
+    """Write graph in the format load_graph() reads."""
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(f"# {graph.describe()}\n")
+        fh.writelines(f"{u} {v}\n" for u, v in zip(graph.tails, graph.heads))
+
+
+GENERATORS = ("ring", "grid", "random-regular", "power-law")
+
+# What examples accept as their graph argument: see make_graph()
+GraphSpec = Union[None, str, ConflictGraph]
+
+
+def make_graph(spec: GraphSpec, num_vertices: int, seed: int = 0) -> ConflictGraph:
+    """Return the conflict graph for a spec.
+
+    spec is a ConflictGraph, None for the ring, a generator name with an
+    optional parameter ("grid:COLUMNS", "random-regular:DEGREE",
+    "power-law:EDGES_PER_VERTEX"), or the path of an edge-list file.
+    """
+    if isinstance(spec, ConflictGraph):
+        return spec
+    if spec is None:
+        return ring(num_vertices)
+    kind, _, parameter = spec.partition(":")
+    if kind not in GENERATORS:
+        return load_graph(spec)
+    try:
+        value = int(parameter) if parameter else None
+    except ValueError:
+        raise ValueError(f"invalid graph parameter in {spec!r}, expected an integer") from None
+    if kind == "ring":
+        return ring(num_vertices)
+    if kind == "grid":
+        return grid(num_vertices, value)
+    if kind == "random-regular":
+        return random_regular(num_vertices, value or 3, seed)
+    return power_law(num_vertices, value or 2, seed)
+
+
+def simple_edges(graph: ConflictGraph) -> List[Tuple[int, int]]:
+    """Return the distinct edges (u, v), u < v, of graph, without self-loops."""
+    return sorted({(u, v) if u < v else (v, u) for u, v in zip(graph.tails, graph.heads) if u != v})
+
+
+def neighbour_lists(graph: ConflictGraph) -> List[Tuple[int, ...]]:
+    """Return, for every vertex, the other vertices it shares an edge with, once each."""
+    return [tuple(dict.fromkeys(other for other in graph.neighbours(v) if other != v)) for v in range(graph.num_vertices)]
+
+
+def greedy_coloring(graph: ConflictGraph) -> array:
+    """Color vertices in order with the smallest color no earlier neighbour has."""
+    colors = array("i", bytes(4 * graph.num_vertices))
+    offsets, adjacent = graph.offsets, graph.adjacent
+    for vertex in range(graph.num_vertices):
+        taken = {colors[other] for other in adjacent[offsets[vertex] : offsets[vertex + 1]] if other < vertex}
+        color = 0
+        while color in taken:
+            color += 1
+        colors[vertex] = color
+    return colors
+
+
+if __name__ == "__main__":
+    import time
+
+    for kind in GENERATORS:
+        started = time.perf_counter()
+        graph = make_graph(kind, 100000)
+        print(f"{graph.describe():<60}  built in {time.perf_counter() - started:.3f}s")
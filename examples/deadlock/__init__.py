@@ -3,16 +3,43 @@ Deadlock package - Contains the original problem and various solutions.
 Includes the classic dining philosophers problem and multiple fix implementations.
 """
 
-from .deadlock_problem import DeadlockExample
-from .deadlock_fix_resource_ordering import DeadlockFixResourceOrdering
-from .deadlock_fix_timeout import DeadlockFixTimeout
-from .deadlock_fix_asymmetric_behavior import DeadlockFixAsymmetricBehavior
-from .deadlock_fix_waiter import DeadlockFixWaiter
+from typing import TYPE_CHECKING
 
-__all__ = [
-    "DeadlockExample",
-    "DeadlockFixResourceOrdering",
-    "DeadlockFixTimeout",
-    "DeadlockFixAsymmetricBehavior",
-    "DeadlockFixWaiter",
-]
+from ..registry import lazy_attributes
+
+if TYPE_CHECKING:
+    from .deadlock_problem import DeadlockExample  # noqa: F401
+    from .deadlock_fix_resource_ordering import DeadlockFixResourceOrdering  # noqa: F401
+    from .deadlock_fix_timeout import DeadlockFixTimeout  # noqa: F401
+    from .deadlock_fix_asymmetric_behavior import DeadlockFixAsymmetricBehavior  # noqa: F401
+    from .deadlock_fix_waiter import DeadlockFixWaiter, DeadlockFixWaiterPolling  # noqa: F401
+    from .deadlock_fix_chandy_misra import DeadlockFixChandyMisra  # noqa: F401
+    from .deadlock_fix_semaphore import DeadlockFixSemaphore  # noqa: F401
+    from .deadlock_backends import (  # noqa: F401
+        DeadlockFixResourceOrderingProcess,
+        DeadlockFixTimeoutProcess,
+        DeadlockFixAsymmetricBehaviorProcess,
+        DeadlockFixSemaphoreProcess,
+        DeadlockFixResourceOrderingAsyncio,
+    )
+
+# Exported class name -> module that defines it (imported on first access)
+_EXPORTS = {
+    "DeadlockExample": ".deadlock_problem",
+    "DeadlockFixResourceOrdering": ".deadlock_fix_resource_ordering",
+    "DeadlockFixTimeout": ".deadlock_fix_timeout",
+    "DeadlockFixAsymmetricBehavior": ".deadlock_fix_asymmetric_behavior",
+    "DeadlockFixWaiter": ".deadlock_fix_waiter",
+    "DeadlockFixWaiterPolling": ".deadlock_fix_waiter",
+    "DeadlockFixChandyMisra": ".deadlock_fix_chandy_misra",
+    "DeadlockFixSemaphore": ".deadlock_fix_semaphore",
+    "DeadlockFixResourceOrderingProcess": ".deadlock_backends",
+    "DeadlockFixTimeoutProcess": ".deadlock_backends",
+    "DeadlockFixAsymmetricBehaviorProcess": ".deadlock_backends",
+    "DeadlockFixSemaphoreProcess": ".deadlock_backends",
+    "DeadlockFixResourceOrderingAsyncio": ".deadlock_backends",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_attributes(__name__, _EXPORTS)
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Deadlock Backends - Philosophers on Processes and asyncio
+Deadlock fixes with philosophers sharded over processes, or as tasks on one
+event loop sharing asyncio.Lock forks. Timings match the thread examples, so
+the backends can be compared on the same workload.
+
+On the process backend forks are multiprocessing.Lock (a POSIX semaphore in
+shared memory) and each process runs a contiguous shard of philosophers, one
+thread each, so neighbours in different shards contend across processes.
+Meal counters live in a shared-memory array (SharedCounters) rather than a
+Manager proxy: each philosopher increments its own slot, and the parent
+reads per-process throughput from it without any round trip. Resource
+ordering, timeout, asymmetric and seat-limiting fixes have process versions.
+
+Run "python3 -m examples.deadlock.deadlock_backends" for the cost of a
+cross-process lock against a threading one, and the meals of each fix on
+threads against processes.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from ..common.backends import ProcessGroup, SharedCounters, measure_lock_overhead, require_real_clock, run_tasks, shard
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
+# How the philosophers of a process example pick up their forks
+ORDERING = "ordering"
+TIMEOUT = "timeout"
+ASYMMETRIC = "asymmetric"
+SEATS = "seats"
+
+
+def _pick_up(philosopher_id: int, num_philosophers: int, strategy: str):
+    """Return the ids of philosopher_id's forks in the order the strategy picks them up."""
+    left_fork = philosopher_id
+    right_fork = (philosopher_id + 1) % num_philosophers
+    if strategy == ORDERING:
+        return min(left_fork, right_fork), max(left_fork, right_fork)
+    if strategy == ASYMMETRIC and philosopher_id % 2 == 0:
+        return right_fork, left_fork
+    return left_fork, right_fork
+
+
+def _philosopher(philosopher_id: int, stop, metrics: WorkMetrics, meals: SharedCounters, forks: list, strategy: str, seats):
+    """Philosopher loop run on a thread of a shard process."""
+    first_fork, second_fork = _pick_up(philosopher_id, len(forks), strategy)
+    first, second = forks[first_fork], forks[second_fork]
+
+    log.debug("Philosopher %s starting...", philosopher_id)
+
+    while not stop.is_set():
+        log.debug("Philosopher %s thinking...", philosopher_id)
+        time.sleep(0.1)
+        hungry_at = time.perf_counter()
+
+        if seats is not None:
+            log.debug("Philosopher %s waiting for a seat", philosopher_id)
+            seats.acquire()
+
+        if strategy == TIMEOUT:
+            # The fixed retry policy of DeadlockFixTimeout: 0.1 s per fork, 0.05 s back-off
+            while not stop.is_set():
+                if not first.acquire(timeout=0.1):
+                    metrics.tally("timeouts", philosopher_id)
+                    continue
+                if second.acquire(timeout=0.1):
+                    break
+                metrics.tally("timeouts", philosopher_id)
+                metrics.tally("wasted acquisitions", philosopher_id)
+                first.release()
+                time.sleep(0.05)
+            else:
+                break
+        else:
+            log.debug("Philosopher %s picking up fork %s first", philosopher_id, first_fork)
+            first.acquire()
+            log.debug("Philosopher %s picking up fork %s second", philosopher_id, second_fork)
+            second.acquire()
+
+        waited = time.perf_counter() - hungry_at
+        log.info("Philosopher %s eating...", philosopher_id)
+        time.sleep(0.2)
+
+        log.debug("Philosopher %s putting down forks", philosopher_id)
+        second.release()
+        first.release()
+        if seats is not None:
+            seats.release()
+        metrics.record(waited, philosopher_id)
+        meals.increment(philosopher_id)
+
+        time.sleep(0.1)
+
+
+def _shard_process(shard_id: int, stop, metrics: WorkMetrics, philosophers: range, meals: SharedCounters, forks: list, strategy: str, seats):
+    """Run one shard of philosophers on threads of this process until stop is set."""
+    threads = [
+        threading.Thread(target=_philosopher, args=(i, stop, metrics, meals, forks, strategy, seats), name=f"philosopher-{i}", daemon=True)
+        for i in philosophers
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        stop.wait()
+        for thread in threads:
+            thread.join(timeout=1.0)
+    finally:
+        meals.close()
+
+
+class _ShardedDeadlockFix:
+    """A deadlock fix with philosophers sharded over processes, one thread each.
+
+    Subclasses set the title and fork strategy. num_processes defaults to one
+    per CPU; with num_processes equal to num_philosophers every philosopher
+    has a process of its own.
+    """
+
+    title = ""
+    strategy = ORDERING
+
+    def __init__(self, num_philosophers: int = 5, num_processes: Optional[int] = None, clock=None):
+        self.clock = require_real_clock(clock, "process")
+        self.num_philosophers = num_philosophers
+        self.shards = shard(num_philosophers, num_processes or os.cpu_count() or 1)
+        self.num_processes = len(self.shards)
+        self.group = ProcessGroup()
+        self.forks = [self.group.context.Lock() for _ in range(num_philosophers)]
+        # FIX (seat-limiting only): one seat fewer than philosophers
+        self.seats = self.group.context.Semaphore(max(1, num_philosophers - 1)) if self.strategy == SEATS else None
+        self.metrics = WorkMetrics("meals")
+        # Meals per philosopher, read from shared memory when the run ends
+        self.meals: List[int] = []
+
+    def shard_throughput(self, elapsed: float) -> List[float]:
+        """Meals per second of each process."""
+        return [sum(self.meals[i] for i in philosophers) / elapsed for philosophers in self.shards]
+
+    def run(self, duration: int = 5):
+        """Run the fix with philosophers sharded over processes."""
+        print(f"\n=== DEADLOCK FIX: {self.title} (process backend) ===")
+        print(f"Running for {duration} seconds...")
+        print(f"{self.num_philosophers} philosophers in {self.num_processes} processes, sharing multiprocessing.Lock forks.\n")
+
+        meals = SharedCounters(self.num_philosophers)
+        try:
+            started = time.perf_counter()
+            for shard_id, philosophers in enumerate(self.shards):
+                self.group.start(_shard_process, shard_id, philosophers, meals, self.forks, self.strategy, self.seats)
+
+            time.sleep(duration)
+
+            log.flush()
+            print("\nStopping philosophers...")
+            self.group.stop_and_collect(self.metrics)
+            elapsed = time.perf_counter() - started
+            self.meals = meals.tolist()
+        finally:
+            meals.unlink()
+
+        for shard_id, (philosophers, throughput) in enumerate(zip(self.shards, self.shard_throughput(elapsed))):
+            print(f"Process {shard_id} (philosophers {philosophers.start}-{philosophers.stop - 1}): {throughput:.2f} meals/s")
+        print(f"{self.title} fix example completed.\n")
+
+
+class DeadlockFixResourceOrderingProcess(_ShardedDeadlockFix):
+    """Resource ordering with philosophers sharded over processes."""
+
+    title = "Resource Ordering"
+    strategy = ORDERING
+
+
+class DeadlockFixTimeoutProcess(_ShardedDeadlockFix):
+    """The timeout fix, with the fixed retry policy, sharded over processes."""
+
+    title = "Timeout Mechanism"
+    strategy = TIMEOUT
+
+
+class DeadlockFixAsymmetricBehaviorProcess(_ShardedDeadlockFix):
+    """The asymmetric fix, even philosophers taking the right fork first, sharded over processes."""
+
+    title = "Asymmetric Behavior"
+    strategy = ASYMMETRIC
+
+
+class DeadlockFixSemaphoreProcess(_ShardedDeadlockFix):
+    """The seat-limiting fix, with a multiprocessing.Semaphore of N-1 seats, sharded over processes."""
+
+    title = "Seat-Limiting Semaphore"
+    strategy = SEATS
+
+
+class DeadlockFixResourceOrderingAsyncio:
+    """Resource ordering with one asyncio task per philosopher."""
+
+    def __init__(self, num_philosophers: int = 5, clock=None):
+        self.clock = require_real_clock(clock, "asyncio")
+        self.num_philosophers = num_philosophers
+        self.metrics = WorkMetrics("meals")
+
+    async def philosopher(self, philosopher_id: int, forks: list, stop: asyncio.Event):
+        """Philosopher coroutine that picks up the lower-numbered fork first."""
+        first_fork = min(philosopher_id, (philosopher_id + 1) % self.num_philosophers)
+        second_fork = max(philosopher_id, (philosopher_id + 1) % self.num_philosophers)
+
+        log.debug("Philosopher %s starting...", philosopher_id)
+
+        while not stop.is_set():
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            await asyncio.sleep(0.1)
+            hungry_at = time.perf_counter()
+
+            log.debug("Philosopher %s picking up fork %s first (lower-numbered)", philosopher_id, first_fork)
+            await forks[first_fork].acquire()
+            log.debug("Philosopher %s picking up fork %s second", philosopher_id, second_fork)
+            await forks[second_fork].acquire()
+
+            waited = time.perf_counter() - hungry_at
+            log.info("Philosopher %s eating...", philosopher_id)
+            await asyncio.sleep(0.2)
+
+            log.debug("Philosopher %s putting down forks", philosopher_id)
+            forks[second_fork].release()
+            forks[first_fork].release()
+            self.metrics.record(waited, philosopher_id)
+
+            await asyncio.sleep(0.1)
+
+    async def main(self, duration: float):
+        # asyncio primitives are created inside the loop that uses them
+        forks = [asyncio.Lock() for _ in range(self.num_philosophers)]
+        stop = asyncio.Event()
+        await run_tasks([self.philosopher(i, forks, stop) for i in range(self.num_philosophers)], duration, stop)
+
+    def run(self, duration: int = 5):
+        """Run the resource ordering fix with asyncio philosophers."""
+        print("\n=== DEADLOCK FIX: Resource Ordering (asyncio backend) ===")
+        print(f"Running for {duration} seconds...")
+        print("Philosophers are tasks on one event loop sharing asyncio.Lock forks.\n")
+
+        asyncio.run(self.main(duration))
+
+        log.flush()
+        print("Resource ordering fix example completed.\n")
+
+
+PROCESS_EXAMPLES = ("deadlock-fix-resource-ordering", "deadlock-fix-timeout", "deadlock-fix-asymmetric-behavior", "deadlock-fix-semaphore")
+
+
+def compare_backends(
+    names: Sequence[str] = PROCESS_EXAMPLES,
+    num_philosophers: int = 20,
+    processes: Sequence[int] = (1, 4),
+    duration: float = 5.0,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Run each example on threads, then sharded over each number of processes; return one row per run."""
+    # Deferred: the benchmark runner imports the example registry
+    from ..common.bench import run_once
+
+    runs = []
+    for name in names:
+        runs.append((name, "thread", run_once(name, duration, seed, "real", num_philosophers=num_philosophers)))
+        for count in processes:
+            run = run_once(name, duration, seed, "real", "process", num_philosophers=num_philosophers, num_processes=count)
+            runs.append((name, f"process x{count}", run))
+    rows = []
+    for name, backend, (metrics, elapsed) in runs:
+        if metrics is None:
+            raise ValueError(f"example {name!r} has no metrics attribute")
+        summary = metrics.summary(elapsed)
+        rows.append(
+            {
+                "example": name,
+                "backend": backend,
+                "meals": summary["throughput"],
+                "p99": summary["latency"]["p99"],
+                "max": summary["latency"]["max"],
+            }
+        )
+    return rows
+
+
+def format_backend_comparison(rows: List[Dict[str, Any]]) -> str:
+    """Render compare_backends() rows, with the process throughput relative to threads."""
+    width = max([len("example")] + [len(str(row["example"])) for row in rows])
+    lines = [f"{'example':<{width}}  {'backend':<12}  {'meals/s':>9}  {'vs thread':>9}  {'p99 wait':>9}  {'max wait':>9}"]
+    threaded: Dict[object, float] = {}
+    for row in rows:
+        if row["backend"] == "thread":
+            threaded[row["example"]] = row["meals"]
+        base = threaded.get(row["example"])
+        relative = f"{row['meals'] / base - 1:+.1%}" if base else "-"
+        lines.append(
+            f"{row['example']:<{width}}  {row['backend']:<12}  {row['meals']:>9.2f}  {relative:>9}  {row['p99']:>8.3f}s  {row['max']:>8.3f}s"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(f"Lock acquire/release, {os.cpu_count()} CPUs:")
+    for name, cost in measure_lock_overhead().items():
+        print(f"  {name:<36} {cost:>10.0f} ns")
+    print()
+    print(format_backend_comparison(compare_backends()))
@@ -2,58 +2,65 @@
 """
 Deadlock Fix - Asymmetric Behavior
 Fixes deadlock by making some philosophers pick up right fork first.
+
+On a conflict graph other than the ring, even philosophers reverse their
+fork order. That breaks the ring's one cycle but not necessarily every
+cycle of the graph, so this fix is only guaranteed on rings.
 """
 
-import threading
-import time
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.topology import GraphSpec, make_graph
 
 
 class DeadlockFixAsymmetricBehavior:
     """Fixes deadlock by using asymmetric behavior for different philosophers."""
 
-    def __init__(self, num_philosophers: int = 5):
-        self.num_philosophers = num_philosophers
-        self.forks = [threading.Lock() for _ in range(num_philosophers)]
+    def __init__(self, num_philosophers: int = 5, graph: GraphSpec = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.graph = make_graph(graph, num_philosophers)
+        self.num_philosophers = self.graph.num_vertices
+        self.forks = [self.clock.Lock(f"fork-{i}") for i in range(self.graph.num_edges)]
         self.philosophers = []
         self.running = True
+        self.metrics = WorkMetrics("meals")
 
     def philosopher(self, philosopher_id: int):
         """Philosopher function that avoids deadlock through asymmetric behavior."""
-        left_fork = philosopher_id
-        right_fork = (philosopher_id + 1) % self.num_philosophers
-
-        print(f"Philosopher {philosopher_id} starting...")
+        fork_ids = self.graph.forks(philosopher_id)
 
-        while self.running:
-            print(f"Philosopher {philosopher_id} thinking...")
-            time.sleep(0.1)
+        # FIX: Asymmetric behavior - even philosophers pick up right fork first
+        if philosopher_id % 2 == 0:
+            # Even philosophers: right fork first, then left fork
+            fork_ids = fork_ids[::-1]
+            order = "right-then-left"
+        else:
+            # Odd philosophers: left fork first, then right fork (original behavior)
+            order = "left-then-right"
+        forks = [self.forks[fork_id] for fork_id in fork_ids]
 
-            # FIX: Asymmetric behavior - even philosophers pick up right fork first
-            if philosopher_id % 2 == 0:
-                # Even philosophers: right fork first, then left fork
-                first_fork = right_fork
-                second_fork = left_fork
-                order = "right-then-left"
-            else:
-                # Odd philosophers: left fork first, then right fork (original behavior)
-                first_fork = left_fork
-                second_fork = right_fork
-                order = "left-then-right"
+        log.debug("Philosopher %s starting...", philosopher_id)
 
-            print(f"Philosopher {philosopher_id} ({order}) picking up fork {first_fork} first")
-            self.forks[first_fork].acquire()
+        while self.running:
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            self.clock.sleep(0.1)
+            hungry_at = self.clock.time()
 
-            print(f"Philosopher {philosopher_id} ({order}) picking up fork {second_fork} second")
-            self.forks[second_fork].acquire()
+            for position, (fork_id, fork) in enumerate(zip(fork_ids, forks), 1):
+                log.debug("Philosopher %s (%s) picking up fork %s (%s of %s)", philosopher_id, order, fork_id, position, len(forks))
+                fork.acquire()
 
-            print(f"Philosopher {philosopher_id} eating...")
-            time.sleep(0.2)
+            waited = self.clock.time() - hungry_at
+            log.info("Philosopher %s eating...", philosopher_id)
+            self.clock.sleep(0.2)
 
-            print(f"Philosopher {philosopher_id} putting down forks")
-            self.forks[second_fork].release()
-            self.forks[first_fork].release()
+            log.debug("Philosopher %s putting down forks", philosopher_id)
+            for fork in reversed(forks):
+                fork.release()
+            self.metrics.record(waited, philosopher_id)
 
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
 
     def run(self, duration: int = 5):
         """Run the asymmetric behavior fix example."""
@@ -65,18 +72,20 @@ class DeadlockFixAsymmetricBehavior:
 
         # Start philosophers
         for i in range(self.num_philosophers):
-            thread = threading.Thread(target=self.philosopher, args=(i,))
+            thread = self.clock.Thread(target=self.philosopher, args=(i,), name=f"philosopher-{i}")
             thread.daemon = True
             thread.start()
             self.philosophers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping philosophers...")
         for thread in self.philosophers:
             thread.join(timeout=1.0)
+        log.flush()
         print("Asymmetric behavior fix example completed.\n")
 
 
@@ -2,50 +2,51 @@
 """
 Deadlock Fix - Resource Ordering
 Fixes deadlock by always acquiring resources in a consistent order.
+The order is global, so this holds on any conflict graph, not just the ring.
 """
 
-import threading
-import time
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.multilock import LockSet, rank_by_position
+from ..common.topology import GraphSpec, make_graph
 
 
 class DeadlockFixResourceOrdering:
     """Fixes deadlock by always picking up lower-numbered fork first."""
 
-    def __init__(self, num_philosophers: int = 5):
-        self.num_philosophers = num_philosophers
-        self.forks = [threading.Lock() for _ in range(num_philosophers)]
+    def __init__(self, num_philosophers: int = 5, graph: GraphSpec = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.graph = make_graph(graph, num_philosophers)
+        self.num_philosophers = self.graph.num_vertices
+        self.forks = [self.clock.Lock(f"fork-{i}") for i in range(self.graph.num_edges)]
+        self.fork_rank = rank_by_position(self.forks)
         self.philosophers = []
         self.running = True
+        self.metrics = WorkMetrics("meals")
 
     def philosopher(self, philosopher_id: int):
         """Philosopher function that avoids deadlock through resource ordering."""
-        left_fork = philosopher_id
-        right_fork = (philosopher_id + 1) % self.num_philosophers
+        fork_ids = self.graph.forks(philosopher_id)
+        # FIX: Always pick up lower-numbered fork first; the set is ranked by fork number
+        forks = LockSet([self.forks[fork_id] for fork_id in fork_ids], key=self.fork_rank, clock=self.clock)
 
-        print(f"Philosopher {philosopher_id} starting...")
+        log.debug("Philosopher %s starting...", philosopher_id)
 
         while self.running:
-            print(f"Philosopher {philosopher_id} thinking...")
-            time.sleep(0.1)
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            self.clock.sleep(0.1)
+            hungry_at = self.clock.time()
 
-            # FIX: Always pick up lower-numbered fork first
-            first_fork = min(left_fork, right_fork)
-            second_fork = max(left_fork, right_fork)
+            log.debug("Philosopher %s picking up fork %s first (lower-numbered)", philosopher_id, min(fork_ids))
+            with forks:
+                waited = self.clock.time() - hungry_at
+                log.info("Philosopher %s eating...", philosopher_id)
+                self.clock.sleep(0.2)
+                log.debug("Philosopher %s putting down forks", philosopher_id)
+            self.metrics.record(waited, philosopher_id)
 
-            print(f"Philosopher {philosopher_id} picking up fork {first_fork} first (lower-numbered)")
-            self.forks[first_fork].acquire()
-
-            print(f"Philosopher {philosopher_id} picking up fork {second_fork} second")
-            self.forks[second_fork].acquire()
-
-            print(f"Philosopher {philosopher_id} eating...")
-            time.sleep(0.2)
-
-            print(f"Philosopher {philosopher_id} putting down forks")
-            self.forks[second_fork].release()
-            self.forks[first_fork].release()
-
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
 
     def run(self, duration: int = 5):
         """Run the resource ordering fix example."""
@@ -55,18 +56,20 @@ class DeadlockFixResourceOrdering:
 
         # Start philosophers
         for i in range(self.num_philosophers):
-            thread = threading.Thread(target=self.philosopher, args=(i,))
+            thread = self.clock.Thread(target=self.philosopher, args=(i,), name=f"philosopher-{i}")
             thread.daemon = True
             thread.start()
             self.philosophers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping philosophers...")
         for thread in self.philosophers:
             thread.join(timeout=1.0)
+        log.flush()
         print("Resource ordering fix example completed.\n")
 
 
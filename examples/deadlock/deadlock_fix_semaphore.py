@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Deadlock Fix - Seat-Limiting Semaphore
+Fixes deadlock by letting at most N-1 philosophers sit at the table at once.
+A deadlock needs every philosopher holding one fork; with one seat always
+empty, some seated philosopher can always get both forks. Philosophers still
+take the left fork first, exactly as in the problem example.
+
+On other conflict graphs a shorter cycle of philosophers can still deadlock
+with a seat to spare, so N-1 seats are only a guarantee on rings.
+"""
+
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.topology import GraphSpec, make_graph
+
+
+class DeadlockFixSemaphore:
+    """Fixes deadlock by admitting at most N-1 philosophers through a semaphore."""
+
+    def __init__(self, num_philosophers: int = 5, graph: GraphSpec = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.graph = make_graph(graph, num_philosophers)
+        self.num_philosophers = self.graph.num_vertices
+        self.forks = [self.clock.Lock(f"fork-{i}") for i in range(self.graph.num_edges)]
+        # FIX: One seat fewer than philosophers
+        self.seats = self.clock.Semaphore(max(1, self.num_philosophers - 1))
+        self.philosophers = []
+        self.running = True
+        self.metrics = WorkMetrics("meals")
+
+    def philosopher(self, philosopher_id: int):
+        """Philosopher function that sits down before picking up forks."""
+        fork_ids = self.graph.forks(philosopher_id)
+        forks = [self.forks[fork_id] for fork_id in fork_ids]
+
+        log.debug("Philosopher %s starting...", philosopher_id)
+
+        while self.running:
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            self.clock.sleep(0.1)
+            hungry_at = self.clock.time()
+
+            # FIX: Wait for a free seat; at most N-1 philosophers reach for forks
+            log.debug("Philosopher %s waiting for a seat", philosopher_id)
+            self.seats.acquire()
+
+            for fork_id, fork in zip(fork_ids, forks):
+                log.debug("Philosopher %s picking up fork %s", philosopher_id, fork_id)
+                fork.acquire()
+
+            waited = self.clock.time() - hungry_at
+            log.info("Philosopher %s eating...", philosopher_id)
+            self.clock.sleep(0.2)
+
+            log.debug("Philosopher %s putting down forks and leaving the table", philosopher_id)
+            for fork in reversed(forks):
+                fork.release()
+            self.seats.release()
+            self.metrics.record(waited, philosopher_id)
+
+            self.clock.sleep(0.1)
+
+    def run(self, duration: int = 5):
+        """Run the seat-limiting semaphore fix example."""
+        print("\n=== DEADLOCK FIX: Seat-Limiting Semaphore ===")
+        print(f"Running for {duration} seconds...")
+        print(f"This should NOT result in deadlock: only {max(1, self.num_philosophers - 1)} of {self.num_philosophers} philosophers may sit!\n")
+
+        # Start philosophers
+        for i in range(self.num_philosophers):
+            thread = self.clock.Thread(target=self.philosopher, args=(i,), name=f"philosopher-{i}")
+            thread.daemon = True
+            thread.start()
+            self.philosophers.append(thread)
+
+        # Let it run for a while
+        self.clock.sleep(duration)
+        self.running = False
+
+        log.flush()
+        print("\nStopping philosophers...")
+        for thread in self.philosophers:
+            thread.join(timeout=1.0)
+        log.flush()
+        print("Semaphore fix example completed.\n")
+
+
+if __name__ == "__main__":
+    # Allow running this file directly for testing
+    example = DeadlockFixSemaphore()
+    example.run(5)
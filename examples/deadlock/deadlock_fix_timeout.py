@@ -2,83 +2,127 @@
 """
 Deadlock Fix - Timeout Mechanism
 Fixes deadlock by using timeouts and retry logic when acquiring resources.
+
+How long to wait for each fork and how long to back off after giving up
+come from a retry policy (see examples.common.retry): fixed by default, or
+exponential, full-jitter, decorrelated-jitter or adaptive. Forks given back
+unused are counted as wasted acquisitions.
+
+On a conflict graph other than the ring a philosopher may need more than
+two forks; it takes them in order and gives back every fork it holds when
+one times out.
 """
 
-import threading
-import time
+from typing import Union
+
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.retry import RetryPolicy, make_retry_policy
+from ..common.topology import GraphSpec, make_graph
 
 
 class DeadlockFixTimeout:
     """Fixes deadlock by using timeouts and retry logic."""
 
-    def __init__(self, num_philosophers: int = 5):
-        self.num_philosophers = num_philosophers
-        self.forks = [threading.Lock() for _ in range(num_philosophers)]
+    def __init__(self, num_philosophers: int = 5, retry_policy: Union[str, RetryPolicy] = "fixed", graph: GraphSpec = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.graph = make_graph(graph, num_philosophers)
+        self.num_philosophers = self.graph.num_vertices
+        self.forks = [self.clock.Lock(f"fork-{i}") for i in range(self.graph.num_edges)]
+        self.retry_policy = make_retry_policy(retry_policy, self.graph.num_edges)
         self.philosophers = []
         self.running = True
+        self.metrics = WorkMetrics("meals")
 
     def philosopher(self, philosopher_id: int):
         """Philosopher function that avoids deadlock through timeout and retry."""
-        left_fork = philosopher_id
-        right_fork = (philosopher_id + 1) % self.num_philosophers
+        fork_ids = self.graph.forks(philosopher_id)
+        forks = [self.forks[fork_id] for fork_id in fork_ids]
+        # When each held fork was picked up, for the policy's hold times
+        taken_at = [0.0] * len(forks)
+        policy = self.retry_policy
 
-        print(f"Philosopher {philosopher_id} starting...")
+        log.debug("Philosopher %s starting...", philosopher_id)
 
         while self.running:
-            print(f"Philosopher {philosopher_id} thinking...")
-            time.sleep(0.1)
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            self.clock.sleep(0.1)
+            hungry_at = self.clock.time()
 
             # FIX: Use timeout and retry logic
+            attempt, delay = 0, 0.0
             while self.running:
-                # Try to get left fork with timeout
-                if not self.forks[left_fork].acquire(timeout=0.1):
-                    print(f"Philosopher {philosopher_id}: Left fork {left_fork} not " f"available, retrying...")
-                    continue
-
-                print(f"Philosopher {philosopher_id} got left fork {left_fork}")
-
-                # Try to get right fork with timeout
-                if not self.forks[right_fork].acquire(timeout=0.1):
-                    print(f"Philosopher {philosopher_id}: Right fork {right_fork} not " f"available, releasing left fork and retrying...")
-                    self.forks[left_fork].release()
-                    time.sleep(0.05)  # Small delay before retry
+                held = 0
+                for fork_id, fork in zip(fork_ids, forks):
+                    # Try to get the next fork with timeout
+                    if not fork.acquire(timeout=policy.timeout(fork_id)):
+                        break
+                    taken_at[held] = self.clock.time()
+                    held += 1
+                    log.debug("Philosopher %s got fork %s", philosopher_id, fork_id)
+                else:
+                    break  # Successfully got every fork
+
+                missing = fork_ids[held]
+                self.metrics.tally("timeouts", philosopher_id)
+                if not held:
+                    log.debug("Philosopher %s: Fork %s not available, retrying...", philosopher_id, missing)
                     continue
 
-                print(f"Philosopher {philosopher_id} got right fork {right_fork}")
-                break  # Successfully got both forks
+                log.debug("Philosopher %s: Fork %s not available, releasing %s forks and retrying...", philosopher_id, missing, held)
+                self.metrics.tally("wasted acquisitions", philosopher_id, held)
+                released_at = self.clock.time()
+                for k in reversed(range(held)):
+                    policy.observe(fork_ids[k], released_at - taken_at[k])
+                    forks[k].release()
+                attempt += 1
+                delay = policy.delay(missing, attempt, delay)
+                self.clock.sleep(delay)  # Back off before retry
 
             if not self.running:
                 break
 
-            print(f"Philosopher {philosopher_id} eating...")
-            time.sleep(0.2)
+            waited = self.clock.time() - hungry_at
+            log.info("Philosopher %s eating...", philosopher_id)
+            self.clock.sleep(0.2)
 
-            print(f"Philosopher {philosopher_id} putting down forks")
-            self.forks[right_fork].release()
-            self.forks[left_fork].release()
+            log.debug("Philosopher %s putting down forks", philosopher_id)
+            released_at = self.clock.time()
+            for k in reversed(range(len(forks))):
+                policy.observe(fork_ids[k], released_at - taken_at[k])
+                forks[k].release()
+            self.metrics.record(waited, philosopher_id)
 
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
 
     def run(self, duration: int = 5):
         """Run the timeout fix example."""
         print("\n=== DEADLOCK FIX: Timeout Mechanism ===")
         print(f"Running for {duration} seconds...")
-        print("This should NOT result in deadlock due to timeout and retry logic!\n")
+        print("This should NOT result in deadlock due to timeout and retry logic!")
+        print(f"Retry policy: {self.retry_policy.name}\n")
 
         # Start philosophers
         for i in range(self.num_philosophers):
-            thread = threading.Thread(target=self.philosopher, args=(i,))
+            thread = self.clock.Thread(target=self.philosopher, args=(i,), name=f"philosopher-{i}")
             thread.daemon = True
             thread.start()
             self.philosophers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping philosophers...")
         for thread in self.philosophers:
             thread.join(timeout=1.0)
+        log.flush()
+        print(
+            f"{self.metrics.count} meals, {self.metrics.event_count('wasted acquisitions')} forks given back unused, "
+            f"{self.metrics.event_count('timeouts')} timed-out acquisitions"
+        )
         print("Timeout fix example completed.\n")
 
 
@@ -2,43 +2,162 @@
 """
 Deadlock Fix - Waiter Solution
 Fixes deadlock by using a central waiter to coordinate fork allocation.
+DeadlockFixWaiter is a monitor with a condition variable per philosopher;
+DeadlockFixWaiterPolling is the original version, where refused philosophers
+ask again every 100 ms.
+
+On any conflict graph the waiter lets a philosopher eat only when none of
+its neighbours is eating, so both fixes hold on every graph.
 """
 
-import threading
-import time
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.topology import GraphSpec, make_graph, neighbour_lists
 
 
 class DeadlockFixWaiter:
-    """Fixes deadlock by using a central waiter to coordinate fork allocation."""
+    """Fixes deadlock by using a central waiter to coordinate fork allocation.
+
+    The waiter is a monitor: one lock guarding who is eating, and a condition
+    variable per philosopher on that lock. A refused philosopher waits on its
+    own condition, and a philosopher who finishes wakes exactly those
+    neighbours who are hungry and can now eat.
+    """
+
+    def __init__(self, num_philosophers: int = 5, graph: GraphSpec = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.graph = make_graph(graph, num_philosophers)
+        self.num_philosophers = self.graph.num_vertices
+        self.neighbours = neighbour_lists(self.graph)
+        self.forks = [self.clock.Lock(f"fork-{i}") for i in range(self.graph.num_edges)]
+        self.philosophers = []
+        self.running = True
+        self.metrics = WorkMetrics("meals")
+
+        # Waiter coordination; eating and hungry are indexed by philosopher and guarded by the waiter
+        self.waiter = self.clock.Lock("waiter")
+        self.may_eat = [self.clock.Condition(self.waiter) for _ in range(self.num_philosophers)]
+        self.eating = bytearray(self.num_philosophers)
+        self.hungry = bytearray(self.num_philosophers)
+
+    def can_eat(self, philosopher_id: int) -> bool:
+        """Check if philosopher can eat (no neighbour is eating). Call with the waiter held."""
+        eating = self.eating
+        return not any(eating[neighbour] for neighbour in self.neighbours[philosopher_id])
+
+    def philosopher(self, philosopher_id: int):
+        """Philosopher function that avoids deadlock through waiter coordination."""
+        fork_ids = self.graph.forks(philosopher_id)
+        forks = [self.forks[fork_id] for fork_id in fork_ids]
+        neighbours = self.neighbours[philosopher_id]
+        may_eat = self.may_eat[philosopher_id]
+
+        log.debug("Philosopher %s starting...", philosopher_id)
+
+        while self.running:
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            self.clock.sleep(0.1)
+            hungry_at = self.clock.time()
+
+            # FIX: Ask the waiter, and if refused sleep until a neighbour finishes
+            with self.waiter:
+                self.hungry[philosopher_id] = 1
+                while self.running and not self.can_eat(philosopher_id):
+                    log.debug("Philosopher %s: Waiter says wait, adjacent philosophers are eating", philosopher_id)
+                    may_eat.wait()
+                self.hungry[philosopher_id] = 0
+                if not self.running:
+                    break
+                self.eating[philosopher_id] = 1
+                log.info("Philosopher %s: Waiter approved eating", philosopher_id)
+
+            # Now safely acquire every fork (waiter ensures no conflicts)
+            for fork_id, fork in zip(fork_ids, forks):
+                log.debug("Philosopher %s picking up fork %s", philosopher_id, fork_id)
+                fork.acquire()
+
+            waited = self.clock.time() - hungry_at
+            log.info("Philosopher %s eating...", philosopher_id)
+            self.clock.sleep(0.2)
+
+            log.debug("Philosopher %s putting down forks", philosopher_id)
+            for fork in reversed(forks):
+                fork.release()
+            self.metrics.record(waited, philosopher_id)
+
+            # Tell the waiter we're done; it wakes the neighbours this frees
+            with self.waiter:
+                self.eating[philosopher_id] = 0
+                for neighbour in neighbours:
+                    if self.hungry[neighbour] and self.can_eat(neighbour):
+                        self.may_eat[neighbour].notify()
+                log.debug("Philosopher %s: Notified waiter, done eating", philosopher_id)
+
+            self.clock.sleep(0.1)
+
+    def run(self, duration: int = 5):
+        """Run the waiter fix example."""
+        print("\n=== DEADLOCK FIX: Waiter Solution ===")
+        print(f"Running for {duration} seconds...")
+        print("This should NOT result in deadlock due to waiter coordination!")
+        print("A central waiter ensures no adjacent philosophers eat simultaneously.")
 
-    def __init__(self, num_philosophers: int = 5):
-        self.num_philosophers = num_philosophers
-        self.forks = [threading.Lock() for _ in range(num_philosophers)]
+        # Start philosophers
+        for i in range(self.num_philosophers):
+            thread = self.clock.Thread(target=self.philosopher, args=(i,), name=f"philosopher-{i}")
+            thread.daemon = True
+            thread.start()
+            self.philosophers.append(thread)
+
+        # Let it run for a while
+        self.clock.sleep(duration)
+        with self.waiter:
+            self.running = False
+            for may_eat in self.may_eat:
+                may_eat.notify()
+
+        log.flush()
+        print("\nStopping philosophers...")
+        for thread in self.philosophers:
+            thread.join(timeout=1.0)
+        log.flush()
+        print("Waiter fix example completed.\n")
+
+
+class DeadlockFixWaiterPolling:
+    """The waiter solution with refused philosophers asking again every 100 ms, kept for comparison."""
+
+    def __init__(self, num_philosophers: int = 5, graph: GraphSpec = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.graph = make_graph(graph, num_philosophers)
+        self.num_philosophers = self.graph.num_vertices
+        self.neighbours = neighbour_lists(self.graph)
+        self.forks = [self.clock.Lock(f"fork-{i}") for i in range(self.graph.num_edges)]
         self.philosophers = []
         self.running = True
+        self.metrics = WorkMetrics("meals")
 
         # Waiter coordination
-        self.waiter = threading.Lock()
+        self.waiter = self.clock.Lock("waiter")
         self.eating_philosophers = set()
 
     def can_eat(self, philosopher_id: int):
-        """Check if philosopher can eat (has access to both forks)."""
+        """Check if philosopher can eat (has access to all of its forks)."""
         # Check if adjacent philosophers are eating
-        left_philosopher = (philosopher_id - 1) % self.num_philosophers
-        right_philosopher = (philosopher_id + 1) % self.num_philosophers
-
-        return left_philosopher not in self.eating_philosophers and right_philosopher not in self.eating_philosophers
+        return self.eating_philosophers.isdisjoint(self.neighbours[philosopher_id])
 
     def philosopher(self, philosopher_id: int):
         """Philosopher function that avoids deadlock through waiter coordination."""
-        left_fork = philosopher_id
-        right_fork = (philosopher_id + 1) % self.num_philosophers
+        fork_ids = self.graph.forks(philosopher_id)
+        forks = [self.forks[fork_id] for fork_id in fork_ids]
 
-        print(f"Philosopher {philosopher_id} starting...")
+        log.debug("Philosopher %s starting...", philosopher_id)
 
         while self.running:
-            print(f"Philosopher {philosopher_id} thinking...")
-            time.sleep(0.1)
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            self.clock.sleep(0.1)
+            hungry_at = self.clock.time()
 
             # FIX: Use waiter to coordinate fork allocation
             while self.running:
@@ -46,60 +165,62 @@ class DeadlockFixWaiter:
                     if self.can_eat(philosopher_id):
                         # Mark this philosopher as eating
                         self.eating_philosophers.add(philosopher_id)
-                        print(f"Philosopher {philosopher_id}: Waiter approved eating")
+                        log.info("Philosopher %s: Waiter approved eating", philosopher_id)
                         break
                     else:
-                        print(f"Philosopher {philosopher_id}: Waiter says wait, " f"adjacent philosophers are eating")
+                        log.debug("Philosopher %s: Waiter says wait, adjacent philosophers are eating", philosopher_id)
 
                 # Wait a bit before asking waiter again
-                time.sleep(0.1)
+                self.clock.sleep(0.1)
 
             if not self.running:
                 break
 
-            # Now safely acquire both forks (waiter ensures no conflicts)
-            print(f"Philosopher {philosopher_id} picking up left fork {left_fork}")
-            self.forks[left_fork].acquire()
-
-            print(f"Philosopher {philosopher_id} picking up right fork {right_fork}")
-            self.forks[right_fork].acquire()
+            # Now safely acquire every fork (waiter ensures no conflicts)
+            for fork_id, fork in zip(fork_ids, forks):
+                log.debug("Philosopher %s picking up fork %s", philosopher_id, fork_id)
+                fork.acquire()
 
-            print(f"Philosopher {philosopher_id} eating...")
-            time.sleep(0.2)
+            waited = self.clock.time() - hungry_at
+            log.info("Philosopher %s eating...", philosopher_id)
+            self.clock.sleep(0.2)
 
-            print(f"Philosopher {philosopher_id} putting down forks")
-            self.forks[right_fork].release()
-            self.forks[left_fork].release()
+            log.debug("Philosopher %s putting down forks", philosopher_id)
+            for fork in reversed(forks):
+                fork.release()
+            self.metrics.record(waited, philosopher_id)
 
             # Notify waiter that we're done eating
             with self.waiter:
                 self.eating_philosophers.remove(philosopher_id)
-                print(f"Philosopher {philosopher_id}: Notified waiter, done eating")
+                log.debug("Philosopher %s: Notified waiter, done eating", philosopher_id)
 
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
 
     def run(self, duration: int = 5):
-        """Run the waiter fix example."""
-        print("\n=== DEADLOCK FIX: Waiter Solution ===")
+        """Run the polling waiter fix example."""
+        print("\n=== DEADLOCK FIX: Waiter Solution (polling) ===")
         print(f"Running for {duration} seconds...")
         print("This should NOT result in deadlock due to waiter coordination!")
         print("A central waiter ensures no adjacent philosophers eat simultaneously.")
 
         # Start philosophers
         for i in range(self.num_philosophers):
-            thread = threading.Thread(target=self.philosopher, args=(i,))
+            thread = self.clock.Thread(target=self.philosopher, args=(i,), name=f"philosopher-{i}")
             thread.daemon = True
             thread.start()
             self.philosophers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping philosophers...")
         for thread in self.philosophers:
             thread.join(timeout=1.0)
-        print("Waiter fix example completed.\n")
+        log.flush()
+        print("Polling waiter fix example completed.\n")
 
 
 if __name__ == "__main__":
@@ -2,47 +2,57 @@
 """
 Deadlock Example - Dining Philosophers Problem
 Demonstrates classic deadlock scenario where philosophers can get stuck.
+
+Philosophers sit at a ring by default; pass graph (see examples.common.topology)
+to seat them on any conflict graph, where each fork is shared by the two
+philosophers it joins and a philosopher needs all of its forks to eat.
 """
 
-import threading
-import time
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.topology import GraphSpec, make_graph
 
 
 class DeadlockExample:
     """Demonstrates deadlock using the dining philosophers problem."""
 
-    def __init__(self, num_philosophers: int = 5):
-        self.num_philosophers = num_philosophers
-        self.forks = [threading.Lock() for _ in range(num_philosophers)]
+    def __init__(self, num_philosophers: int = 5, graph: GraphSpec = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.graph = make_graph(graph, num_philosophers)
+        self.num_philosophers = self.graph.num_vertices
+        self.forks = [self.clock.Lock(f"fork-{i}") for i in range(self.graph.num_edges)]
         self.philosophers = []
         self.running = True
+        self.metrics = WorkMetrics("meals")
 
     def philosopher(self, philosopher_id: int):
         """Philosopher function that can lead to deadlock."""
-        left_fork = philosopher_id
-        right_fork = (philosopher_id + 1) % self.num_philosophers
+        fork_ids = self.graph.forks(philosopher_id)
+        forks = [self.forks[fork_id] for fork_id in fork_ids]
 
-        print(f"Philosopher {philosopher_id} starting...")
+        log.debug("Philosopher %s starting...", philosopher_id)
 
         while self.running:
-            print(f"Philosopher {philosopher_id} thinking...")
-            time.sleep(0.1)
-
-            # This can lead to deadlock - all philosophers pick up left fork first
-            print(f"Philosopher {philosopher_id} picking up left fork {left_fork}")
-            self.forks[left_fork].acquire()
+            log.debug("Philosopher %s thinking...", philosopher_id)
+            self.clock.sleep(0.1)
+            hungry_at = self.clock.time()
 
-            print(f"Philosopher {philosopher_id} picking up right fork {right_fork}")
-            self.forks[right_fork].acquire()
+            # This can lead to deadlock - all philosophers pick up left fork first (on a ring, fork i before fork i+1)
+            for fork_id, fork in zip(fork_ids, forks):
+                log.debug("Philosopher %s picking up fork %s", philosopher_id, fork_id)
+                fork.acquire()
 
-            print(f"Philosopher {philosopher_id} eating...")
-            time.sleep(0.2)
+            waited = self.clock.time() - hungry_at
+            log.info("Philosopher %s eating...", philosopher_id)
+            self.clock.sleep(0.2)
 
-            print(f"Philosopher {philosopher_id} putting down forks")
-            self.forks[right_fork].release()
-            self.forks[left_fork].release()
+            log.debug("Philosopher %s putting down forks", philosopher_id)
+            for fork in reversed(forks):
+                fork.release()
+            self.metrics.record(waited, philosopher_id)
 
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
 
     def run(self, duration: int = 5):
         """Run the deadlock example for specified duration."""
@@ -52,18 +62,20 @@ class DeadlockExample:
 
         # Start philosophers
         for i in range(self.num_philosophers):
-            thread = threading.Thread(target=self.philosopher, args=(i,))
+            thread = self.clock.Thread(target=self.philosopher, args=(i,), name=f"philosopher-{i}")
             thread.daemon = True
             thread.start()
             self.philosophers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping philosophers...")
         for thread in self.philosophers:
             thread.join(timeout=1.0)
+        log.flush()
         print("Deadlock example completed.\n")
 
 
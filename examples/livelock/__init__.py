@@ -3,8 +3,27 @@ Livelock package - Contains the livelock problem and various solutions.
 Shows how two threads can get stuck in a polite loop and multiple ways to fix it.
 """
 
-from .livelock_problem import LivelockExample
-from .livelock_fix_random_backoff import LivelockFixRandomBackoff
-from .livelock_fix_priority import LivelockFixPriority
+from typing import TYPE_CHECKING
 
-__all__ = ["LivelockExample", "LivelockFixRandomBackoff", "LivelockFixPriority"]
+from ..registry import lazy_attributes
+
+if TYPE_CHECKING:
+    from .livelock_problem import LivelockExample  # noqa: F401
+    from .livelock_fix_random_backoff import LivelockFixRandomBackoff  # noqa: F401
+    from .livelock_fix_priority import LivelockFixPriority  # noqa: F401
+    from .livelock_fix_arbiter import LivelockFixArbiter  # noqa: F401
+    from .livelock_backends import LivelockFixRandomBackoffProcess, LivelockFixRandomBackoffAsyncio  # noqa: F401
+
+# Exported class name -> module that defines it (imported on first access)
+_EXPORTS = {
+    "LivelockExample": ".livelock_problem",
+    "LivelockFixRandomBackoff": ".livelock_fix_random_backoff",
+    "LivelockFixPriority": ".livelock_fix_priority",
+    "LivelockFixArbiter": ".livelock_fix_arbiter",
+    "LivelockFixRandomBackoffProcess": ".livelock_backends",
+    "LivelockFixRandomBackoffAsyncio": ".livelock_backends",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_attributes(__name__, _EXPORTS)
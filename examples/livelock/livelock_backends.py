@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Livelock Backends - Random Backoff on Processes and asyncio
+The random backoff fix with workers as processes sharing multiprocessing.Lock
+objects, or as tasks on one event loop sharing asyncio.Lock objects. Timings
+match LivelockFixRandomBackoff, so the three backends can be compared on the
+same workload.
+"""
+
+import asyncio
+import random
+import time
+
+from ..common.backends import ProcessGroup, acquire_async, require_real_clock, run_tasks
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
+
+def _backoff_worker_process(worker_id: int, stop, metrics: WorkMetrics, lock1, lock2):
+    """Random backoff worker loop run in a child process."""
+    log.info("Worker %s: Starting...", worker_id)
+    started_at = time.perf_counter()
+
+    while not stop.is_set():
+        if lock1.acquire(timeout=0.1):
+            if lock2.acquire(timeout=0.1):
+                waited = time.perf_counter() - started_at
+                log.info("Worker %s: Got both locks! Working...", worker_id)
+                time.sleep(0.2)  # Do some work
+                lock2.release()
+                lock1.release()
+                metrics.record(waited, worker_id)
+                started_at = time.perf_counter()
+            else:
+                log.debug("Worker %s: Couldn't get lock2, releasing lock1 and retrying...", worker_id)
+                lock1.release()
+                time.sleep(random.uniform(0.1, 0.5))
+        else:
+            log.debug("Worker %s: Couldn't get lock1, retrying...", worker_id)
+            time.sleep(random.uniform(0.05, 0.3))
+
+
+class LivelockFixRandomBackoffProcess:
+    """Random backoff with one process per worker."""
+
+    def __init__(self, num_workers: int = 2, clock=None):
+        self.clock = require_real_clock(clock, "process")
+        self.num_workers = num_workers
+        self.group = ProcessGroup()
+        self.lock1 = self.group.context.Lock()
+        self.lock2 = self.group.context.Lock()
+        self.metrics = WorkMetrics("critical sections")
+
+    def run(self, duration: int = 5):
+        """Run the random backoff fix with process workers."""
+        print("\n=== LIVELOCK FIX: Random Backoff (process backend) ===")
+        print(f"Running for {duration} seconds...")
+        print("Workers are processes sharing multiprocessing.Lock objects.\n")
+
+        for i in range(1, self.num_workers + 1):
+            self.group.start(_backoff_worker_process, i, self.lock1, self.lock2)
+
+        time.sleep(duration)
+
+        log.flush()
+        print("\nStopping workers...")
+        self.group.stop_and_collect(self.metrics)
+        print("Random backoff fix example completed.\n")
+
+
+class LivelockFixRandomBackoffAsyncio:
+    """Random backoff with one asyncio task per worker."""
+
+    def __init__(self, num_workers: int = 2, clock=None):
+        self.clock = require_real_clock(clock, "asyncio")
+        self.num_workers = num_workers
+        self.metrics = WorkMetrics("critical sections")
+
+    async def worker(self, worker_id: int, lock1: asyncio.Lock, lock2: asyncio.Lock, stop: asyncio.Event):
+        """Worker coroutine that avoids livelock through random backoff."""
+        log.info("Worker %s: Starting...", worker_id)
+        started_at = time.perf_counter()
+
+        while not stop.is_set():
+            if await acquire_async(lock1, 0.1):
+                if await acquire_async(lock2, 0.1):
+                    waited = time.perf_counter() - started_at
+                    log.info("Worker %s: Got both locks! Working...", worker_id)
+                    await asyncio.sleep(0.2)  # Do some work
+                    lock2.release()
+                    lock1.release()
+                    self.metrics.record(waited, worker_id)
+                    started_at = time.perf_counter()
+                else:
+                    log.debug("Worker %s: Couldn't get lock2, releasing lock1 and retrying...", worker_id)
+                    lock1.release()
+                    await asyncio.sleep(random.uniform(0.1, 0.5))
+            else:
+                log.debug("Worker %s: Couldn't get lock1, retrying...", worker_id)
+                await asyncio.sleep(random.uniform(0.05, 0.3))
+
+    async def main(self, duration: float):
+        lock1, lock2, stop = asyncio.Lock(), asyncio.Lock(), asyncio.Event()
+        workers = [self.worker(i, lock1, lock2, stop) for i in range(1, self.num_workers + 1)]
+        await run_tasks(workers, duration, stop)
+
+    def run(self, duration: int = 5):
+        """Run the random backoff fix with asyncio workers."""
+        print("\n=== LIVELOCK FIX: Random Backoff (asyncio backend) ===")
+        print(f"Running for {duration} seconds...")
+        print("Workers are tasks on one event loop sharing asyncio.Lock objects.\n")
+
+        asyncio.run(self.main(duration))
+
+        log.flush()
+        print("Random backoff fix example completed.\n")
+
+
+if __name__ == "__main__":
+    # Allow running this file directly for testing
+    LivelockFixRandomBackoffProcess().run(5)
+    LivelockFixRandomBackoffAsyncio().run(5)
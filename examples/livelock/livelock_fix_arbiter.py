@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Livelock Fix - Arbiter
+Fixes livelock by never letting a worker hold part of its lock set: each
+worker hands its whole set to an arbiter, which grants it atomically once
+every lock in it is free. Nobody takes a lock only to give it back, so
+there is nothing to be polite about and no retries at all.
+
+Requests wait in one FIFO queue. A request is granted when its locks are
+free and no earlier waiting request needs any of them, so conflicting
+requests are served in arrival order (no worker starves) while a request
+that conflicts with nobody waiting can go straight past the queue.
+"""
+
+from collections import deque
+from typing import Deque, Optional
+
+from ..common.grant_monitor import GrantMonitor
+from ..common.lock_sets import lock_sets
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
+
+class LivelockFixArbiter(GrantMonitor):
+    """Fixes livelock by granting each worker's whole lock set at once, in FIFO order among conflicts.
+
+    The arbiter is a grant monitor over the locks: a request is granted once
+    its whole set is free, and every release grants what it can.
+    """
+
+    def __init__(self, num_workers: int = 2, num_locks: int = 2, locks_per_worker: Optional[int] = None, clock=None):
+        # Workers are numbered from 1, so slot 0 is never used
+        super().__init__(num_workers + 1, "arbiter", clock)
+        self.num_workers = num_workers
+        self.num_locks = num_locks
+        self.locks = [self.clock.Lock(f"lock{i + 1}") for i in range(num_locks)]
+        # Worker i (numbered from 1) needs the locks in lock_sets[i - 1]
+        self.lock_sets = lock_sets(num_workers, num_locks, locks_per_worker)
+        self.workers = []
+        self.metrics = WorkMetrics("critical sections")
+
+        # Arbiter state, guarded by the monitor; busy is indexed by lock index
+        self.busy = bytearray(num_locks)
+        self.waiting: Deque[int] = deque()
+
+    def grant_sets(self):
+        """Grant every waiting request whose locks are free and not needed by an earlier one. Call with the monitor held."""
+        busy, claimed = self.busy, set()
+        for worker_id in list(self.waiting):
+            needed = self.lock_sets[worker_id - 1]
+            if any(busy[index] for index in needed) or not claimed.isdisjoint(needed):
+                # Keep its locks for it: later requests that need them wait behind it
+                claimed.update(needed)
+                continue
+            for index in needed:
+                busy[index] = 1
+            self.waiting.remove(worker_id)
+            self.grant(worker_id)
+
+    def submit(self, worker_id: int):
+        self.waiting.append(worker_id)
+        self.grant_sets()
+        if not self.granted[worker_id]:
+            log.debug("Worker %s: Arbiter says wait, %s requests queued", worker_id, len(self.waiting))
+            self.metrics.tally("queued", worker_id)
+
+    def withdraw(self, worker_id: int):
+        self.waiting.remove(worker_id)
+
+    def release(self, worker_id: int):
+        """Give worker_id's lock set back to the arbiter and grant what that frees."""
+        with self.monitor:
+            for index in self.lock_sets[worker_id - 1]:
+                self.busy[index] = 0
+            self.grant_sets()
+
+    def worker(self, worker_id: int):
+        """Worker that asks the arbiter for its whole lock set instead of taking locks one by one."""
+        order = self.lock_sets[worker_id - 1]
+        locks = [self.locks[index] for index in order]
+        log.info("Worker %s: Starting...", worker_id)
+        started_at = self.clock.time()
+
+        while self.running:
+            # FIX: Ask for every lock at once; the arbiter grants all of them or none
+            if not self.request(worker_id):
+                break
+
+            # The arbiter guarantees nobody else holds these, so this never waits
+            for lock in locks:
+                lock.acquire()
+            waited = self.clock.time() - started_at
+            log.info("Worker %s: Arbiter granted all %s locks! Working...", worker_id, len(locks))
+            self.clock.sleep(0.2)  # Do some work
+            for lock in reversed(locks):
+                lock.release()
+            self.release(worker_id)
+            log.debug("Worker %s: Released all locks", worker_id)
+            self.metrics.record(waited, worker_id)
+            started_at = self.clock.time()
+
+    def run(self, duration: int = 5):
+        """Run the arbiter fix example."""
+        print("\n=== LIVELOCK FIX: Arbiter ===")
+        print(f"Running for {duration} seconds...")
+        print("This should NOT result in livelock: no worker ever holds part of its lock set!\n")
+        print("Workers ask an arbiter for all their locks at once; conflicting requests wait in FIFO order.\n")
+
+        # Start workers
+        for i in range(1, self.num_workers + 1):
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
+
+        # Let it run for a while
+        self.clock.sleep(duration)
+        self.stop()
+
+        log.flush()
+        print("\nStopping workers...")
+        for thread in self.workers:
+            thread.join(timeout=1.0)
+        log.flush()
+        print("Arbiter fix example completed.\n")
+
+
+if __name__ == "__main__":
+    # Allow running this file directly for testing
+    example = LivelockFixArbiter()
+    example.run(5)
@@ -2,106 +2,129 @@
 """
 Livelock Fix - Priority-Based Lock Acquisition
 Fixes livelock by giving one worker priority to break the polite loop.
+
+Each of N workers needs its own subset of M shared locks (by default both of
+two locks); odd workers take theirs in ascending order and even workers in
+descending order, as in the livelock example. Priority is a token passed
+round the workers. The worker holding it keeps the locks it has and waits
+for the rest; a worker that needs any of the holder's locks does not try
+for them but yields, and one that already took some gives them back when
+its next attempt times out. Workers whose locks are disjoint from the
+holder's carry on. The holder passes the token to the next worker once it
+has done its work, so no worker keeps priority and every worker gets it
+within N critical sections.
 """
 
-import threading
-import time
+from typing import Optional
+
+from ..common.clock import get_clock
+from ..common.lock_sets import lock_sets
+from ..common.log import log
+from ..common.metrics import WorkMetrics
 
 
 class LivelockFixPriority:
     """Fixes livelock by giving one worker priority to break the polite loop."""
 
-    def __init__(self):
-        self.lock1 = threading.Lock()
-        self.lock2 = threading.Lock()
+    def __init__(self, num_workers: int = 2, num_locks: int = 2, locks_per_worker: Optional[int] = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.num_workers = num_workers
+        self.num_locks = num_locks
+        self.locks = [self.clock.Lock(f"lock{i + 1}") for i in range(num_locks)]
+        # Worker i (numbered from 1) needs the locks in lock_sets[i - 1]
+        self.lock_sets = lock_sets(num_workers, num_locks, locks_per_worker)
+        self.needs = [frozenset(needed) for needed in self.lock_sets]
+        # Id of the worker holding the priority token; only the holder changes it
+        self.token = 1
         self.workers = []
         self.running = True
-
-    def high_priority_worker(self, worker_id: int):
-        """High priority worker that always tries lock1 first."""
-        print(f"Worker {worker_id} (HIGH PRIORITY): Starting...")
+        self.metrics = WorkMetrics("critical sections")
+
+    def pass_token(self, worker_id: int):
+        """Hand priority to the next worker after worker_id."""
+        self.token = worker_id % self.num_workers + 1
+        log.debug("Worker %s: Passing priority to worker %s", worker_id, self.token)
+
+    def worker(self, worker_id: int):
+        """Worker that waits for its locks while it holds the priority token and yields otherwise."""
+        order = self.lock_sets[worker_id - 1]
+        if not worker_id % 2:
+            order = order[::-1]
+        locks = [self.locks[index] for index in order]
+        needs = self.needs[worker_id - 1]
+        log.info("Worker %s: Starting...", worker_id)
+        started_at = self.clock.time()
 
         while self.running:
-            print(f"Worker {worker_id} (HIGH PRIORITY): Trying to acquire lock1...")
-
-            # High priority worker always tries lock1 first
-            if self.lock1.acquire(timeout=0.1):
-                print(f"Worker {worker_id} (HIGH PRIORITY): Got lock1, trying lock2...")
-
-                if self.lock2.acquire(timeout=0.1):
-                    print(f"Worker {worker_id} (HIGH PRIORITY): Got both locks! Working...")
-                    time.sleep(0.2)  # Do some work
-                    print(f"Worker {worker_id} (HIGH PRIORITY): Released both locks")
-                    self.lock2.release()
-                    self.lock1.release()
-                else:
-                    print(f"Worker {worker_id} (HIGH PRIORITY): Couldn't get lock2, releasing lock1 and retrying...")
-                    self.lock1.release()
-                    time.sleep(0.1)
+            token = self.token
+            if token != worker_id and not needs.isdisjoint(self.needs[token - 1]):
+                # FIX: Leave the token holder's locks to it rather than grabbing them in passing
+                log.debug("Worker %s: Worker %s has priority for a lock we need, yielding...", worker_id, token)
+                self.clock.sleep(0.1)
+                continue
+
+            held = 0
+            for lock in locks:
+                acquired = lock.acquire(timeout=0.1)
+                # FIX: The token holder keeps what it has and waits for the rest; nobody else holds on
+                while not acquired and self.token == worker_id and self.running:
+                    acquired = lock.acquire(timeout=0.1)
+                if not acquired:
+                    break
+                held += 1
+
+            if held == len(locks):
+                waited = self.clock.time() - started_at
+                log.info("Worker %s%s: Got all %s locks! Working...", worker_id, " (PRIORITY)" if self.token == worker_id else "", held)
+                self.clock.sleep(0.2)  # Do some work
+                log.debug("Worker %s: Released all locks", worker_id)
+                for lock in reversed(locks):
+                    lock.release()
+                self.metrics.record(waited, worker_id)
+                started_at = self.clock.time()
+                if self.token == worker_id:
+                    self.pass_token(worker_id)
+                continue
+
+            for lock in reversed(locks[:held]):
+                lock.release()
+            if not self.running:
+                break
+            if held:
+                log.debug("Worker %s: Couldn't get lock%s, releasing %s locks and yielding...", worker_id, order[held] + 1, held)
+                self.metrics.tally("wasted acquisitions", worker_id, held)
+                # FIX: Workers without priority yield more time to the token holder
+                yield_time = 0.3
             else:
-                print(f"Worker {worker_id} (HIGH PRIORITY): Couldn't get lock1, retrying...")
-                time.sleep(0.1)
-
-    def low_priority_worker(self, worker_id: int):
-        """Low priority worker that yields to high priority worker."""
-        print(f"Worker {worker_id} (LOW PRIORITY): Starting...")
-
-        while self.running:
-            print(f"Worker {worker_id} (LOW PRIORITY): Trying to acquire lock2...")
-
-            # Low priority worker tries lock2 first (different order)
-            if self.lock2.acquire(timeout=0.1):
-                print(f"Worker {worker_id} (LOW PRIORITY): Got lock2, trying lock1...")
-
-                if self.lock1.acquire(timeout=0.1):
-                    print(f"Worker {worker_id} (LOW PRIORITY): Got both locks! Working...")
-                    time.sleep(0.2)  # Do some work
-                    print(f"Worker {worker_id} (LOW PRIORITY): Released both locks")
-                    self.lock1.release()
-                    self.lock2.release()
-                else:
-                    print(f"Worker {worker_id} (LOW PRIORITY): Couldn't get lock1, releasing lock2 and yielding...")
-                    self.lock2.release()
-
-                    # FIX: Low priority worker yields more time to high priority worker
-                    yield_time = 0.3
-                    print(f"Worker {worker_id} (LOW PRIORITY): Yielding for {yield_time}s...")
-                    time.sleep(yield_time)
-            else:
-                print(f"Worker {worker_id} (LOW PRIORITY): Couldn't get lock2, yielding...")
-
-                # FIX: Low priority worker yields more time
+                log.debug("Worker %s: Couldn't get lock%s, yielding...", worker_id, order[0] + 1)
                 yield_time = 0.2
-                print(f"Worker {worker_id} (LOW PRIORITY): Yielding for {yield_time}s...")
-                time.sleep(yield_time)
+            log.debug("Worker %s: Yielding for %ss...", worker_id, yield_time)
+            self.clock.sleep(yield_time)
 
     def run(self, duration: int = 5):
         """Run the priority-based fix example."""
         print("\n=== LIVELOCK FIX: Priority-Based Lock Acquisition ===")
         print(f"Running for {duration} seconds...")
         print("This should NOT result in livelock due to priority-based acquisition!\n")
-        print("High priority worker: Always tries lock1 first")
-        print("Low priority worker: Always tries lock2 first and yields more time\n")
-
-        # Start workers with different priorities
-        high_priority = threading.Thread(target=self.high_priority_worker, args=(1,))
-        low_priority = threading.Thread(target=self.low_priority_worker, args=(2,))
-
-        high_priority.daemon = True
-        low_priority.daemon = True
-
-        high_priority.start()
-        low_priority.start()
+        print("The worker holding the priority token waits for its locks; the others yield.")
+        print("The token passes to the next worker after each of its critical sections.\n")
 
-        self.workers = [high_priority, low_priority]
+        # Start workers
+        for i in range(1, self.num_workers + 1):
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping workers...")
         for thread in self.workers:
             thread.join(timeout=1.0)
+        log.flush()
         print("Priority-based fix example completed.\n")
 
 
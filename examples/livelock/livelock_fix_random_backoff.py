@@ -2,55 +2,72 @@
 """
 Livelock Fix - Random Backoff
 Fixes livelock by adding randomness to break the polite loop.
+
+Each of N workers needs its own subset of M shared locks (by default both of
+two locks) and takes them as a LockSet, in ascending order and all or
+nothing: a worker that cannot get the rest in time gives back the ones it
+holds and backs off for a random time, so workers that collide do not retry
+in step.
 """
 
-import threading
-import time
 import random
+from typing import Optional
+
+from ..common.clock import get_clock
+from ..common.lock_sets import lock_sets
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.multilock import LockSet, rank_by_position
 
 
 class LivelockFixRandomBackoff:
     """Fixes livelock by adding random backoff to break the polite loop."""
 
-    def __init__(self):
-        self.lock1 = threading.Lock()
-        self.lock2 = threading.Lock()
+    def __init__(self, num_workers: int = 2, num_locks: int = 2, locks_per_worker: Optional[int] = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.num_workers = num_workers
+        self.num_locks = num_locks
+        self.locks = [self.clock.Lock(f"lock{i + 1}") for i in range(num_locks)]
+        self.lock_rank = rank_by_position(self.locks)
+        # Worker i (numbered from 1) needs the locks in lock_sets[i - 1]
+        self.lock_sets = lock_sets(num_workers, num_locks, locks_per_worker)
         self.workers = []
         self.running = True
+        self.metrics = WorkMetrics("critical sections")
 
     def worker(self, worker_id: int):
         """Worker function that avoids livelock through random backoff."""
-        print(f"Worker {worker_id}: Starting...")
+        order = self.lock_sets[worker_id - 1]
+        # Up to 0.1 s per lock; locks taken before the deadline are given back if the rest cannot be had
+        locks = LockSet([self.locks[index] for index in order], timeout=0.1 * len(order), key=self.lock_rank, clock=self.clock)
+        log.info("Worker %s: Starting...", worker_id)
+        started_at = self.clock.time()
 
         while self.running:
-            print(f"Worker {worker_id}: Trying to acquire lock1...")
-
-            # Try to get first lock
-            if self.lock1.acquire(timeout=0.1):
-                print(f"Worker {worker_id}: Got lock1, trying lock2...")
-
-                # Try to get second lock
-                if self.lock2.acquire(timeout=0.1):
-                    print(f"Worker {worker_id}: Got both locks! Working...")
-                    time.sleep(0.2)  # Do some work
-                    print(f"Worker {worker_id}: Released both locks")
-                    self.lock2.release()
-                    self.lock1.release()
-                else:
-                    print(f"Worker {worker_id}: Couldn't get lock2, releasing lock1 and retrying...")
-                    self.lock1.release()
-
-                    # FIX: Add random backoff to break the polite loop
-                    backoff_time = random.uniform(0.1, 0.5)
-                    print(f"Worker {worker_id}: Backing off for {backoff_time:.2f}s...")
-                    time.sleep(backoff_time)
+            log.debug("Worker %s: Trying to acquire lock%s...", worker_id, order[0] + 1)
+
+            if locks.acquire(locks.timeout):
+                waited = self.clock.time() - started_at
+                log.info("Worker %s: Got all %s locks! Working...", worker_id, len(locks))
+                self.clock.sleep(0.2)  # Do some work
+                log.debug("Worker %s: Released all locks", worker_id)
+                locks.release()
+                self.metrics.record(waited, worker_id)
+                started_at = self.clock.time()
+                continue
+
+            held = locks.backed_out
+            if held:
+                log.debug("Worker %s: Couldn't get lock%s, released %s locks and retrying...", worker_id, order[held] + 1, held)
+                self.metrics.tally("wasted acquisitions", worker_id, held)
+                # FIX: Add random backoff to break the polite loop
+                backoff_time = random.uniform(0.1, 0.5)
             else:
-                print(f"Worker {worker_id}: Couldn't get lock1, retrying...")
-
+                log.debug("Worker %s: Couldn't get lock%s, retrying...", worker_id, order[0] + 1)
                 # FIX: Add random backoff here too
                 backoff_time = random.uniform(0.05, 0.3)
-                print(f"Worker {worker_id}: Backing off for {backoff_time:.2f}s...")
-                time.sleep(backoff_time)
+            log.debug("Worker %s: Backing off for %.2fs...", worker_id, backoff_time)
+            self.clock.sleep(backoff_time)
 
     def run(self, duration: int = 5):
         """Run the random backoff fix example."""
@@ -59,19 +76,21 @@ class LivelockFixRandomBackoff:
         print("This should NOT result in livelock due to random backoff!\n")
 
         # Start workers
-        for i in range(1, 3):
-            thread = threading.Thread(target=self.worker, args=(i,))
+        for i in range(1, self.num_workers + 1):
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
             thread.daemon = True
             thread.start()
             self.workers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping workers...")
         for thread in self.workers:
             thread.join(timeout=1.0)
+        log.flush()
         print("Random backoff fix example completed.\n")
 
 
@@ -2,61 +2,73 @@
 """
 Livelock Example - Too Polite Workers
 Demonstrates livelock where threads are too polite and may not make progress.
+
+Each of N workers needs its own subset of M shared locks (by default both of
+two locks). Odd workers take their locks in ascending order and even workers
+in descending order; whoever cannot get the next lock politely gives back
+the ones it holds and tries again after the same pause, so workers in step
+keep taking and giving back locks without either finishing.
 """
 
-import threading
-import time
+from typing import Optional
+
+from ..common.clock import get_clock
+from ..common.lock_sets import lock_sets
+from ..common.log import log
+from ..common.metrics import WorkMetrics
 
 
 class LivelockExample:
     """Demonstrates livelock where threads are too polite."""
 
-    def __init__(self):
-        self.lock1 = threading.Lock()
-        self.lock2 = threading.Lock()
+    def __init__(self, num_workers: int = 2, num_locks: int = 2, locks_per_worker: Optional[int] = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.num_workers = num_workers
+        self.num_locks = num_locks
+        self.locks = [self.clock.Lock(f"lock{i + 1}") for i in range(num_locks)]
+        # Worker i (numbered from 1) needs the locks in lock_sets[i - 1]
+        self.lock_sets = lock_sets(num_workers, num_locks, locks_per_worker)
+        self.workers = []
         self.running = True
+        self.metrics = WorkMetrics("critical sections")
 
-    def worker1(self):
-        """Worker 1 that tries to be polite."""
-        while self.running:
-            print("Worker 1: Trying to acquire lock1...")
-            if self.lock1.acquire(timeout=0.1):
-                print("Worker 1: Got lock1, trying lock2...")
-                time.sleep(0.1)  # Simulate work
-
-                if self.lock2.acquire(timeout=0.1):
-                    print("Worker 1: Got both locks! Working...")
-                    time.sleep(0.2)
-                    self.lock2.release()
-                    self.lock1.release()
-                    print("Worker 1: Released both locks")
-                    break
-                else:
-                    print("Worker 1: Couldn't get lock2, releasing lock1 and retrying...")
-                    self.lock1.release()
-                    time.sleep(0.1)  # Be polite, wait a bit
-            time.sleep(0.05)
+    def worker(self, worker_id: int):
+        """Polite worker; odd workers take their locks in ascending order, even workers in descending order."""
+        order = self.lock_sets[worker_id - 1]
+        if not worker_id % 2:
+            order = order[::-1]
+        locks = [self.locks[index] for index in order]
+        names = [f"lock{index + 1}" for index in order]
 
-    def worker2(self):
-        """Worker 2 that tries to be polite."""
+        started_at = self.clock.time()
         while self.running:
-            print("Worker 2: Trying to acquire lock2...")
-            if self.lock2.acquire(timeout=0.1):
-                print("Worker 2: Got lock2, trying lock1...")
-                time.sleep(0.1)  # Simulate work
-
-                if self.lock1.acquire(timeout=0.1):
-                    print("Worker 2: Got both locks! Working...")
-                    time.sleep(0.2)
-                    self.lock1.release()
-                    self.lock2.release()
-                    print("Worker 2: Released both locks")
+            log.debug("Worker %s: Trying to acquire %s...", worker_id, names[0])
+            if locks[0].acquire(timeout=0.1):
+                log.debug("Worker %s: Got %s, trying %s...", worker_id, names[0], ", ".join(names[1:]))
+                self.clock.sleep(0.1)  # Simulate work
+
+                held = 1
+                for lock in locks[1:]:
+                    if not lock.acquire(timeout=0.1):
+                        break
+                    held += 1
+
+                if held == len(locks):
+                    waited = self.clock.time() - started_at
+                    log.info("Worker %s: Got all %s locks! Working...", worker_id, held)
+                    self.clock.sleep(0.2)
+                    for lock in reversed(locks):
+                        lock.release()
+                    log.debug("Worker %s: Released all locks", worker_id)
+                    self.metrics.record(waited, worker_id)
                     break
                 else:
-                    print("Worker 2: Couldn't get lock1, releasing lock2 and retrying...")
-                    self.lock2.release()
-                    time.sleep(0.1)  # Be polite, wait a bit
-            time.sleep(0.05)
+                    log.debug("Worker %s: Couldn't get %s, releasing %s locks and retrying...", worker_id, names[held], held)
+                    self.metrics.tally("wasted acquisitions", worker_id, held)
+                    for lock in reversed(locks[:held]):
+                        lock.release()
+                    self.clock.sleep(0.1)  # Be polite, wait a bit
+            self.clock.sleep(0.05)
 
     def run(self, duration: int = 10):
         """Run the livelock example."""
@@ -65,22 +77,21 @@ class LivelockExample:
         print("Workers will keep being polite and may not make progress!\n")
 
         # Start workers
-        thread1 = threading.Thread(target=self.worker1)
-        thread2 = threading.Thread(target=self.worker2)
-
-        thread1.daemon = True
-        thread2.daemon = True
-
-        thread1.start()
-        thread2.start()
+        for i in range(1, self.num_workers + 1):
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
 
         # Let them run
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping workers...")
-        thread1.join(timeout=1.0)
-        thread2.join(timeout=1.0)
+        for thread in self.workers:
+            thread.join(timeout=1.0)
+        log.flush()
         print("Livelock example completed.\n")
 
 
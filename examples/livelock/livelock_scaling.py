@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Livelock Scaling - Work and Waste as Workers and Locks Grow
+Runs the livelock fixes with N workers each needing a random two of M locks
+and reports, for every N and M, the critical sections completed per second,
+the wait for a critical section at p99 and worst, and the wasted
+acquisitions: locks taken and then given back because the rest of the set
+was not available. The arbiter never takes a lock it cannot keep, so it
+shows what the retrying fixes lose to their retries. Runs on the virtual
+clock by default, so long runs take seconds and the same seed gives the
+same table.
+"""
+
+from typing import Dict, List, Sequence
+
+from ..common.lock_sets import conflicts, lock_sets
+
+SCALING_EXAMPLES = ("livelock-fix-random-backoff", "livelock-fix-priority", "livelock-fix-arbiter")
+
+
+def scale_lock_sets(
+    names: Sequence[str] = SCALING_EXAMPLES,
+    workers: Sequence[int] = (2, 8, 32),
+    locks: Sequence[int] = (2, 8, 32),
+    duration: float = 60.0,
+    seed: int = 0,
+    clock_kind: str = "virtual",
+) -> List[Dict[str, object]]:
+    """Run each example once per number of workers and locks; return one row per run."""
+    # Deferred: the benchmark runner imports the example registry
+    from ..common.bench import run_once
+
+    rows = []
+    for num_workers in workers:
+        for num_locks in locks:
+            counts = conflicts(lock_sets(num_workers, num_locks))
+            for name in names:
+                metrics, elapsed = run_once(name, duration, seed, clock_kind, num_workers=num_workers, num_locks=num_locks)
+                if metrics is None:
+                    raise ValueError(f"example {name!r} has no metrics attribute")
+                wasted = metrics.event_count("wasted acquisitions")
+                latency = metrics.summary(elapsed)["latency"]
+                rows.append(
+                    {
+                        "example": name,
+                        "workers": num_workers,
+                        "locks": num_locks,
+                        "conflicts": sum(counts) / len(counts),
+                        "throughput": metrics.count / elapsed,
+                        "wasted": wasted / elapsed,
+                        "wasted per section": wasted / metrics.count if metrics.count else float("inf"),
+                        "p99": latency["p99"],
+                        "max": latency["max"],
+                        "fairness": metrics.fairness(),
+                    }
+                )
+    return rows
+
+
+def format_lock_set_scaling(rows: List[Dict[str, object]]) -> str:
+    """Render scale_lock_sets() rows as a table."""
+    width = max([len("example")] + [len(str(row["example"])) for row in rows])
+    lines = [
+        f"{'workers':>7}  {'locks':>5}  {'conflicts':>9}  {'example':<{width}}  {'work/s':>8}  {'wasted/s':>8}  "
+        f"{'wasted/work':>11}  {'p99 wait':>9}  {'max wait':>9}  {'fairness':>8}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['workers']:>7}  {row['locks']:>5}  {row['conflicts']:>9.1f}  {row['example']:<{width}}  {row['throughput']:>8.2f}  "
+            f"{row['wasted']:>8.2f}  {row['wasted per section']:>11.2f}  {row['p99']:>8.3f}s  {row['max']:>8.3f}s  {row['fairness']:>8.3f}"
+        )
+    lines.append("(conflicts: mean number of other workers sharing a lock with each worker; work in critical sections)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_lock_set_scaling(scale_lock_sets()))
@@ -0,0 +1,172 @@
+"""
+Example registry - Maps example names to lazily imported example classes.
+Only the module of the selected example is imported. Third-party packages can
+add examples through the "pyconc.examples" entry point group, using the same
+"module:Class" target strings as the built-in table below.
+
+The examples run on threads. One example per family also has process and
+asyncio implementations, and the deadlock family has several process ones,
+registered under the same name in BACKEND_EXAMPLES.
+"""
+
+import importlib
+import inspect
+import sys
+from typing import Any, Callable, Dict
+
+ENTRY_POINT_GROUP = "pyconc.examples"
+
+# Built-in examples, in the order they are shown by --help and --list
+EXAMPLES: Dict[str, str] = {
+    "deadlock": "examples.deadlock.deadlock_problem:DeadlockExample",
+    "deadlock-fix-resource-ordering": "examples.deadlock.deadlock_fix_resource_ordering:DeadlockFixResourceOrdering",
+    "deadlock-fix-timeout": "examples.deadlock.deadlock_fix_timeout:DeadlockFixTimeout",
+    "deadlock-fix-asymmetric-behavior": "examples.deadlock.deadlock_fix_asymmetric_behavior:DeadlockFixAsymmetricBehavior",
+    "deadlock-fix-waiter": "examples.deadlock.deadlock_fix_waiter:DeadlockFixWaiter",
+    "deadlock-fix-waiter-polling": "examples.deadlock.deadlock_fix_waiter:DeadlockFixWaiterPolling",
+    "deadlock-fix-chandy-misra": "examples.deadlock.deadlock_fix_chandy_misra:DeadlockFixChandyMisra",
+    "deadlock-fix-semaphore": "examples.deadlock.deadlock_fix_semaphore:DeadlockFixSemaphore",
+    "livelock": "examples.livelock.livelock_problem:LivelockExample",
+    "livelock-fix-random-backoff": "examples.livelock.livelock_fix_random_backoff:LivelockFixRandomBackoff",
+    "livelock-fix-priority": "examples.livelock.livelock_fix_priority:LivelockFixPriority",
+    "livelock-fix-arbiter": "examples.livelock.livelock_fix_arbiter:LivelockFixArbiter",
+    "starvation": "examples.starvation.starvation_problem:StarvationExample",
+    "starvation-fix-fair-scheduling": "examples.starvation.starvation_fix_fair_scheduling:StarvationFixFairScheduling",
+    "starvation-fix-fair-scheduling-race": "examples.starvation.starvation_fix_fair_scheduling:StarvationFixFairSchedulingRace",
+    "starvation-fix-aging": "examples.starvation.starvation_fix_aging:StarvationFixAging",
+    "starvation-fix-aging-sweep": "examples.starvation.starvation_fix_aging:StarvationFixAgingSweep",
+    "starvation-fix-weighted-fair": "examples.starvation.starvation_fix_weighted_fair:StarvationFixWeightedFair",
+    "starvation-readers-writers": "examples.starvation.starvation_readers_writers:StarvationReadersWriters",
+    "starvation-fix-writer-preference": "examples.starvation.starvation_readers_writers:StarvationFixWriterPreference",
+    "starvation-fix-phase-fair": "examples.starvation.starvation_readers_writers:StarvationFixPhaseFair",
+    "threadpool": "examples.threadpool.threadpool_problem:ThreadPoolExample",
+    "threadpool-polling-periodic": "examples.threadpool.threadpool_polling_periodic:ThreadPoolPollingPeriodic",
+    "threadpool-polling-adaptive": "examples.threadpool.threadpool_polling_adaptive:ThreadPoolPollingAdaptive",
+    "threadpool-polling-event-driven": "examples.threadpool.threadpool_polling_event_driven:ThreadPoolPollingEventDriven",
+    "threadpool-polling-batch": "examples.threadpool.threadpool_polling_batch:ThreadPoolPollingBatch",
+}
+
+# Execution backends; "thread" is the examples above
+BACKENDS = ("thread", "process", "asyncio")
+
+# Example name -> "module:Class" target of its implementation on each other backend
+BACKEND_EXAMPLES: Dict[str, Dict[str, str]] = {
+    "process": {
+        "deadlock-fix-resource-ordering": "examples.deadlock.deadlock_backends:DeadlockFixResourceOrderingProcess",
+        "deadlock-fix-timeout": "examples.deadlock.deadlock_backends:DeadlockFixTimeoutProcess",
+        "deadlock-fix-asymmetric-behavior": "examples.deadlock.deadlock_backends:DeadlockFixAsymmetricBehaviorProcess",
+        "deadlock-fix-semaphore": "examples.deadlock.deadlock_backends:DeadlockFixSemaphoreProcess",
+        "livelock-fix-random-backoff": "examples.livelock.livelock_backends:LivelockFixRandomBackoffProcess",
+        "starvation": "examples.starvation.starvation_backends:StarvationExampleProcess",
+        "threadpool-polling-event-driven": "examples.threadpool.threadpool_backends:ThreadPoolPollingEventDrivenProcess",
+    },
+    "asyncio": {
+        "deadlock-fix-resource-ordering": "examples.deadlock.deadlock_backends:DeadlockFixResourceOrderingAsyncio",
+        "livelock-fix-random-backoff": "examples.livelock.livelock_backends:LivelockFixRandomBackoffAsyncio",
+        "starvation": "examples.starvation.starvation_backends:StarvationExampleAsyncio",
+        "threadpool-polling-event-driven": "examples.threadpool.threadpool_backends:ThreadPoolPollingEventDrivenAsyncio",
+    },
+}
+
+
+def plugin_examples() -> Dict[str, str]:
+    """Return examples advertised by installed packages through entry points."""
+    # Deferred import: scanning installed distributions is only needed for
+    # --list and for names that are not built in.
+    from importlib.metadata import entry_points
+
+    eps = entry_points()
+    if hasattr(eps, "select"):
+        group = eps.select(group=ENTRY_POINT_GROUP)
+    else:
+        # Python 3.9 returns a dict of group name -> entry points
+        group = eps.get(ENTRY_POINT_GROUP, ())  # type: ignore[arg-type]
+    return {ep.name: ep.value for ep in group}
+
+
+def available_examples() -> Dict[str, str]:
+    """Return every known example name mapped to its "module:Class" target."""
+    examples = dict(EXAMPLES)
+    for name, target in plugin_examples().items():
+        # Built-in names always win over plugins
+        examples.setdefault(name, target)
+    return examples
+
+
+def resolve(name: str, backend: str = "thread") -> str:
+    """Return the "module:Class" target for an example name on a backend.
+
+    Raises KeyError for unknown names and ValueError if the example has no
+    implementation on the backend.
+    """
+    if backend != "thread":
+        if backend not in BACKEND_EXAMPLES:
+            raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+        targets = BACKEND_EXAMPLES[backend]
+        if name in targets:
+            return targets[name]
+        resolve(name)  # KeyError if the name is not known at all
+        raise ValueError(f"Example {name!r} has no {backend} backend (available: {', '.join(targets)})")
+
+    if name in EXAMPLES:
+        return EXAMPLES[name]
+    plugins = plugin_examples()
+    if name in plugins:
+        return plugins[name]
+    raise KeyError(name)
+
+
+def has_backend(name: str, backend: str) -> bool:
+    """Return True if the example can run on the backend."""
+    return backend == "thread" or name in BACKEND_EXAMPLES.get(backend, {})
+
+
+def load_target(target: str) -> type:
+    """Import a "module:Class" target and return the object it names."""
+    module_name, _, attr = target.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Invalid example target {target!r}, expected 'module:Class'")
+
+    obj: Any = importlib.import_module(module_name)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def load_example(name: str, backend: str = "thread") -> type:
+    """Import and return the example class registered under name for a backend."""
+    return load_target(resolve(name, backend))
+
+
+def lazy_attributes(package: str, exports: Dict[str, str]) -> Callable[[str], Any]:
+    """Return a module __getattr__ for package that imports each exported name from its module on first access.
+
+    exports maps each name to the module defining it, relative to package.
+    The value is cached in the package, so later lookups skip the hook.
+    """
+    namespace = sys.modules[package].__dict__
+
+    def __getattr__(name: str) -> Any:
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        namespace[name] = value
+        return value
+
+    return __getattr__
+
+
+def accepts_option(example_class: type, name: str) -> bool:
+    """Return True if the example constructor takes the named keyword option."""
+    parameters = inspect.signature(example_class).parameters
+    return name in parameters or any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values())
+
+
+def create_example(example_class: type, **options: Any) -> Any:
+    """Instantiate an example, passing only the options its constructor accepts."""
+    parameters = inspect.signature(example_class).parameters
+    if any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters.values()):
+        accepted = options
+    else:
+        accepted = {name: value for name, value in options.items() if name in parameters}
+    return example_class(**accepted)
@@ -3,8 +3,33 @@ Starvation package - Contains the starvation problem and various solutions.
 Shows how some threads can be perpetually denied access to resources and multiple ways to fix it.
 """
 
-from .starvation_problem import StarvationExample
-from .starvation_fix_fair_scheduling import StarvationFixFairScheduling
-from .starvation_fix_aging import StarvationFixAging
+from typing import TYPE_CHECKING
 
-__all__ = ["StarvationExample", "StarvationFixFairScheduling", "StarvationFixAging"]
+from ..registry import lazy_attributes
+
+if TYPE_CHECKING:
+    from .starvation_problem import StarvationExample  # noqa: F401
+    from .starvation_fix_fair_scheduling import StarvationFixFairScheduling, StarvationFixFairSchedulingRace  # noqa: F401
+    from .starvation_fix_aging import StarvationFixAging, StarvationFixAgingSweep  # noqa: F401
+    from .starvation_fix_weighted_fair import StarvationFixWeightedFair  # noqa: F401
+    from .starvation_readers_writers import StarvationReadersWriters, StarvationFixWriterPreference, StarvationFixPhaseFair  # noqa: F401
+    from .starvation_backends import StarvationExampleProcess, StarvationExampleAsyncio  # noqa: F401
+
+# Exported class name -> module that defines it (imported on first access)
+_EXPORTS = {
+    "StarvationExample": ".starvation_problem",
+    "StarvationFixFairScheduling": ".starvation_fix_fair_scheduling",
+    "StarvationFixFairSchedulingRace": ".starvation_fix_fair_scheduling",
+    "StarvationFixAging": ".starvation_fix_aging",
+    "StarvationFixAgingSweep": ".starvation_fix_aging",
+    "StarvationFixWeightedFair": ".starvation_fix_weighted_fair",
+    "StarvationReadersWriters": ".starvation_readers_writers",
+    "StarvationFixWriterPreference": ".starvation_readers_writers",
+    "StarvationFixPhaseFair": ".starvation_readers_writers",
+    "StarvationExampleProcess": ".starvation_backends",
+    "StarvationExampleAsyncio": ".starvation_backends",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_attributes(__name__, _EXPORTS)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Starvation Backends - Resource Starvation on Processes and asyncio
+The starvation problem with high and low priority workers as processes
+sharing one multiprocessing.Lock, or as tasks on one event loop sharing one
+asyncio.Lock. Timings and the default 3:2 high/low split match
+StarvationExample, so the three backends can be compared on the same workload.
+
+Like StarvationExample, both record every worker's waits for and holds of
+the resource and print their percentiles and the longest starvation streak.
+Each worker process records into its own AccessStats and returns its
+record to the parent; the count of grants they share lives in
+SharedCounters.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from ..common.access_stats import AccessStats, WorkerAccess
+from ..common.backends import ProcessGroup, SharedCounters, acquire_async, require_real_clock, run_tasks
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.priorities import split_priorities
+
+# (acquire timeout, hold time, pause between attempts) per priority
+TIMINGS = {"high": (0.01, 0.1, 0.05), "low": (0.1, 0.05, 0.2)}
+
+
+def _priority_worker_process(worker_key: str, stop, metrics: WorkMetrics, resource, grants: SharedCounters) -> WorkerAccess:
+    """High or low priority worker loop run in a child process; returns its waits and holds."""
+    acquire_timeout, hold, pause = TIMINGS[worker_key.split("-")[0]]
+    # Only the process holding resource writes the grant count, so it has one writer at a time
+    stats = AccessStats(grants=grants)
+    access = stats.worker(worker_key)
+    started_at = time.perf_counter()
+
+    try:
+        while not stop.is_set():
+            stats.waiting(access)
+            if resource.acquire(timeout=acquire_timeout):
+                stats.acquired(access)
+                waited = time.perf_counter() - started_at
+                log.info("Worker %s: Got resource!", worker_key)
+                time.sleep(hold)
+                stats.released(access)
+                resource.release()
+                metrics.record(waited, worker_key)
+                started_at = time.perf_counter()
+            time.sleep(pause)
+    finally:
+        grants.close()
+    return access
+
+
+class StarvationExampleProcess:
+    """Resource starvation with one process per worker."""
+
+    def __init__(self, num_workers: int = 5, num_low_priority: Optional[int] = None, clock=None):
+        self.clock = require_real_clock(clock, "process")
+        self.num_workers = num_workers
+        self.num_high_priority, self.num_low_priority = split_priorities(num_workers, num_low_priority)
+        self.group = ProcessGroup()
+        self.resource = self.group.context.Lock()
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
+
+    def run(self, duration: int = 8):
+        """Run the starvation example with process workers."""
+        print("\n=== STARVATION EXAMPLE (process backend) ===")
+        print(f"Running for {duration} seconds...")
+        print("Workers are processes sharing one multiprocessing.Lock.\n")
+
+        grants = SharedCounters(1)
+        try:
+            for i in range(self.num_high_priority):
+                self.group.start(_priority_worker_process, f"high-{i}", self.resource, grants)
+            for i in range(self.num_low_priority):
+                self.group.start(_priority_worker_process, f"low-{i}", self.resource, grants)
+
+            time.sleep(duration)
+
+            log.flush()
+            print("\nStopping workers...")
+            for access in self.group.stop_and_collect(self.metrics).values():
+                if access is not None:
+                    self.access.add(access)
+        finally:
+            grants.unlink()
+        print(self.access.report())
+        print("Starvation example completed.\n")
+
+
+class StarvationExampleAsyncio:
+    """Resource starvation with one asyncio task per worker."""
+
+    def __init__(self, num_workers: int = 5, num_low_priority: Optional[int] = None, clock=None):
+        self.clock = require_real_clock(clock, "asyncio")
+        self.num_workers = num_workers
+        self.num_high_priority, self.num_low_priority = split_priorities(num_workers, num_low_priority)
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
+
+    async def worker(self, worker_key: str, resource: asyncio.Lock, stop: asyncio.Event):
+        """High or low priority worker coroutine."""
+        acquire_timeout, hold, pause = TIMINGS[worker_key.split("-")[0]]
+        access = self.access.worker(worker_key)
+        started_at = time.perf_counter()
+
+        while not stop.is_set():
+            self.access.waiting(access)
+            if await acquire_async(resource, acquire_timeout):
+                self.access.acquired(access)
+                waited = time.perf_counter() - started_at
+                log.info("Worker %s: Got resource!", worker_key)
+                await asyncio.sleep(hold)
+                self.access.released(access)
+                resource.release()
+                self.metrics.record(waited, worker_key)
+                started_at = time.perf_counter()
+            await asyncio.sleep(pause)
+
+    async def main(self, duration: float):
+        resource, stop = asyncio.Lock(), asyncio.Event()
+        keys = [f"high-{i}" for i in range(self.num_high_priority)] + [f"low-{i}" for i in range(self.num_low_priority)]
+        await run_tasks([self.worker(key, resource, stop) for key in keys], duration, stop)
+
+    def run(self, duration: int = 8):
+        """Run the starvation example with asyncio workers."""
+        print("\n=== STARVATION EXAMPLE (asyncio backend) ===")
+        print(f"Running for {duration} seconds...")
+        print("Workers are tasks on one event loop sharing one asyncio.Lock.\n")
+
+        asyncio.run(self.main(duration))
+
+        log.flush()
+        print(self.access.report())
+        print("Starvation example completed.\n")
+
+
+if __name__ == "__main__":
+    # Allow running this file directly for testing
+    StarvationExampleProcess().run(8)
+    StarvationExampleAsyncio().run(8)
@@ -2,36 +2,189 @@
 """
 Starvation Fix - Aging Mechanism
 Fixes starvation by increasing priority of waiting threads over time.
+
+StarvationFixAging queues requests for the resource in an indexed heap,
+at most one entry per waiting worker, and each holder hands the resource
+straight to the head of the queue. A waiter's effective priority is its
+base priority plus aging_rate for every second it has waited, so a
+low-priority worker that has waited long enough outranks any newcomer.
+Every waiter ages at the same rate, so aging never reorders two waiters:
+the heap is keyed once, at enqueue, by aging_rate * enqueued_at - base, and
+the effective priority is computed from it only when asked for. There is no
+aging thread and no sweep, and the scheduler's memory is fixed by the
+number of workers however long it runs.
+
+StarvationFixAgingSweep is the original version, kept for comparison: an
+aging thread sweeps every worker's priority every 0.5 seconds, each request
+pushes another heap entry that nothing ever pops, and workers race for the
+resource with timed acquires regardless of priority.
+
+Both record each worker's waits for and holds of the resource and print
+their percentiles and the longest starvation streak after the run.
+
+"python3 -m examples.starvation.starvation_fix_aging --soak" runs 10,000
+workers for an hour of virtual time and prints the traced memory as it goes.
 """
 
-import threading
-import time
 import heapq
+import sys
+import tracemalloc
+from array import array
+from typing import Dict, List, Optional
+
+from ..common.access_stats import AccessStats
+from ..common.clock import get_clock
+from ..common.grant_monitor import HandOffMonitor
+from ..common.indexed_heap import IndexedHeap
+from ..common.log import OFF, log
+from ..common.metrics import WorkMetrics
+from ..common.priorities import split_priorities
+
+# Base priority of the high-priority workers; low-priority workers start at 0
+HIGH_PRIORITY = 2.0
+
 
+class StarvationFixAging(HandOffMonitor):
+    """Fixes starvation by granting the resource to the waiter with the highest aged priority.
 
-class StarvationFixAging:
-    """Fixes starvation by using aging mechanism for priority management."""
+    The hand-off monitor's queue is an indexed heap keyed by aged priority,
+    so release() passes the resource to its head.
+    """
 
-    def __init__(self, num_workers: int = 5):
+    def __init__(self, num_workers: int = 5, num_low_priority: Optional[int] = None, aging_rate: float = 1.0, clock=None):
+        super().__init__(num_workers, "scheduler", clock)
         self.num_workers = num_workers
-        self.resource = threading.Lock()
+        # The low-priority workers are the last ones
+        self.num_high_priority, self.num_low_priority = split_priorities(num_workers, num_low_priority)
+        # Priority gained per second of waiting
+        self.aging_rate = aging_rate
+        self.base_priority = array("d", [HIGH_PRIORITY] * self.num_high_priority + [0.0] * self.num_low_priority)
+        self.workers = []
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
+
+        # FIX: Scheduler state, guarded by the monitor; nothing here grows with time
+        self.queue = IndexedHeap(num_workers)
+        self.enqueued_at = array("d", bytes(8 * num_workers))
+        self.max_waiting = 0
+
+    def effective_priority(self, worker_id: int) -> float:
+        """Base priority plus aging_rate per second waited so far; the base priority if not waiting."""
+        if worker_id not in self.queue:
+            return self.base_priority[worker_id]
+        return self.base_priority[worker_id] + self.aging_rate * (self.clock.time() - self.enqueued_at[worker_id])
+
+    def _key(self, worker_id: int) -> float:
+        # Smallest key = highest effective priority at any moment, since all waiters age alike
+        return self.aging_rate * self.enqueued_at[worker_id] - self.base_priority[worker_id]
+
+    def set_priority(self, worker_id: int, priority: float):
+        """Change a worker's base priority, moving it in the queue if it is waiting."""
+        with self.monitor:
+            self.base_priority[worker_id] = priority
+            if worker_id in self.queue:
+                self.queue.push(worker_id, self._key(worker_id))
+
+    def enqueue(self, worker_id: int):
+        # FIX: One entry per waiter, keyed once; its priority ages without being touched
+        self.enqueued_at[worker_id] = self.clock.time()
+        self.queue.push(worker_id, self._key(worker_id))
+        self.max_waiting = max(self.max_waiting, len(self.queue))
+        log.debug("Worker %s: Queued behind worker %s, %s waiting", worker_id, self.holder, len(self.queue))
+
+    def dequeue(self) -> int:
+        # FIX: Grant from the head of the queue; nobody races for the resource
+        return self.queue.pop()
+
+    def waiting(self) -> bool:
+        return bool(self.queue)
+
+    def withdraw(self, worker_id: int):
+        self.queue.remove(worker_id)
+
+    def worker(self, worker_id: int):
+        """Worker function that waits its turn in the aging queue."""
+        access = self.access.worker(f"worker-{worker_id}")
+        log.info("Worker %s: Starting...", worker_id)
+
+        while self.running:
+            log.debug("Worker %s: Requesting resource...", worker_id)
+            self.access.waiting(access)
+            if not self.request(worker_id):
+                break
+
+            waited = self.access.acquired(access)
+            log.info("Worker %s: Got resource after %.3fs! Working...", worker_id, waited)
+            work_time = 0.1 + (worker_id % 5) * 0.05  # Different work times
+            self.clock.sleep(work_time)
+            log.info("Worker %s: Finished work, releasing resource", worker_id)
+
+            self.access.released(access)
+            self.release(worker_id)
+            self.metrics.record(waited, worker_id)
+
+            # FIX: Yield time to other workers
+            yield_time = 0.2
+            log.debug("Worker %s: Yielding for %ss...", worker_id, yield_time)
+            self.clock.sleep(yield_time)
+
+    def run(self, duration: int = 5):
+        """Run the aging mechanism fix example."""
+        print("\n=== STARVATION FIX: Aging Mechanism ===")
+        print(f"Running for {duration} seconds...")
+        print("This should NOT result in starvation due to aging mechanism!\n")
+        print(
+            f"{self.num_high_priority} workers start at priority {HIGH_PRIORITY:g} and {self.num_low_priority} at 0; "
+            f"waiters gain {self.aging_rate:g} per second and the highest is served next.\n"
+        )
+
+        # Start workers
+        for i in range(self.num_workers):
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
+
+        # Let it run for a while
+        self.clock.sleep(duration)
+        self.stop()
+
+        log.flush()
+        print("\nStopping workers...")
+        for thread in self.workers:
+            thread.join(timeout=1.0)
+        log.flush()
+        print(f"{self.handoffs} hand-offs, at most {self.max_waiting} workers waiting.")
+        print(self.access.report())
+        print("Aging mechanism fix example completed.\n")
+
+
+class StarvationFixAgingSweep:
+    """The original aging fix, kept for comparison: a periodic sweep ages every worker and workers race for the lock."""
+
+    def __init__(self, num_workers: int = 5, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.num_workers = num_workers
+        self.resource = self.clock.Lock("resource")
         self.workers = []
         self.running = True
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
 
-        # FIX: Aging mechanism using priority queue
+        # Aging mechanism using priority queue
         self.priority_queue = []
         self.worker_priorities = {i: 0 for i in range(num_workers)}
         self.worker_wait_times = {i: 0 for i in range(num_workers)}
-        self.queue_lock = threading.Lock()
+        self.queue_lock = self.clock.Lock("queue_lock")
 
         # Start the aging scheduler
-        self.aging_scheduler = threading.Thread(target=self.age_priorities)
+        self.aging_scheduler = self.clock.Thread(target=self.age_priorities, name="aging-scheduler")
         self.aging_scheduler.daemon = True
         self.aging_scheduler.start()
 
     def age_priorities(self):
         """Aging scheduler that increases priority of waiting workers."""
-        print("Aging Scheduler: Starting...")
+        log.info("Aging Scheduler: Starting...")
 
         while self.running:
             with self.queue_lock:
@@ -39,79 +192,143 @@ class StarvationFixAging:
                 for worker_id in range(self.num_workers):
                     if self.worker_wait_times[worker_id] > 0:
                         self.worker_priorities[worker_id] += 1
-                        print(f"Aging Scheduler: Worker {worker_id} priority increased to {self.worker_priorities[worker_id]}")
+                        log.debug("Aging Scheduler: Worker %s priority increased to %s", worker_id, self.worker_priorities[worker_id])
 
-            time.sleep(0.5)  # Age every 0.5 seconds
+            self.clock.sleep(0.5)  # Age every 0.5 seconds
 
-        print("Aging Scheduler: Stopping...")
+        log.info("Aging Scheduler: Stopping...")
 
     def worker(self, worker_id: int):
-        """Worker function that uses aging mechanism to avoid starvation."""
-        print(f"Worker {worker_id}: Starting...")
+        """Worker function that enqueues a request, then races for the resource."""
+        access = self.access.worker(f"worker-{worker_id}")
+        log.info("Worker %s: Starting...", worker_id)
+        started_at = self.clock.time()
 
         while self.running:
-            print(f"Worker {worker_id}: Requesting resource...")
+            log.debug("Worker %s: Requesting resource...", worker_id)
+            self.access.waiting(access)
 
-            # FIX: Add request to priority queue with aging
+            # Add request to priority queue with aging
             with self.queue_lock:
                 # Calculate priority based on base priority and aging
                 priority = self.worker_priorities[worker_id]
-                heapq.heappush(self.priority_queue, (-priority, time.time(), worker_id))
-                self.worker_wait_times[worker_id] = time.time()
-                print(f"Worker {worker_id}: Added to queue with priority {priority}")
+                heapq.heappush(self.priority_queue, (-priority, self.clock.time(), worker_id))
+                self.worker_wait_times[worker_id] = self.clock.time()
+                log.debug("Worker %s: Added to queue with priority %s", worker_id, priority)
 
             # Wait for our turn (simplified - in real implementation this would be more sophisticated)
-            time.sleep(0.1)
+            self.clock.sleep(0.1)
 
             # Try to acquire the resource
             if self.resource.acquire(timeout=0.3):
-                print(f"Worker {worker_id}: Got resource! Working...")
+                self.access.acquired(access)
+                waited = self.clock.time() - started_at
+                log.info("Worker %s: Got resource! Working...", worker_id)
 
-                # FIX: Reset wait time and priority when we get the resource
+                # Reset wait time and priority when we get the resource
                 with self.queue_lock:
                     self.worker_wait_times[worker_id] = 0
                     self.worker_priorities[worker_id] = 0
 
                 work_time = 0.1 + (worker_id * 0.05)  # Different work times
-                time.sleep(work_time)
-                print(f"Worker {worker_id}: Finished work, releasing resource")
+                self.clock.sleep(work_time)
+                log.info("Worker %s: Finished work, releasing resource", worker_id)
 
+                self.access.released(access)
                 self.resource.release()
+                self.metrics.record(waited, worker_id)
+                started_at = self.clock.time()
 
-                # FIX: Yield time to other workers
+                # Yield time to other workers
                 yield_time = 0.2
-                print(f"Worker {worker_id}: Yielding for {yield_time}s...")
-                time.sleep(yield_time)
+                log.debug("Worker %s: Yielding for %ss...", worker_id, yield_time)
+                self.clock.sleep(yield_time)
             else:
-                print(f"Worker {worker_id}: Resource acquisition timeout, retrying...")
-                time.sleep(0.1)
+                log.debug("Worker %s: Resource acquisition timeout, retrying...", worker_id)
+                self.clock.sleep(0.1)
 
     def run(self, duration: int = 5):
-        """Run the aging mechanism fix example."""
-        print("\n=== STARVATION FIX: Aging Mechanism ===")
+        """Run the original aging mechanism fix example."""
+        print("\n=== STARVATION FIX: Aging Mechanism (periodic sweep) ===")
         print(f"Running for {duration} seconds...")
-        print("This should NOT result in starvation due to aging mechanism!\n")
-        print("Worker priorities increase over time to ensure fair access.\n")
+        print("Priorities are aged by a sweep, but workers still race for a plain lock.\n")
 
         # Start workers
         for i in range(self.num_workers):
-            thread = threading.Thread(target=self.worker, args=(i,))
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
             thread.daemon = True
             thread.start()
             self.workers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping workers and aging scheduler...")
         for thread in self.workers:
             thread.join(timeout=1.0)
         self.aging_scheduler.join(timeout=1.0)
-        print("Aging mechanism fix example completed.\n")
+        log.flush()
+        print(self.access.report())
+        print(f"Sweeping aging example completed with {len(self.priority_queue)} requests left in its queue.\n")
+
+
+def soak(num_workers: int = 10000, duration: float = 3600.0, samples: int = 6, seed: int = 0) -> List[Dict[str, float]]:
+    """Run StarvationFixAging on the virtual clock with tracemalloc on; sample memory samples times.
+
+    Each sample is taken at an even fraction of duration and gives the
+    virtual time, the traced memory in bytes, the waiters queued and the
+    critical sections completed so far. The metrics record their waits into
+    a Histogram rather than one float per critical section, so memory that
+    stays flat from one sample to the next means nothing grows with time.
+    """
+    # Deferred: the virtual clock is only needed here
+    from ..common.clock import VirtualClock
+
+    rows = []
+    level, log.level = log.level, OFF
+    tracemalloc.start()
+    try:
+        with VirtualClock(jitter=0, seed=seed) as clock:
+            example = StarvationFixAging(num_workers=num_workers, clock=clock)
+            example.metrics = WorkMetrics("critical sections", histogram=True)
+            for i in range(num_workers):
+                thread = clock.Thread(target=example.worker, args=(i,), name=f"worker-{i}")
+                thread.start()
+                example.workers.append(thread)
+            for sample in range(1, samples + 1):
+                clock.sleep(duration * sample / samples - clock.time())
+                with example.monitor:
+                    rows.append(
+                        {
+                            "time": clock.time(),
+                            "memory": tracemalloc.get_traced_memory()[0],
+                            "waiting": len(example.queue),
+                            "sections": example.metrics.count,
+                        }
+                    )
+            example.stop()
+            for thread in example.workers:
+                thread.join(timeout=1.0)
+    finally:
+        tracemalloc.stop()
+        log.level = level
+    return rows
+
+
+def format_soak(rows: List[Dict[str, float]]) -> str:
+    """Render soak() rows as a table."""
+    lines = [f"{'time':>8}  {'memory':>10}  {'waiting':>7}  {'sections':>8}"]
+    for row in rows:
+        lines.append(f"{row['time']:>7.0f}s  {row['memory'] / 1e6:>8.2f}MB  {row['waiting']:>7}  {row['sections']:>8}")
+    return "\n".join(lines)
 
 
 if __name__ == "__main__":
-    # Allow running this file directly for testing
-    example = StarvationFixAging()
-    example.run(5)
+    if "--soak" in sys.argv[1:]:
+        print(format_soak(soak()))
+    else:
+        # Allow running this file directly for testing
+        example = StarvationFixAging()
+        example.run(5)
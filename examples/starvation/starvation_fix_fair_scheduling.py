@@ -2,34 +2,121 @@
 """
 Starvation Fix - Fair Scheduling
 Fixes starvation by ensuring all threads get equal access to resources.
+StarvationFixFairScheduling guards the resource with a FairLock, which
+queues waiters in arrival order and hands the resource from each holder
+straight to the next; StarvationFixFairSchedulingRace is the original
+version, where requests go to a scheduler that grants nothing and workers
+race for a plain lock.
+
+Both record each worker's waits for and holds of the resource, and print
+their percentiles and the longest starvation streak after the run, so the
+fairness can be measured rather than read off the narration.
 """
 
-import threading
-import time
 import queue
 
+from ..common.access_stats import AccessStats
+from ..common.clock import get_clock
+from ..common.fair_lock import FairLock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
 
 class StarvationFixFairScheduling:
-    """Fixes starvation by using fair scheduling for resource allocation."""
+    """Fixes starvation with a FIFO lock that hands the resource directly to the longest waiter."""
 
-    def __init__(self, num_workers: int = 5):
+    def __init__(self, num_workers: int = 5, clock=None):
+        self.clock = clock if clock is not None else get_clock()
         self.num_workers = num_workers
-        self.resource = threading.Lock()
+        # FIX: Waiters are queued in arrival order and served in that order
+        self.resource = FairLock("resource", clock=self.clock)
         self.workers = []
         self.running = True
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
+
+    def worker(self, worker_id: int):
+        """Worker function that queues for the resource and is handed it in turn."""
+        access = self.access.worker(f"worker-{worker_id}")
+        log.info("Worker %s: Starting...", worker_id)
+
+        while self.running:
+            log.debug("Worker %s: Requesting resource...", worker_id)
+            self.access.waiting(access)
+
+            # FIX: Join the queue; the previous holder hands the resource over when it is our turn
+            self.resource.acquire()
+            if not self.running:
+                self.resource.release()
+                break
+
+            waited = self.access.acquired(access)
+            log.info("Worker %s: Got resource after %.3fs! Working...", worker_id, waited)
+            work_time = 0.1 + (worker_id * 0.05)  # Different work times
+            self.clock.sleep(work_time)
+            log.info("Worker %s: Finished work, releasing resource", worker_id)
+
+            self.access.released(access)
+            self.resource.release()
+            self.metrics.record(waited, worker_id)
+
+            # Yield time to other workers
+            yield_time = 0.1
+            log.debug("Worker %s: Yielding for %ss...", worker_id, yield_time)
+            self.clock.sleep(yield_time)
 
-        # FIX: Fair scheduling using a queue
-        self.request_queue = queue.Queue()
+    def run(self, duration: int = 5):
+        """Run the fair scheduling fix example."""
+        print("\n=== STARVATION FIX: Fair Scheduling ===")
+        print(f"Running for {duration} seconds...")
+        print("This should NOT result in starvation due to fair scheduling!\n")
+        print("Workers queue for the resource and each holder hands it to the next in line.\n")
+
+        # Start workers
+        for i in range(self.num_workers):
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
+
+        # Let it run for a while
+        self.clock.sleep(duration)
+        self.running = False
+
+        log.flush()
+        print("\nStopping workers...")
+        for thread in self.workers:
+            thread.join(timeout=1.0)
+        log.flush()
+        print(f"{self.resource.handoffs} hand-offs.")
+        print(self.access.report())
+        print("Fair scheduling fix example completed.\n")
+
+
+class StarvationFixFairSchedulingRace:
+    """The original fair scheduling fix, kept for comparison: the scheduler grants nothing and workers race for the lock."""
+
+    def __init__(self, num_workers: int = 5, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.num_workers = num_workers
+        self.resource = self.clock.Lock("resource")
+        self.workers = []
+        self.running = True
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
+
+        # Fair scheduling using a queue
+        self.request_queue = self.clock.Queue()
         self.scheduler_running = True
 
         # Start the fair scheduler
-        self.scheduler_thread = threading.Thread(target=self.fair_scheduler)
+        self.scheduler_thread = self.clock.Thread(target=self.fair_scheduler, name="fair-scheduler")
         self.scheduler_thread.daemon = True
         self.scheduler_thread.start()
 
     def fair_scheduler(self):
         """Fair scheduler that processes requests in order."""
-        print("Fair Scheduler: Starting...")
+        log.info("Fair Scheduler: Starting...")
 
         while self.scheduler_running:
             try:
@@ -37,76 +124,86 @@ class StarvationFixFairScheduling:
                 worker_id, request_type = self.request_queue.get(timeout=0.1)
 
                 if request_type == "acquire":
-                    print(f"Fair Scheduler: Granting resource to Worker {worker_id}")
+                    log.info("Fair Scheduler: Granting resource to Worker %s", worker_id)
                     # Signal that the worker can proceed
                     self.request_queue.task_done()
 
                 elif request_type == "release":
-                    print(f"Fair Scheduler: Worker {worker_id} released resource")
+                    log.debug("Fair Scheduler: Worker %s released resource", worker_id)
                     self.request_queue.task_done()
 
             except queue.Empty:
                 continue
 
-        print("Fair Scheduler: Stopping...")
+        log.info("Fair Scheduler: Stopping...")
 
     def worker(self, worker_id: int):
-        """Worker function that uses fair scheduling to avoid starvation."""
-        print(f"Worker {worker_id}: Starting...")
+        """Worker function that requests the resource from the scheduler, then races for the lock."""
+        access = self.access.worker(f"worker-{worker_id}")
+        log.info("Worker %s: Starting...", worker_id)
+        started_at = self.clock.time()
 
         while self.running:
-            print(f"Worker {worker_id}: Requesting resource...")
+            log.debug("Worker %s: Requesting resource...", worker_id)
+            self.access.waiting(access)
 
-            # FIX: Request resource through fair scheduler
+            # Request resource through fair scheduler
             self.request_queue.put((worker_id, "acquire"))
 
             # Wait for scheduler to process request
-            time.sleep(0.05)
+            self.clock.sleep(0.05)
 
             # Now try to acquire the resource
             if self.resource.acquire(timeout=0.2):
-                print(f"Worker {worker_id}: Got resource! Working...")
+                self.access.acquired(access)
+                waited = self.clock.time() - started_at
+                log.info("Worker %s: Got resource! Working...", worker_id)
                 work_time = 0.1 + (worker_id * 0.05)  # Different work times
-                time.sleep(work_time)
-                print(f"Worker {worker_id}: Finished work, releasing resource")
+                self.clock.sleep(work_time)
+                log.info("Worker %s: Finished work, releasing resource", worker_id)
 
+                self.access.released(access)
                 self.resource.release()
+                self.metrics.record(waited, worker_id)
+                started_at = self.clock.time()
 
-                # FIX: Notify scheduler of release
+                # Notify scheduler of release
                 self.request_queue.put((worker_id, "release"))
 
-                # FIX: Yield time to other workers
+                # Yield time to other workers
                 yield_time = 0.1
-                print(f"Worker {worker_id}: Yielding for {yield_time}s...")
-                time.sleep(yield_time)
+                log.debug("Worker %s: Yielding for %ss...", worker_id, yield_time)
+                self.clock.sleep(yield_time)
             else:
-                print(f"Worker {worker_id}: Resource acquisition timeout, retrying...")
-                time.sleep(0.1)
+                log.debug("Worker %s: Resource acquisition timeout, retrying...", worker_id)
+                self.clock.sleep(0.1)
 
     def run(self, duration: int = 5):
-        """Run the fair scheduling fix example."""
-        print("\n=== STARVATION FIX: Fair Scheduling ===")
+        """Run the original fair scheduling fix example."""
+        print("\n=== STARVATION FIX: Fair Scheduling (racing for the lock) ===")
         print(f"Running for {duration} seconds...")
-        print("This should NOT result in starvation due to fair scheduling!\n")
-        print("A fair scheduler ensures all workers get equal access to resources.\n")
+        print("Requests are queued, but workers still race for a plain lock.\n")
 
         # Start workers
         for i in range(self.num_workers):
-            thread = threading.Thread(target=self.worker, args=(i,))
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=f"worker-{i}")
             thread.daemon = True
             thread.start()
             self.workers.append(thread)
 
         # Let it run for a while
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
         self.scheduler_running = False
 
+        log.flush()
         print("\nStopping workers and scheduler...")
         for thread in self.workers:
             thread.join(timeout=1.0)
         self.scheduler_thread.join(timeout=1.0)
-        print("Fair scheduling fix example completed.\n")
+        log.flush()
+        print(self.access.report())
+        print("Racing fair scheduling example completed.\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Starvation Fix - Weighted Fair Queuing
+Fixes starvation by giving each priority class a guaranteed share of the
+resource instead of strict precedence: by default high-priority workers get
+70% of the time the resource is held and low-priority workers 30%, however
+hard the high-priority ones push.
+
+Waiting workers queue per class, and a deficit round-robin scheduler picks
+whom the resource goes to next. Classes take turns; on each turn a class
+earns a quantum of credit in proportion to its weight and is served while
+its credit covers the hold time of the worker at the head of its queue. A
+class whose queue empties forfeits its credit, so an idle class cannot save
+up a burst. Every quantum is at least the longest hold time, so each turn
+serves at least one worker and picking the next one is O(1).
+
+Shares are measured in time held, not in grants: a low-priority critical
+section is half as long as a high-priority one, so the low class gets
+about twice as many grants per unit of credit. run() prints the share each
+class achieved in every reporting window next to its target, then each
+worker's waits and holds and the longest starvation streak.
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..common.access_stats import AccessStats
+from ..common.grant_monitor import HandOffMonitor
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.priorities import split_priorities
+
+# Default share of the resource per class; every weight must be positive, so no class is ever shut out
+DEFAULT_WEIGHTS = {"high": 0.7, "low": 0.3}
+
+# Seconds each class holds the resource per critical section, as in StarvationExample
+HOLD_TIME = {"high": 0.1, "low": 0.05}
+
+
+class StarvationFixWeightedFair(HandOffMonitor):
+    """Fixes starvation by sharing the resource between priority classes by weight, with deficit round-robin.
+
+    The hand-off monitor queues waiters per class, and deficit round-robin
+    over the classes picks whom release() passes the resource to.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 5,
+        num_low_priority: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None,
+        report_interval: Optional[float] = None,
+        clock=None,
+    ):
+        super().__init__(num_workers, "scheduler", clock)
+        self.num_workers = num_workers
+        # The low-priority workers are the last ones
+        self.num_high_priority, self.num_low_priority = split_priorities(num_workers, num_low_priority)
+        self.classes = ["high"] * self.num_high_priority + ["low"] * self.num_low_priority
+        self.names = [f"high-{i}" for i in range(self.num_high_priority)] + [f"low-{i}" for i in range(self.num_low_priority)]
+
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        if set(weights) != set(HOLD_TIME):
+            raise ValueError(f"weights must be given for the classes {', '.join(HOLD_TIME)}, got {', '.join(weights)}")
+        if min(weights.values()) <= 0:
+            raise ValueError(f"every weight must be positive, got {weights}")
+        total = sum(weights.values())
+        # Target share of the resource's held time per class
+        self.targets = {name: weight / total for name, weight in weights.items()}
+        # FIX: Credit per turn in proportion to weight, the smallest covering the longest hold, so every turn serves someone
+        scale = max(HOLD_TIME.values()) / min(self.targets.values())
+        self.quantum = {name: share * scale for name, share in self.targets.items()}
+        # Seconds between share reports; None reports ten times per run
+        self.report_interval = report_interval
+
+        self.workers = []
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
+
+        # FIX: Scheduler state, guarded by the monitor
+        self.queues: Dict[str, Deque[int]] = {name: deque() for name in HOLD_TIME}
+        self.deficit = {name: 0.0 for name in HOLD_TIME}
+        # Classes with someone waiting, in round-robin order; the first one is taking its turn
+        self.active: Deque[str] = deque()
+        self.turn_started = False
+
+        # Time each class has held the resource, and the share per class in each reporting window
+        self.held = {name: 0.0 for name in HOLD_TIME}
+        self.shares: List[Tuple[float, Dict[str, float]]] = []
+        self._last_held = dict(self.held)
+
+    def dequeue(self) -> int:
+        """Pick the next worker by deficit round-robin."""
+        while True:
+            name = self.active[0]
+            if not self.turn_started:
+                self.deficit[name] += self.quantum[name]
+                self.turn_started = True
+            queue = self.queues[name]
+            cost = HOLD_TIME[name]
+            if self.deficit[name] >= cost:
+                self.deficit[name] -= cost
+                worker_id = queue.popleft()
+                if not queue:
+                    # An idle class keeps no credit
+                    self.active.popleft()
+                    self.deficit[name] = 0.0
+                    self.turn_started = False
+                return worker_id
+            # Out of credit: the next class takes its turn; its quantum covers at least one hold
+            self.active.rotate(-1)
+            self.turn_started = False
+
+    def enqueue(self, worker_id: int):
+        name = self.classes[worker_id]
+        queue = self.queues[name]
+        if not queue:
+            self.active.append(name)
+        queue.append(worker_id)
+        log.debug("Worker %s: Queued with %s other %s-priority workers", self.names[worker_id], len(queue) - 1, name)
+
+    def waiting(self) -> bool:
+        return bool(self.active)
+
+    def withdraw(self, worker_id: int):
+        name = self.classes[worker_id]
+        queue = self.queues[name]
+        queue.remove(worker_id)
+        if not queue:
+            if self.active[0] == name:
+                self.turn_started = False
+            self.active.remove(name)
+
+    def release(self, worker_id: int, held: float = 0.0):
+        """Account held seconds to worker_id's class and hand the resource to the next worker, or free it."""
+        with self.monitor:
+            self.held[self.classes[worker_id]] += held
+            # FIX: The scheduler, not a race for the lock, decides who goes next
+            self.hand_over()
+
+    def worker(self, worker_id: int):
+        """Worker function that queues in its class and holds the resource for its class's hold time."""
+        name = self.names[worker_id]
+        hold_time = HOLD_TIME[self.classes[worker_id]]
+        access = self.access.worker(name)
+        log.info("Worker %s: Starting...", name)
+
+        while self.running:
+            self.access.waiting(access)
+            if not self.request(worker_id):
+                break
+
+            waited = self.access.acquired(access)
+            log.info("Worker %s: Got resource after %.3fs!", name, waited)
+            self.clock.sleep(hold_time)
+            self.release(worker_id, self.access.released(access))
+            log.debug("Worker %s: Released resource", name)
+            self.metrics.record(waited, name)
+
+            # Come straight back, so both classes always want more than their share
+            self.clock.sleep(0.05)
+
+    def sample_shares(self) -> Dict[str, float]:
+        """Record and return each class's share of the time the resource was held since the last sample."""
+        with self.monitor:
+            window = {name: self.held[name] - self._last_held[name] for name in self.held}
+            self._last_held = dict(self.held)
+        busy = sum(window.values())
+        shares = {name: held / busy if busy else 0.0 for name, held in window.items()}
+        self.shares.append((self.clock.time(), shares))
+        return shares
+
+    def share_report(self) -> str:
+        """Return the achieved share per class in every window, and overall, against the targets."""
+        names = list(self.targets)
+        lines = [f"{'time':>8}  " + "  ".join(f"{name + ' share':>11}" for name in names)]
+        lines.append(f"{'target':>8}  " + "  ".join(f"{self.targets[name]:>10.1%} " for name in names))
+        for at, shares in self.shares:
+            lines.append(f"{at:>7.1f}s  " + "  ".join(f"{shares[name]:>10.1%} " for name in names))
+        total = sum(self.held.values())
+        if total:
+            lines.append(f"{'overall':>8}  " + "  ".join(f"{self.held[name] / total:>10.1%} " for name in names))
+        return "\n".join(lines)
+
+    def run(self, duration: int = 8):
+        """Run the weighted fair queuing fix example."""
+        print("\n=== STARVATION FIX: Weighted Fair Queuing ===")
+        print(f"Running for {duration} seconds...")
+        print("This should NOT result in starvation: every class gets its share!\n")
+        targets = ", ".join(f"{name} {share:.0%}" for name, share in self.targets.items())
+        print(f"{self.num_high_priority} high- and {self.num_low_priority} low-priority workers share the resource {targets}.\n")
+
+        # Start workers
+        for i in range(self.num_workers):
+            thread = self.clock.Thread(target=self.worker, args=(i,), name=self.names[i])
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
+
+        # Let it run for a while, measuring the shares as it goes
+        interval = self.report_interval or duration / 10
+        started = self.clock.time()
+        while self.clock.time() - started < duration:
+            self.clock.sleep(min(interval, duration - (self.clock.time() - started)))
+            self.sample_shares()
+        self.stop()
+
+        log.flush()
+        print("\nStopping workers...")
+        for thread in self.workers:
+            thread.join(timeout=1.0)
+        log.flush()
+        print("Share of the time the resource was held:")
+        print(self.share_report())
+        print(self.access.report())
+        print("Weighted fair queuing fix example completed.\n")
+
+
+if __name__ == "__main__":
+    # Allow running this file directly for testing
+    example = StarvationFixWeightedFair()
+    example.run(8)
@@ -2,47 +2,75 @@
 """
 Starvation Example - Resource Starvation
 Demonstrates resource starvation where high-priority workers can starve low-priority ones.
+
+Every worker records how long it waited for the resource and held it; run()
+ends with the percentiles per worker and the longest starvation streak.
 """
 
-import threading
-import time
-import queue
+from typing import Optional
+
+from ..common.access_stats import AccessStats
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.priorities import split_priorities
 
 
 class StarvationExample:
     """Demonstrates resource starvation."""
 
-    def __init__(self):
-        self.resource = threading.Lock()
-        self.high_priority_queue = queue.Queue()
-        self.low_priority_queue = queue.Queue()
+    def __init__(self, num_workers: int = 5, num_low_priority: Optional[int] = None, clock=None):
+        self.clock = clock if clock is not None else get_clock()
+        self.num_workers = num_workers
+        self.num_high_priority, self.num_low_priority = split_priorities(num_workers, num_low_priority)
+        self.resource = self.clock.Lock("resource")
+        self.high_priority_queue = self.clock.Queue()
+        self.low_priority_queue = self.clock.Queue()
         self.running = True
+        self.metrics = WorkMetrics("critical sections")
+        self.access = AccessStats(self.clock)
 
     def high_priority_worker(self, worker_id: int):
         """High priority worker that can starve others."""
+        access = self.access.worker(f"high-{worker_id}")
+        started_at = self.clock.time()
         while self.running:
             try:
+                self.access.waiting(access)
                 # High priority workers get immediate access
                 if self.resource.acquire(timeout=0.01):
-                    print(f"High Priority Worker {worker_id}: Got resource!")
-                    time.sleep(0.1)  # Hold resource longer
+                    self.access.acquired(access)
+                    waited = self.clock.time() - started_at
+                    log.info("High Priority Worker %s: Got resource!", worker_id)
+                    self.clock.sleep(0.1)  # Hold resource longer
+                    self.access.released(access)
                     self.resource.release()
-                    print(f"High Priority Worker {worker_id}: Released resource")
-                time.sleep(0.05)  # Very short wait
+                    log.debug("High Priority Worker %s: Released resource", worker_id)
+                    self.metrics.record(waited, f"high-{worker_id}")
+                    started_at = self.clock.time()
+                self.clock.sleep(0.05)  # Very short wait
             except Exception:
                 pass
 
     def low_priority_worker(self, worker_id: int):
         """Low priority worker that may get starved."""
+        access = self.access.worker(f"low-{worker_id}")
+        started_at = self.clock.time()
         while self.running:
             try:
+                self.access.waiting(access)
                 # Low priority workers wait longer
                 if self.resource.acquire(timeout=0.1):
-                    print(f"Low Priority Worker {worker_id}: Got resource!")
-                    time.sleep(0.05)  # Hold resource briefly
+                    self.access.acquired(access)
+                    waited = self.clock.time() - started_at
+                    log.info("Low Priority Worker %s: Got resource!", worker_id)
+                    self.clock.sleep(0.05)  # Hold resource briefly
+                    self.access.released(access)
                     self.resource.release()
-                    print(f"Low Priority Worker {worker_id}: Released resource")
-                time.sleep(0.2)  # Longer wait
+                    log.debug("Low Priority Worker %s: Released resource", worker_id)
+                    self.metrics.record(waited, f"low-{worker_id}")
+                    started_at = self.clock.time()
+                self.clock.sleep(0.2)  # Longer wait
             except Exception:
                 pass
 
@@ -57,26 +85,29 @@ class StarvationExample:
         low_workers = []
 
         # Start more high priority workers
-        for i in range(3):
-            thread = threading.Thread(target=self.high_priority_worker, args=(i,))
+        for i in range(self.num_high_priority):
+            thread = self.clock.Thread(target=self.high_priority_worker, args=(i,), name=f"high-{i}")
             thread.daemon = True
             thread.start()
             high_workers.append(thread)
 
         # Start fewer low priority workers
-        for i in range(2):
-            thread = threading.Thread(target=self.low_priority_worker, args=(i,))
+        for i in range(self.num_low_priority):
+            thread = self.clock.Thread(target=self.low_priority_worker, args=(i,), name=f"low-{i}")
             thread.daemon = True
             thread.start()
             low_workers.append(thread)
 
         # Let them run
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping workers...")
         for thread in high_workers + low_workers:
             thread.join(timeout=1.0)
+        log.flush()
+        print(self.access.report())
         print("Starvation example completed.\n")
 
 
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Starvation - Readers and Writers
+Writers starved by a steady stream of readers, and two fixes.
+
+Readers and writers share one ReaderWriterLock. Each reader reads for
+about read_time and pauses for about reader_pause, each writer writes for
+about write_time and pauses for about writer_pause (each between half and
+one and a half times the mean, so readers drift out of step); the numbers
+of each and those four times set the read/write mix. With reader
+preference a reader gets in whenever no writer is writing, so once enough
+readers overlap the lock is never free of them and writers wait
+indefinitely. Writer preference stops new readers
+while a writer waits; phase-fair does too, and also lets every waiting
+reader in after each write, so neither side waits for more than one phase
+of the other.
+
+Every worker records its waits and holds, readers and writers separately;
+run() ends with both reports and the reads and writes completed per second.
+"""
+
+import random
+
+from ..common.access_stats import AccessStats
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+from ..common.rw_lock import PHASE_FAIR, READER_PREFERENCE, WRITER_PREFERENCE, ReaderWriterLock
+
+
+class _ReadersWriters:
+    """Readers and writers sharing a reader-writer lock; subclasses set the title, short name and policy."""
+
+    title = ""
+    # Short name for the completion line
+    name = ""
+    policy = READER_PREFERENCE
+
+    def __init__(
+        self,
+        num_readers: int = 8,
+        num_writers: int = 2,
+        read_time: float = 0.05,
+        write_time: float = 0.05,
+        reader_pause: float = 0.01,
+        writer_pause: float = 0.2,
+        clock=None,
+    ):
+        self.clock = clock if clock is not None else get_clock()
+        self.num_readers = num_readers
+        self.num_writers = num_writers
+        self.read_time = read_time
+        self.write_time = write_time
+        self.reader_pause = reader_pause
+        self.writer_pause = writer_pause
+        self.resource = ReaderWriterLock(self.policy, "resource", clock=self.clock)
+        self.workers = []
+        self.running = True
+        self.metrics = WorkMetrics("critical sections")
+        # The lock counts grants itself: readers hold it together, so there is no single holder to do it
+        self.reader_access = AccessStats(self.clock, grants=self.resource.grants, lock_counts_grants=True)
+        self.writer_access = AccessStats(self.clock, grants=self.resource.grants, lock_counts_grants=True)
+
+    def reader(self, reader_id: int):
+        """Reader that reads, pauses briefly and reads again."""
+        name = f"reader-{reader_id}"
+        access = self.reader_access.worker(name)
+        log.info("Reader %s: Starting...", reader_id)
+
+        while self.running:
+            self.reader_access.waiting(access)
+            self.resource.acquire_read()
+            waited = self.reader_access.acquired(access)
+            log.debug("Reader %s: Reading after %.3fs, %s readers in", reader_id, waited, self.resource.readers)
+            self.clock.sleep(self.read_time * random.uniform(0.5, 1.5))
+            self.reader_access.released(access)
+            self.resource.release_read()
+            self.metrics.record(waited, name)
+            self.clock.sleep(self.reader_pause * random.uniform(0.5, 1.5))
+
+    def writer(self, writer_id: int):
+        """Writer that needs the lock to itself."""
+        name = f"writer-{writer_id}"
+        access = self.writer_access.worker(name)
+        log.info("Writer %s: Starting...", writer_id)
+
+        while self.running:
+            log.debug("Writer %s: Waiting to write...", writer_id)
+            self.writer_access.waiting(access)
+            self.resource.acquire_write()
+            waited = self.writer_access.acquired(access)
+            log.info("Writer %s: Writing after %.3fs", writer_id, waited)
+            self.clock.sleep(self.write_time * random.uniform(0.5, 1.5))
+            self.writer_access.released(access)
+            self.resource.release_write()
+            self.metrics.record(waited, name)
+            self.clock.sleep(self.writer_pause * random.uniform(0.5, 1.5))
+
+    @staticmethod
+    def completed(stats: AccessStats) -> int:
+        """Critical sections completed by the workers recorded in stats."""
+        return sum(access.hold.count for access in stats.workers.values())
+
+    def run(self, duration: int = 8):
+        """Run the readers and writers example."""
+        print(f"\n=== {self.title} ===")
+        print(f"Running for {duration} seconds...")
+        print(f"{self.num_readers} readers and {self.num_writers} writers share a {self.policy} reader-writer lock.\n")
+
+        # Writers first, so they are waiting before the readers pile in
+        for i in range(self.num_writers):
+            thread = self.clock.Thread(target=self.writer, args=(i,), name=f"writer-{i}")
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
+        for i in range(self.num_readers):
+            thread = self.clock.Thread(target=self.reader, args=(i,), name=f"reader-{i}")
+            thread.daemon = True
+            thread.start()
+            self.workers.append(thread)
+
+        # Let it run for a while
+        self.clock.sleep(duration)
+        self.running = False
+
+        log.flush()
+        print("\nStopping readers and writers...")
+        for thread in self.workers:
+            thread.join(timeout=1.0)
+        log.flush()
+        reads, writes = self.completed(self.reader_access), self.completed(self.writer_access)
+        print(f"{reads / duration:.2f} reads/s, {writes / duration:.2f} writes/s")
+        print("Writers:")
+        print(self.writer_access.report())
+        print("Readers:")
+        print(self.reader_access.report(limit=5))
+        print(f"{self.name} example completed.\n")
+
+
+class StarvationReadersWriters(_ReadersWriters):
+    """Writers starved by readers under a reader-preference lock."""
+
+    title = "STARVATION EXAMPLE (Readers and Writers, reader preference)"
+    name = "Readers-writers (reader preference)"
+    policy = READER_PREFERENCE
+
+
+class StarvationFixWriterPreference(_ReadersWriters):
+    """Fixes writer starvation by stopping new readers while a writer waits."""
+
+    title = "STARVATION FIX: Writer Preference"
+    name = "Writer preference fix"
+    policy = WRITER_PREFERENCE
+
+
+class StarvationFixPhaseFair(_ReadersWriters):
+    """Fixes writer starvation, without starving readers instead, by alternating reader and writer phases."""
+
+    title = "STARVATION FIX: Phase-Fair Reader-Writer Lock"
+    name = "Phase-fair fix"
+    policy = PHASE_FAIR
+
+
+READERS_WRITERS_EXAMPLES = {
+    READER_PREFERENCE: StarvationReadersWriters,
+    WRITER_PREFERENCE: StarvationFixWriterPreference,
+    PHASE_FAIR: StarvationFixPhaseFair,
+}
+
+
+if __name__ == "__main__":
+    # Allow running this file directly for testing
+    for example_class in READERS_WRITERS_EXAMPLES.values():
+        example_class().run(8)
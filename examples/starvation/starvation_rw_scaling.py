@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Readers-Writers Scaling - Throughput and Writer Waits as Readers Grow
+Runs the readers and writers example under each reader-writer lock policy
+with more and more readers and reports, for every policy and reader count,
+the reads and writes completed per second and the writers' wait at p50, p99
+and worst. Under reader preference the writers' wait grows with the readers
+until it is the whole run; writer preference and phase-fair keep it near
+one read. Runs on the virtual clock by default, so hundreds of readers over
+a minute take seconds and the same seed gives the same table.
+"""
+
+from typing import Dict, List, Sequence
+
+from ..common.histogram import Histogram
+from ..common.rw_lock import PHASE_FAIR, READER_PREFERENCE, RW_POLICIES, WRITER_PREFERENCE
+
+# The readers and writers example registered for each policy
+POLICY_EXAMPLES = {
+    READER_PREFERENCE: "starvation-readers-writers",
+    WRITER_PREFERENCE: "starvation-fix-writer-preference",
+    PHASE_FAIR: "starvation-fix-phase-fair",
+}
+
+
+def scale_readers(
+    policies: Sequence[str] = RW_POLICIES,
+    readers: Sequence[int] = (8, 64, 256),
+    num_writers: int = 2,
+    duration: float = 60.0,
+    seed: int = 0,
+    clock_kind: str = "virtual",
+) -> List[Dict[str, object]]:
+    """Run the example once per policy and number of readers, quietly; return one row per run."""
+    # Deferred: the benchmark runner imports the example registry
+    from ..common.bench import run_example
+
+    rows = []
+    for num_readers in readers:
+        for policy in policies:
+            example, elapsed = run_example(POLICY_EXAMPLES[policy], duration, seed, clock_kind, num_readers=num_readers, num_writers=num_writers)
+            writer_waits = Histogram.merged(access.wait for access in example.writer_access.workers.values())
+            reader_waits = Histogram.merged(access.wait for access in example.reader_access.workers.values())
+            rows.append(
+                {
+                    "policy": policy,
+                    "readers": num_readers,
+                    "writers": num_writers,
+                    "reads": example.completed(example.reader_access) / elapsed,
+                    "writes": example.completed(example.writer_access) / elapsed,
+                    "writer p50": writer_waits.percentile(50),
+                    "writer p99": writer_waits.percentile(99),
+                    "writer max": writer_waits.max / 1e9,
+                    "reader p99": reader_waits.percentile(99),
+                }
+            )
+    return rows
+
+
+def format_reader_scaling(rows: List[Dict[str, object]]) -> str:
+    """Render scale_readers() rows as a table."""
+    width = max([len("policy")] + [len(str(row["policy"])) for row in rows])
+    lines = [
+        f"{'readers':>7}  {'policy':<{width}}  {'reads/s':>9}  {'writes/s':>8}  {'writer p50':>10}  {'writer p99':>10}  "
+        f"{'writer max':>10}  {'reader p99':>10}"
+    ]
+    for row in rows:
+        lines.append(
+            f"{row['readers']:>7}  {row['policy']:<{width}}  {row['reads']:>9.1f}  {row['writes']:>8.2f}  {row['writer p50']:>9.3f}s  "
+            f"{row['writer p99']:>9.3f}s  {row['writer max']:>9.3f}s  {row['reader p99']:>9.3f}s"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(format_reader_scaling(scale_readers()))
@@ -3,16 +3,29 @@ ThreadPool package - Contains the ThreadPoolExecutor examples and polling patter
 Demonstrates various polling strategies using thread pools for concurrent task execution.
 """
 
-from .threadpool_problem import ThreadPoolExample
-from .threadpool_polling_periodic import ThreadPoolPollingPeriodic
-from .threadpool_polling_adaptive import ThreadPoolPollingAdaptive
-from .threadpool_polling_event_driven import ThreadPoolPollingEventDriven
-from .threadpool_polling_batch import ThreadPoolPollingBatch
+from typing import TYPE_CHECKING
 
-__all__ = [
-    "ThreadPoolExample",
-    "ThreadPoolPollingPeriodic",
-    "ThreadPoolPollingAdaptive",
-    "ThreadPoolPollingEventDriven",
-    "ThreadPoolPollingBatch",
-]
+from ..registry import lazy_attributes
+
+if TYPE_CHECKING:
+    from .threadpool_problem import ThreadPoolExample  # noqa: F401
+    from .threadpool_polling_periodic import ThreadPoolPollingPeriodic  # noqa: F401
+    from .threadpool_polling_adaptive import ThreadPoolPollingAdaptive  # noqa: F401
+    from .threadpool_polling_event_driven import ThreadPoolPollingEventDriven  # noqa: F401
+    from .threadpool_polling_batch import ThreadPoolPollingBatch  # noqa: F401
+    from .threadpool_backends import ThreadPoolPollingEventDrivenProcess, ThreadPoolPollingEventDrivenAsyncio  # noqa: F401
+
+# Exported class name -> module that defines it (imported on first access)
+_EXPORTS = {
+    "ThreadPoolExample": ".threadpool_problem",
+    "ThreadPoolPollingPeriodic": ".threadpool_polling_periodic",
+    "ThreadPoolPollingAdaptive": ".threadpool_polling_adaptive",
+    "ThreadPoolPollingEventDriven": ".threadpool_polling_event_driven",
+    "ThreadPoolPollingBatch": ".threadpool_polling_batch",
+    "ThreadPoolPollingEventDrivenProcess": ".threadpool_backends",
+    "ThreadPoolPollingEventDrivenAsyncio": ".threadpool_backends",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_attributes(__name__, _EXPORTS)
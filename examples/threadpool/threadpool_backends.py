@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+ThreadPool Backends - Event-Driven Polling on Processes and asyncio
+The event-driven poller with consumers in a ProcessPoolExecutor fed through
+multiprocessing.Manager queues, or as tasks on one event loop fed through
+asyncio.Queue. Event mix and processing times match
+ThreadPoolPollingEventDriven, so the three backends can be compared on the
+same workload.
+"""
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import queue
+import random
+import time
+
+from ..common.backends import require_real_clock, run_tasks
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
+PRIORITIES = ["high", "normal", "low"]
+WEIGHTS = [0.2, 0.5, 0.3]  # Normal events are most common
+PROCESS_TIMES = {"high": 0.05, "normal": 0.1, "low": 0.2}
+
+
+def _event_producer_process(producer_id: int, queues: dict, counters, counter_lock, stop, log_level: int, seed: int):
+    """Event producer run in a child process."""
+    log.level = log_level
+    random.seed(seed)
+
+    while not stop.is_set():
+        event_type = random.choices(PRIORITIES, weights=WEIGHTS)[0]
+        with counter_lock:
+            event_id = counters[event_type]
+            counters[event_type] = event_id + 1
+
+        queues[event_type].put({"id": event_id, "type": event_type, "created": time.perf_counter()})
+        log.info("Event Producer %s: Created %s priority event %s", producer_id, event_type, event_id)
+        time.sleep(random.uniform(0.1, 0.5))
+
+    log.flush()
+
+
+def _event_consumer_process(worker_id: int, queues: dict, stop, log_level: int):
+    """Event consumer run as a process pool task; returns its latencies."""
+    log.level = log_level
+    latencies = []
+
+    while not stop.is_set():
+        for event_type in PRIORITIES:
+            try:
+                event = queues[event_type].get_nowait()
+                break
+            except queue.Empty:
+                continue
+        else:
+            time.sleep(0.1)
+            continue
+
+        time.sleep(PROCESS_TIMES[event["type"]])
+        latencies.append(time.perf_counter() - event["created"])
+        log.info("Event Consumer %s: Completed %s priority event %s", worker_id, event["type"], event["id"])
+
+    log.flush()
+    return worker_id, latencies
+
+
+class ThreadPoolPollingEventDrivenProcess:
+    """Event-driven polling with a process pool of consumers."""
+
+    def __init__(self, num_workers: int = 3, num_producers: int = 1, clock=None):
+        self.clock = require_real_clock(clock, "process")
+        self.num_workers = num_workers
+        self.num_producers = num_producers
+        self.metrics = WorkMetrics("events")
+        self.event_counters = {event_type: 0 for event_type in PRIORITIES}
+
+    def run(self, duration: int = 5):
+        """Run the event-driven polling example with process consumers."""
+        print("\n=== THREADPOOL: Event-Driven Polling (process backend) ===")
+        print(f"Running for {duration} seconds...")
+        print(f"Using {self.num_workers} consumer processes and {self.num_producers} producer processes\n")
+
+        context = multiprocessing.get_context()
+        with context.Manager() as manager:
+            # Pool tasks can only receive picklable proxies, not raw multiprocessing primitives
+            queues = {event_type: manager.Queue() for event_type in PRIORITIES}
+            counters = manager.dict(self.event_counters)
+            counter_lock = manager.Lock()
+            stop = manager.Event()
+
+            producers = []
+            for i in range(self.num_producers):
+                process = context.Process(
+                    target=_event_producer_process,
+                    args=(i, queues, counters, counter_lock, stop, log.level, random.getrandbits(32)),
+                    daemon=True,
+                )
+                process.start()
+                producers.append(process)
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self.num_workers, mp_context=context) as executor:
+                tasks = [executor.submit(_event_consumer_process, i, queues, stop, log.level) for i in range(self.num_workers)]
+                time.sleep(duration)
+                stop.set()
+
+                log.flush()
+                print("\nStopping event-driven polling...")
+                for future in concurrent.futures.as_completed(tasks, timeout=5.0):
+                    try:
+                        worker_id, latencies = future.result()
+                    except Exception as e:
+                        print(f"Task completed with exception: {e}")
+                        continue
+                    for latency in latencies:
+                        self.metrics.record(latency, worker_id)
+
+            for process in producers:
+                process.join(timeout=1.0)
+            self.event_counters = dict(counters)
+
+        print(f"\nTotal events: {sum(self.event_counters.values())} {self.event_counters}")
+        print("Event-driven polling example completed.\n")
+
+
+class ThreadPoolPollingEventDrivenAsyncio:
+    """Event-driven polling with producers and consumers as asyncio tasks."""
+
+    def __init__(self, num_workers: int = 3, num_producers: int = 1, clock=None):
+        self.clock = require_real_clock(clock, "asyncio")
+        self.num_workers = num_workers
+        self.num_producers = num_producers
+        self.metrics = WorkMetrics("events")
+        self.event_counters = {event_type: 0 for event_type in PRIORITIES}
+
+    async def event_producer(self, producer_id: int, queues: dict, stop: asyncio.Event):
+        """Produces events at different priorities."""
+        while not stop.is_set():
+            event_type = random.choices(PRIORITIES, weights=WEIGHTS)[0]
+            event_id = self.event_counters[event_type]
+            self.event_counters[event_type] += 1  # no lock needed between awaits
+
+            queues[event_type].put_nowait({"id": event_id, "type": event_type, "created": time.perf_counter()})
+            log.info("Event Producer %s: Created %s priority event %s", producer_id, event_type, event_id)
+            await asyncio.sleep(random.uniform(0.1, 0.5))
+
+    async def event_consumer(self, worker_id: int, queues: dict, stop: asyncio.Event):
+        """Consumes events from the priority queues, polling high -> normal -> low."""
+        while not stop.is_set():
+            for event_type in PRIORITIES:
+                try:
+                    event = queues[event_type].get_nowait()
+                    break
+                except asyncio.QueueEmpty:
+                    continue
+            else:
+                await asyncio.sleep(0.1)
+                continue
+
+            await asyncio.sleep(PROCESS_TIMES[event["type"]])
+            self.metrics.record(time.perf_counter() - event["created"], worker_id)
+            log.info("Event Consumer %s: Completed %s priority event %s", worker_id, event["type"], event["id"])
+
+    async def main(self, duration: float):
+        queues = {event_type: asyncio.Queue() for event_type in PRIORITIES}
+        stop = asyncio.Event()
+        workers = [self.event_producer(i, queues, stop) for i in range(self.num_producers)]
+        workers += [self.event_consumer(i, queues, stop) for i in range(self.num_workers)]
+        await run_tasks(workers, duration, stop)
+
+    def run(self, duration: int = 5):
+        """Run the event-driven polling example on an event loop."""
+        print("\n=== THREADPOOL: Event-Driven Polling (asyncio backend) ===")
+        print(f"Running for {duration} seconds...")
+        print(f"Using {self.num_workers} consumer tasks and {self.num_producers} producer tasks\n")
+
+        asyncio.run(self.main(duration))
+
+        log.flush()
+        print(f"\nTotal events: {sum(self.event_counters.values())} {self.event_counters}")
+        print("Event-driven polling example completed.\n")
+
+
+if __name__ == "__main__":
+    # Allow running this file directly for testing
+    ThreadPoolPollingEventDrivenProcess().run(5)
+    ThreadPoolPollingEventDrivenAsyncio().run(5)
@@ -4,21 +4,24 @@ ThreadPool Example - Adaptive Polling
 Demonstrates using ThreadPoolExecutor for adaptive polling based on system conditions.
 """
 
-import threading
-import time
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
 
 class ThreadPoolPollingAdaptive:
     """Demonstrates adaptive polling using ThreadPoolExecutor."""
 
-    def __init__(self, num_workers: int = 3):
+    def __init__(self, num_workers: int = 3, clock=None):
+        self.clock = clock if clock is not None else get_clock()
         self.num_workers = num_workers
-        self.executor = ThreadPoolExecutor(max_workers=num_workers)
+        self.executor = self.clock.Executor(max_workers=num_workers)
         self.running = True
         self.tasks = []
+        self.metrics = WorkMetrics("executions")
 
         # Adaptive polling parameters
         self.base_interval = 1.0
@@ -29,7 +32,7 @@ class ThreadPoolPollingAdaptive:
         # Shared state for adaptation
         self.response_times = {}
         self.system_load = 0.0
-        self.load_lock = threading.Lock()
+        self.load_lock = self.clock.Lock("load_lock")
 
     def update_system_load(self):
         """Simulate system load changes."""
@@ -37,17 +40,17 @@ class ThreadPoolPollingAdaptive:
             with self.load_lock:
                 # Simulate varying system load (0.0 = idle, 1.0 = overloaded)
                 self.system_load = 0.5 + 0.5 * random.random()
-                print(f"System Load: {self.system_load:.2f}")
-            time.sleep(2.0)
+                log.debug("System Load: %.2f", self.system_load)
+            self.clock.sleep(2.0)
 
     def adaptive_task(self, task_id: int):
         """Task that adapts its polling interval based on system conditions."""
-        print(f"Adaptive Task {task_id}: Starting")
+        log.info("Adaptive Task %s: Starting", task_id)
 
         current_interval = self.base_interval
 
         while self.running:
-            start_time = time.time()
+            start_time = self.clock.time()
 
             # Simulate work that varies with system load
             with self.load_lock:
@@ -55,36 +58,41 @@ class ThreadPoolPollingAdaptive:
 
             # Work time increases with system load
             work_time = 0.1 + (load * 0.3)
-            time.sleep(work_time)
+            self.clock.sleep(work_time)
 
             # Calculate response time
-            response_time = time.time() - start_time
+            response_time = self.clock.time() - start_time
 
             # Store response time for this task
             self.response_times[task_id] = response_time
+            self.metrics.record(response_time, task_id)
 
             current_time = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            print(
-                f"Adaptive Task {task_id}: Executed at {current_time} "
-                f"(load: {load:.2f}, work: {work_time:.3f}s, interval: {current_interval:.2f}s)"
+            log.info(
+                "Adaptive Task %s: Executed at %s (load: %.2f, work: %.3fs, interval: %.2fs)",
+                task_id,
+                current_time,
+                load,
+                work_time,
+                current_interval,
             )
 
             # Adapt interval based on system load and response time
             if load > 0.7:  # High load - poll less frequently
                 current_interval = min(current_interval * (1 + self.adaptation_factor), self.max_interval)
-                print(f"Adaptive Task {task_id}: High load detected, increasing interval to {current_interval:.2f}s")
+                log.debug("Adaptive Task %s: High load detected, increasing interval to %.2fs", task_id, current_interval)
             elif load < 0.3:  # Low load - poll more frequently
                 current_interval = max(current_interval * (1 - self.adaptation_factor), self.min_interval)
-                print(f"Adaptive Task {task_id}: Low load detected, decreasing interval to {current_interval:.2f}s")
+                log.debug("Adaptive Task %s: Low load detected, decreasing interval to %.2fs", task_id, current_interval)
 
             # Also adapt based on response time
             if response_time > current_interval * 0.8:  # Work taking too long
                 current_interval = min(current_interval * 1.2, self.max_interval)
-                print(f"Adaptive Task {task_id}: Slow response, increasing interval to {current_interval:.2f}s")
+                log.debug("Adaptive Task %s: Slow response, increasing interval to %.2fs", task_id, current_interval)
 
-            time.sleep(current_interval)
+            self.clock.sleep(current_interval)
 
-        print(f"Adaptive Task {task_id}: Stopping")
+        log.info("Adaptive Task %s: Stopping", task_id)
 
     def run(self, duration: int = 5):
         """Run the adaptive polling example."""
@@ -94,7 +102,7 @@ class ThreadPoolPollingAdaptive:
         print("Polling intervals will adapt based on system load and response times.\n")
 
         # Start system load monitor
-        load_monitor = threading.Thread(target=self.update_system_load)
+        load_monitor = self.clock.Thread(target=self.update_system_load, name="load-monitor")
         load_monitor.daemon = True
         load_monitor.start()
 
@@ -104,19 +112,21 @@ class ThreadPoolPollingAdaptive:
             self.tasks.append(future)
 
         # Let it run for the specified duration
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping adaptive tasks...")
 
-        # Wait for all tasks to complete
-        for future in as_completed(self.tasks, timeout=2.0):
+        # Wait for all tasks to complete (a task may be sleeping through a full max_interval)
+        for future in self.clock.as_completed(self.tasks, timeout=self.max_interval + 1.0):
             try:
                 future.result()
             except Exception as e:
                 print(f"Task completed with exception: {e}")
 
         self.executor.shutdown(wait=True)
+        log.flush()
         print("Adaptive polling example completed.\n")
 
 
@@ -4,29 +4,34 @@ ThreadPool Example - Batch Polling
 Demonstrates using ThreadPoolExecutor for batch processing of collected items.
 """
 
-import threading
-import time
+import itertools
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import queue
 
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
 
 class ThreadPoolPollingBatch:
     """Demonstrates batch polling using ThreadPoolExecutor."""
 
-    def __init__(self, num_workers: int = 3):
+    def __init__(self, num_workers: int = 3, num_producers: int = 1, batch_size: int = 5, max_wait_time: float = 2.0, clock=None):
+        self.clock = clock if clock is not None else get_clock()
         self.num_workers = num_workers
-        self.executor = ThreadPoolExecutor(max_workers=num_workers)
+        self.num_producers = num_producers
+        self.executor = self.clock.Executor(max_workers=num_workers)
         self.running = True
         self.tasks = []
 
         # Batch processing parameters
-        self.batch_size = 5
-        self.max_wait_time = 2.0  # Maximum time to wait for batch to fill
+        self.batch_size = batch_size
+        self.max_wait_time = max_wait_time  # Maximum time to wait for batch to fill
 
-        # Data collection queue
-        self.data_queue = queue.Queue()
+        # Data collection queue, fed by num_producers collectors sharing one id sequence
+        self.data_queue = self.clock.Queue()
+        self.item_ids = itertools.count()
 
         # Batch processor thread
         self.batch_processor = None
@@ -34,44 +39,44 @@ class ThreadPoolPollingBatch:
         # Statistics
         self.batches_processed = 0
         self.total_items_processed = 0
+        self.metrics = WorkMetrics("items")
 
-    def data_collector(self):
+    def data_collector(self, collector_id: int = 0):
         """Collects data items for batch processing."""
-        print("Data Collector: Starting...")
+        log.info("Data Collector %s: Starting...", collector_id)
 
-        item_id = 0
         while self.running:
+            item_id = next(self.item_ids)
             # Simulate data collection
             data_item = {
                 "id": item_id,
                 "timestamp": datetime.now().strftime("%H:%M:%S.%f")[:-3],
                 "value": random.randint(1, 100),
                 "source": f"Source_{random.randint(1, 3)}",
+                "created": self.clock.time(),
             }
 
             self.data_queue.put(data_item)
-            print(f"Data Collector: Collected item {item_id} (value: {data_item['value']})")
-
-            item_id += 1
+            log.info("Data Collector %s: Collected item %s (value: %s)", collector_id, item_id, data_item["value"])
 
             # Random delay between collections
-            time.sleep(random.uniform(0.1, 0.8))
+            self.clock.sleep(random.uniform(0.1, 0.8))
 
-        print("Data Collector: Stopping...")
+        log.info("Data Collector %s: Stopping...", collector_id)
 
     def batch_processor_worker(self):
         """Processes batches of collected data."""
-        print("Batch Processor: Starting...")
+        log.info("Batch Processor: Starting...")
 
         while self.running:
             batch = []
-            batch_start_time = time.time()
+            batch_start_time = self.clock.time()
 
             # Collect items for batch
             while len(batch) < self.batch_size:
                 try:
                     # Wait for items with timeout
-                    remaining_time = self.max_wait_time - (time.time() - batch_start_time)
+                    remaining_time = self.max_wait_time - (self.clock.time() - batch_start_time)
                     if remaining_time <= 0:
                         break
 
@@ -93,13 +98,13 @@ class ThreadPoolPollingBatch:
                     self.data_queue.task_done()
             else:
                 # No items to process, wait a bit
-                time.sleep(0.1)
+                self.clock.sleep(0.1)
 
-        print("Batch Processor: Stopping...")
+        log.info("Batch Processor: Stopping...")
 
     def process_batch(self, batch: list):
         """Process a batch of data items."""
-        print(f"\nBatch Processor: Processing batch of {len(batch)} items:")
+        log.info("\nBatch Processor: Processing batch of %s items:", len(batch))
 
         # Calculate batch statistics
         values = [item["value"] for item in batch]
@@ -108,58 +113,66 @@ class ThreadPoolPollingBatch:
         min_value = min(values)
         max_value = max(values)
 
-        print(f"  Items: {[item['id'] for item in batch]}")
-        print(f"  Values: {values}")
-        print(f"  Total: {total_value}, Average: {avg_value:.1f}")
-        print(f"  Range: {min_value} - {max_value}")
+        log.debug("  Items: %s", [item["id"] for item in batch])
+        log.debug("  Values: %s", values)
+        log.debug("  Total: %s, Average: %.1f", total_value, avg_value)
+        log.debug("  Range: %s - %s", min_value, max_value)
 
         # Simulate batch processing work
         work_time = 0.1 + (len(batch) * 0.05)
-        time.sleep(work_time)
+        self.clock.sleep(work_time)
+
+        finished_at = self.clock.time()
+        for item in batch:
+            self.metrics.record(finished_at - item["created"], "batch")
 
-        print(f"  Batch processed in {work_time:.3f}s")
+        log.info("  Batch processed in %.3fs", work_time)
 
     def individual_processor(self, worker_id: int):
         """Individual worker that processes single items when needed."""
-        print(f"Individual Processor {worker_id}: Starting...")
+        log.info("Individual Processor %s: Starting...", worker_id)
 
         while self.running:
             try:
                 # Try to get an item for individual processing
                 item = self.data_queue.get(timeout=0.2)
 
-                print(f"Individual Processor {worker_id}: Processing item {item['id']} " f"(value: {item['value']})")
+                log.info("Individual Processor %s: Processing item %s (value: %s)", worker_id, item["id"], item["value"])
 
                 # Simulate individual processing
                 process_time = 0.05 + (item["value"] * 0.001)
-                time.sleep(process_time)
+                self.clock.sleep(process_time)
+                self.metrics.record(self.clock.time() - item["created"], worker_id)
 
-                print(f"Individual Processor {worker_id}: Completed item {item['id']} " f"in {process_time:.3f}s")
+                log.info("Individual Processor %s: Completed item %s in %.3fs", worker_id, item["id"], process_time)
 
                 # Mark as done
                 self.data_queue.task_done()
 
             except queue.Empty:
                 # No items available, wait a bit
-                time.sleep(0.1)
+                self.clock.sleep(0.1)
 
-        print(f"Individual Processor {worker_id}: Stopping...")
+        log.info("Individual Processor %s: Stopping...", worker_id)
 
     def run(self, duration: int = 5):
         """Run the batch polling example."""
         print("\n=== THREADPOOL: Batch Polling ===")
         print(f"Running for {duration} seconds...")
-        print(f"Using {self.num_workers} workers for batch processing\n")
+        print(f"Using {self.num_workers} workers and {self.num_producers} collectors for batch processing\n")
         print(f"Batch size: {self.batch_size}, Max wait time: {self.max_wait_time}s")
         print("Data is collected and processed in batches for efficiency.\n")
 
-        # Start data collector
-        collector_thread = threading.Thread(target=self.data_collector)
-        collector_thread.daemon = True
-        collector_thread.start()
+        # Start data collectors
+        collector_threads = []
+        for i in range(self.num_producers):
+            thread = self.clock.Thread(target=self.data_collector, args=(i,), name=f"collector-{i}")
+            thread.daemon = True
+            thread.start()
+            collector_threads.append(thread)
 
         # Start batch processor
-        self.batch_processor = threading.Thread(target=self.batch_processor_worker)
+        self.batch_processor = self.clock.Thread(target=self.batch_processor_worker, name="batch-processor")
         self.batch_processor.daemon = True
         self.batch_processor.start()
 
@@ -169,18 +182,20 @@ class ThreadPoolPollingBatch:
             self.tasks.append(future)
 
         # Let it run for the specified duration
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping batch polling...")
 
         # Wait for threads to finish
-        collector_thread.join(timeout=1.0)
+        for thread in collector_threads:
+            thread.join(timeout=1.0)
         if self.batch_processor:
             self.batch_processor.join(timeout=1.0)
 
         # Wait for all worker tasks to complete
-        for future in as_completed(self.tasks, timeout=2.0):
+        for future in self.clock.as_completed(self.tasks, timeout=2.0):
             try:
                 future.result()
             except Exception as e:
@@ -189,11 +204,13 @@ class ThreadPoolPollingBatch:
         self.executor.shutdown(wait=True)
 
         # Print final statistics
+        log.flush()
         print("\nFinal Statistics:")
         print(f"  Batches Processed: {self.batches_processed}")
         print(f"  Total Items Processed: {self.total_items_processed}")
         print(f"  Average Batch Size: {self.total_items_processed / max(1, self.batches_processed):.1f}")
 
+        log.flush()
         print("Batch polling example completed.\n")
 
 
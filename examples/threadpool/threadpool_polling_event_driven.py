@@ -4,37 +4,42 @@ ThreadPool Example - Event-Driven Polling
 Demonstrates using ThreadPoolExecutor for event-driven polling with producer-consumer pattern.
 """
 
-import threading
-import time
 import random
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 import queue
 
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
 
 class ThreadPoolPollingEventDriven:
     """Demonstrates event-driven polling using ThreadPoolExecutor."""
 
-    def __init__(self, num_workers: int = 3):
+    def __init__(self, num_workers: int = 3, num_producers: int = 1, clock=None):
+        self.clock = clock if clock is not None else get_clock()
         self.num_workers = num_workers
-        self.executor = ThreadPoolExecutor(max_workers=num_workers)
+        self.num_producers = num_producers
+        self.executor = self.clock.Executor(max_workers=num_workers)
         self.running = True
         self.tasks = []
+        self.metrics = WorkMetrics("events")
 
         # Event queues for different types of events
-        self.high_priority_queue = queue.Queue()
-        self.normal_priority_queue = queue.Queue()
-        self.low_priority_queue = queue.Queue()
+        self.high_priority_queue = self.clock.Queue()
+        self.normal_priority_queue = self.clock.Queue()
+        self.low_priority_queue = self.clock.Queue()
 
-        # Event counters
+        # Event counters, shared by all producers
         self.event_counters = {"high": 0, "normal": 0, "low": 0}
+        self.counter_lock = self.clock.Lock("counter_lock")
 
-        # Producer thread
-        self.producer_thread = None
+        # Producer threads
+        self.producer_threads = []
 
-    def event_producer(self):
+    def event_producer(self, producer_id: int = 0):
         """Produces events at different priorities."""
-        print("Event Producer: Starting...")
+        log.info("Event Producer %s: Starting...", producer_id)
 
         while self.running:
             # Generate random events
@@ -43,11 +48,16 @@ class ThreadPoolPollingEventDriven:
                 weights=[0.2, 0.5, 0.3],  # Normal events are most common
             )[0]
 
+            with self.counter_lock:
+                event_id = self.event_counters[event_type]
+                self.event_counters[event_type] += 1
+
             event_data = {
-                "id": self.event_counters[event_type],
+                "id": event_id,
                 "type": event_type,
                 "timestamp": datetime.now().strftime("%H:%M:%S.%f")[:-3],
-                "data": f"Event data {self.event_counters[event_type]}",
+                "data": f"Event data {event_id}",
+                "created": self.clock.time(),
             }
 
             # Add to appropriate queue
@@ -58,18 +68,16 @@ class ThreadPoolPollingEventDriven:
             else:
                 self.low_priority_queue.put(event_data)
 
-            self.event_counters[event_type] += 1
-
-            print(f"Event Producer: Created {event_type} priority event {event_data['id']}")
+            log.info("Event Producer %s: Created %s priority event %s", producer_id, event_type, event_id)
 
             # Random delay between events
-            time.sleep(random.uniform(0.1, 0.5))
+            self.clock.sleep(random.uniform(0.1, 0.5))
 
-        print("Event Producer: Stopping...")
+        log.info("Event Producer %s: Stopping...", producer_id)
 
     def event_consumer(self, worker_id: int):
         """Consumes events from priority queues."""
-        print(f"Event Consumer {worker_id}: Starting...")
+        log.info("Event Consumer %s: Starting...", worker_id)
 
         while self.running:
             event = None
@@ -78,20 +86,20 @@ class ThreadPoolPollingEventDriven:
             try:
                 # Try high priority first (non-blocking)
                 event = self.high_priority_queue.get_nowait()
-                print(f"Event Consumer {worker_id}: Processing HIGH priority event {event['id']}")
+                log.info("Event Consumer %s: Processing HIGH priority event %s", worker_id, event["id"])
             except queue.Empty:
                 try:
                     # Try normal priority (non-blocking)
                     event = self.normal_priority_queue.get_nowait()
-                    print(f"Event Consumer {worker_id}: Processing NORMAL priority event {event['id']}")
+                    log.info("Event Consumer %s: Processing NORMAL priority event %s", worker_id, event["id"])
                 except queue.Empty:
                     try:
                         # Try low priority (non-blocking)
                         event = self.low_priority_queue.get_nowait()
-                        print(f"Event Consumer {worker_id}: Processing LOW priority event {event['id']}")
+                        log.info("Event Consumer %s: Processing LOW priority event %s", worker_id, event["id"])
                     except queue.Empty:
                         # No events available, wait a bit
-                        time.sleep(0.1)
+                        self.clock.sleep(0.1)
                         continue
 
             if event:
@@ -106,11 +114,11 @@ class ThreadPoolPollingEventDriven:
                 else:
                     self.low_priority_queue.task_done()
 
-        print(f"Event Consumer {worker_id}: Stopping...")
+        log.info("Event Consumer %s: Stopping...", worker_id)
 
     def process_event(self, worker_id: int, event: dict):
         """Process an individual event."""
-        start_time = time.time()
+        start_time = self.clock.time()
 
         # Simulate processing time based on priority
         if event["type"] == "high":
@@ -120,22 +128,25 @@ class ThreadPoolPollingEventDriven:
         else:
             process_time = 0.2  # Low priority = slower processing
 
-        time.sleep(process_time)
+        self.clock.sleep(process_time)
 
-        actual_time = time.time() - start_time
-        print(f"Event Consumer {worker_id}: Completed {event['type']} priority event {event['id']} " f"in {actual_time:.3f}s")
+        actual_time = self.clock.time() - start_time
+        self.metrics.record(self.clock.time() - event["created"], worker_id)
+        log.info("Event Consumer %s: Completed %s priority event %s in %.3fs", worker_id, event["type"], event["id"], actual_time)
 
     def run(self, duration: int = 5):
         """Run the event-driven polling example."""
         print("\n=== THREADPOOL: Event-Driven Polling ===")
         print(f"Running for {duration} seconds...")
-        print(f"Using {self.num_workers} workers for event processing\n")
+        print(f"Using {self.num_workers} workers and {self.num_producers} producers for event processing\n")
         print("Events are generated with different priorities and processed accordingly.\n")
 
-        # Start event producer
-        self.producer_thread = threading.Thread(target=self.event_producer)
-        self.producer_thread.daemon = True
-        self.producer_thread.start()
+        # Start event producers
+        for i in range(self.num_producers):
+            thread = self.clock.Thread(target=self.event_producer, args=(i,), name=f"producer-{i}")
+            thread.daemon = True
+            thread.start()
+            self.producer_threads.append(thread)
 
         # Submit event consumer tasks
         for i in range(self.num_workers):
@@ -143,17 +154,18 @@ class ThreadPoolPollingEventDriven:
             self.tasks.append(future)
 
         # Let it run for the specified duration
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping event-driven polling...")
 
-        # Wait for producer to finish
-        if self.producer_thread:
-            self.producer_thread.join(timeout=1.0)
+        # Wait for producers to finish
+        for thread in self.producer_threads:
+            thread.join(timeout=1.0)
 
         # Wait for all consumer tasks to complete
-        for future in as_completed(self.tasks, timeout=2.0):
+        for future in self.clock.as_completed(self.tasks, timeout=2.0):
             try:
                 future.result()
             except Exception as e:
@@ -162,12 +174,14 @@ class ThreadPoolPollingEventDriven:
         self.executor.shutdown(wait=True)
 
         # Print final statistics
+        log.flush()
         print("\nFinal Event Counts:")
         print(f"  High Priority: {self.event_counters['high']}")
         print(f"  Normal Priority: {self.event_counters['normal']}")
         print(f"  Low Priority: {self.event_counters['low']}")
         print(f"  Total: {sum(self.event_counters.values())}")
 
+        log.flush()
         print("Event-driven polling example completed.\n")
 
 
@@ -4,42 +4,47 @@ ThreadPool Example - Periodic Polling
 Demonstrates using ThreadPoolExecutor for periodic task execution.
 """
 
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
+
 
 class ThreadPoolPollingPeriodic:
     """Demonstrates periodic polling using ThreadPoolExecutor."""
 
-    def __init__(self, num_workers: int = 3):
+    def __init__(self, num_workers: int = 3, clock=None):
+        self.clock = clock if clock is not None else get_clock()
         self.num_workers = num_workers
-        self.executor = ThreadPoolExecutor(max_workers=num_workers)
+        self.executor = self.clock.Executor(max_workers=num_workers)
         self.running = True
         self.tasks = []
+        self.metrics = WorkMetrics("executions")
 
     def periodic_task(self, task_id: int, interval: float):
         """Task that runs periodically at specified intervals."""
-        print(f"Periodic Task {task_id}: Starting with {interval}s interval")
+        log.info("Periodic Task %s: Starting with %ss interval", task_id, interval)
 
         while self.running:
-            start_time = time.time()
+            start_time = self.clock.time()
 
             # Simulate some work
             work_time = 0.1 + (task_id * 0.05)
-            time.sleep(work_time)
+            self.clock.sleep(work_time)
+            self.metrics.record(self.clock.time() - start_time, task_id)
 
             current_time = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-            print(f"Periodic Task {task_id}: Executed at {current_time} (took {work_time:.3f}s)")
+            log.info("Periodic Task %s: Executed at %s (took %.3fs)", task_id, current_time, work_time)
 
             # Calculate sleep time to maintain interval
-            elapsed = time.time() - start_time
+            elapsed = self.clock.time() - start_time
             sleep_time = max(0, interval - elapsed)
 
             if sleep_time > 0:
-                time.sleep(sleep_time)
+                self.clock.sleep(sleep_time)
 
-        print(f"Periodic Task {task_id}: Stopping")
+        log.info("Periodic Task %s: Stopping", task_id)
 
     def run(self, duration: int = 5):
         """Run the periodic polling example."""
@@ -55,19 +60,21 @@ class ThreadPoolPollingPeriodic:
             self.tasks.append(future)
 
         # Let it run for the specified duration
-        time.sleep(duration)
+        self.clock.sleep(duration)
         self.running = False
 
+        log.flush()
         print("\nStopping periodic tasks...")
 
         # Wait for all tasks to complete
-        for future in as_completed(self.tasks, timeout=2.0):
+        for future in self.clock.as_completed(self.tasks, timeout=2.0):
             try:
                 future.result()
             except Exception as e:
                 print(f"Task completed with exception: {e}")
 
         self.executor.shutdown(wait=True)
+        log.flush()
         print("Periodic polling example completed.\n")
 
 
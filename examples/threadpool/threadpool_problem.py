@@ -4,28 +4,31 @@ ThreadPool Example - ThreadPoolExecutor Usage
 Demonstrates various ThreadPoolExecutor operations and patterns.
 """
 
-import threading
-import time
-import concurrent.futures
+from ..common.clock import get_clock
+from ..common.log import log
+from ..common.metrics import WorkMetrics
 
 
 class ThreadPoolExample:
     """Demonstrates ThreadPoolExecutor usage."""
 
-    def __init__(self, num_workers: int = 3):
+    def __init__(self, num_workers: int = 3, clock=None):
+        self.clock = clock if clock is not None else get_clock()
         self.num_workers = num_workers
         self.results = []
-        self.lock = threading.Lock()
+        self.lock = self.clock.Lock("results_lock")
+        self.metrics = WorkMetrics("tasks")
 
     def worker_function(self, task_id: int, duration: float) -> str:
         """Worker function that simulates work."""
-        print(f"Task {task_id}: Starting work for {duration:.1f}s...")
-        time.sleep(duration)
+        log.info("Task %s: Starting work for %.1fs...", task_id, duration)
+        self.clock.sleep(duration)
         result = f"Task {task_id} completed in {duration:.1f}s"
-        print(f"Task {task_id}: Finished!")
+        log.info("Task %s: Finished!", task_id)
 
         with self.lock:
             self.results.append(result)
+        self.metrics.record(duration, task_id)
 
         return result
 
@@ -36,7 +39,7 @@ class ThreadPoolExample:
         print("Demonstrating various threadpool operations!\n")
 
         # Create a thread pool
-        with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        with self.clock.Executor(max_workers=4) as executor:
             print("Created ThreadPoolExecutor with 4 workers")
 
             # Submit individual tasks
@@ -46,6 +49,7 @@ class ThreadPoolExample:
             future3 = executor.submit(self.worker_function, 3, 0.3)
 
             # Wait for specific futures
+            log.flush()
             print(f"Future 1 result: {future1.result()}")
             print(f"Future 2 result: {future2.result()}")
             print(f"Future 3 result: {future3.result()}")
@@ -56,6 +60,7 @@ class ThreadPoolExample:
             durations = [0.2, 0.4, 0.6, 0.8, 1.0]
 
             results = list(executor.map(self.worker_function, task_ids, durations))
+            log.flush()
             print(f"Map results: {results}")
 
             # Submit tasks with as_completed
@@ -65,13 +70,14 @@ class ThreadPoolExample:
                 future = executor.submit(self.worker_function, i, 0.1 + (i % 3) * 0.2)
                 futures.append(future)
 
-            for future in concurrent.futures.as_completed(futures):
+            for future in self.clock.as_completed(futures):
                 try:
                     result = future.result()
                     print(f"As completed: {result}")
                 except Exception as e:
                     print(f"Task failed: {e}")
 
+        log.flush()
         print(f"\nAll tasks completed. Total results: {len(self.results)}")
         print("ThreadPool example completed.\n")
 
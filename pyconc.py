@@ -10,87 +10,81 @@ A command-line tool to demonstrate various concurrency concepts:
 - starvation-fix-*: Various solutions to the starvation problem
 - threadpool: ThreadPoolExecutor examples
 - threadpool-polling-*: Various polling strategies using thread pools
+
+Example classes are looked up in examples.registry and only the selected
+example module is imported.
+
+Use "pyconc.py bench" to measure the throughput of the examples.
 """
 
 import argparse
-from typing import Any
-
-# Import example classes from their respective files in the examples folder
-from examples.deadlock import (
-    DeadlockExample,
-    DeadlockFixResourceOrdering,
-    DeadlockFixTimeout,
-    DeadlockFixAsymmetricBehavior,
-    DeadlockFixWaiter,
-)
-from examples.livelock import (
-    LivelockExample,
-    LivelockFixRandomBackoff,
-    LivelockFixPriority,
-)
-from examples.starvation import (
-    StarvationExample,
-    StarvationFixFairScheduling,
-    StarvationFixAging,
-)
-from examples.threadpool import (
-    ThreadPoolExample,
-    ThreadPoolPollingPeriodic,
-    ThreadPoolPollingAdaptive,
-    ThreadPoolPollingEventDriven,
-    ThreadPoolPollingBatch,
-)
-
-
-def main() -> int:
-    """Main function to handle command line arguments and run examples."""
+import fnmatch
+import functools
+import json
+import os
+import random
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from examples.registry import BACKEND_EXAMPLES, BACKENDS, EXAMPLES, accepts_option, available_examples, create_example, load_example
+
+# Scale flags and the constructor keyword each one sets
+SCALE_OPTIONS = {
+    "philosophers": "num_philosophers",
+    "workers": "num_workers",
+    "low-priority": "num_low_priority",
+    "producers": "num_producers",
+    "batch-size": "batch_size",
+    "processes": "num_processes",
+    "locks": "num_locks",
+    "locks-per-worker": "locks_per_worker",
+    "readers": "num_readers",
+    "writers": "num_writers",
+}
+
+# Policy and topology flags and the constructor keyword each one sets
+POLICY_OPTIONS = {
+    "retry-policy": "retry_policy",
+    "graph": "graph",
+    "weights": "weights",
+}
+
+# Kept in step with examples.common.retry.RETRY_POLICIES, which is not imported to parse arguments
+RETRY_POLICIES = ("fixed", "exponential", "full-jitter", "decorrelated-jitter", "adaptive")
+
+# Kept in step with examples.common.topology.GENERATORS, for the same reason
+GRAPH_GENERATORS = ("ring", "grid", "random-regular", "power-law")
+
+# Kept in step with examples.starvation.starvation_fix_weighted_fair.HOLD_TIME, for the same reason
+PRIORITY_CLASSES = ("high", "low")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser (no example modules are imported)."""
+    usage_lines = "\n".join(f"  python3 pyconc.py -e {name}" for name in EXAMPLES)
     parser = argparse.ArgumentParser(
         description="Python Concurrency Examples",
         formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+        epilog=f"""
 Examples:
-  python3 pyconc.py -e deadlock
-  python3 pyconc.py -e deadlock-fix-resource-ordering
-  python3 pyconc.py -e deadlock-fix-timeout
-  python3 pyconc.py -e deadlock-fix-asymmetric-behavior
-  python3 pyconc.py -e deadlock-fix-waiter
-  python3 pyconc.py -e livelock
-  python3 pyconc.py -e livelock-fix-random-backoff
-  python3 pyconc.py -e livelock-fix-priority
-  python3 pyconc.py -e starvation
-  python3 pyconc.py -e starvation-fix-fair-scheduling
-  python3 pyconc.py -e starvation-fix-aging
-  python3 pyconc.py -e threadpool
-  python3 pyconc.py -e threadpool-polling-periodic
-  python3 pyconc.py -e threadpool-polling-adaptive
-  python3 pyconc.py -e threadpool-polling-event-driven
-  python3 pyconc.py -e threadpool-polling-batch
+{usage_lines}
+
+Use --list to also show examples installed by other packages.
+Use "python3 pyconc.py bench -h" for the benchmark mode.
         """,
     )
 
-    parser.add_argument(
+    selection = parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument(
         "-e",
         "--example",
-        required=True,
-        choices=[
-            "deadlock",
-            "deadlock-fix-resource-ordering",
-            "deadlock-fix-timeout",
-            "deadlock-fix-asymmetric-behavior",
-            "deadlock-fix-waiter",
-            "livelock",
-            "livelock-fix-random-backoff",
-            "livelock-fix-priority",
-            "starvation",
-            "starvation-fix-fair-scheduling",
-            "starvation-fix-aging",
-            "threadpool",
-            "threadpool-polling-periodic",
-            "threadpool-polling-adaptive",
-            "threadpool-polling-event-driven",
-            "threadpool-polling-batch",
-        ],
-        help="Type of concurrency example to run",
+        metavar="NAME",
+        help="Type of concurrency example to run (see --list)",
+    )
+    selection.add_argument(
+        "--list",
+        action="store_true",
+        help="List available examples and exit",
     )
 
     parser.add_argument(
@@ -100,68 +94,448 @@ Examples:
         default=5,
         help="Duration to run the example in seconds (default: 5)",
     )
+    parser.add_argument(
+        "-q",
+        "--quiet",
+        action="store_true",
+        help="Suppress per-thread narration and only print the summary",
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["debug", "info", "warning", "error"],
+        default="debug",
+        help="Lowest level of worker narration to print (default: debug)",
+    )
+    parser.add_argument(
+        "--sweep",
+        metavar="KNOB=V1,V2,...",
+        type=parse_sweep,
+        help="Run the example quietly once per value of a scale knob and print a throughput-vs-concurrency table, e.g. --sweep workers=1,2,4,8",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="thread",
+        help="Run the example's workers as threads, processes or asyncio tasks (default: thread); "
+        f"process and asyncio are available for {', '.join(BACKEND_EXAMPLES['process'])}",
+    )
+    add_scale_arguments(parser)
+    add_clock_arguments(parser)
+    diagnostics = add_diagnostic_arguments(parser)
+    diagnostics.add_argument(
+        "--detect-deadlocks",
+        type=positive_float,
+        nargs="?",
+        const=1.0,
+        metavar="SECONDS",
+        help="Track lock owners and waiters; a thread blocked for longer than SECONDS (default: 1.0) "
+        "searches the wait-for graph and reports any cycle with the stacks of the threads in it",
+    )
+    diagnostics.add_argument(
+        "--detect-livelock",
+        type=positive_float,
+        nargs="?",
+        const=2.0,
+        metavar="SECONDS",
+        help="Count lock attempts and completed work per thread; report threads that keep taking locks "
+        "while no thread completes any work for SECONDS (default: 2.0)",
+    )
+    diagnostics.add_argument(
+        "--lockdep",
+        action="store_true",
+        help="Learn the order in which locks are nested and report the first acquisition that inverts it, before the inversion can deadlock",
+    )
+    diagnostics.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record every lock acquire and release, sleep and executor task, and write a "
+        "Chrome Trace Event JSON timeline to FILE (open it in https://ui.perfetto.dev)",
+    )
+
+    return parser
+
+
+def add_scale_arguments(parser: argparse.ArgumentParser):
+    """Add the scale knobs; each is passed to examples whose constructor accepts it."""
+    group = parser.add_argument_group("scale", "Sizes passed to every example that supports them (default: the example's own)")
+    group.add_argument("--philosophers", type=positive_int, metavar="N", help="Number of dining philosophers")
+    group.add_argument("--workers", type=positive_int, metavar="N", help="Number of worker threads or pool workers")
+    group.add_argument("--low-priority", type=non_negative_int, metavar="N", help="How many of the starvation workers are low priority")
+    group.add_argument("--producers", type=positive_int, metavar="N", help="Number of producer/collector threads")
+    group.add_argument("--batch-size", type=positive_int, metavar="N", help="Items per batch in batch polling")
+    group.add_argument("--processes", type=positive_int, metavar="N", help="Processes to shard workers over on the process backend")
+    group.add_argument("--locks", type=positive_int, metavar="N", help="Number of locks the livelock workers share")
+    group.add_argument("--locks-per-worker", type=positive_int, metavar="N", help="How many of the shared locks each livelock worker needs")
+    group.add_argument("--readers", type=positive_int, metavar="N", help="Number of reader threads sharing the reader-writer lock")
+    group.add_argument("--writers", type=positive_int, metavar="N", help="Number of writer threads sharing the reader-writer lock")
+    group = parser.add_argument_group("policies", "Strategies and topologies passed to every example that supports them")
+    group.add_argument(
+        "--retry-policy",
+        choices=RETRY_POLICIES,
+        help="Acquire timeout and backoff after a failed retry (default: fixed 0.1 s timeout, 0.05 s delay)",
+    )
+    group.add_argument(
+        "--graph",
+        type=graph_spec,
+        metavar="SPEC",
+        help=(
+            f"Conflict graph the philosophers sit on: {', '.join(GRAPH_GENERATORS)}, optionally with a parameter "
+            "(grid:COLUMNS, random-regular:DEGREE, power-law:EDGES), or a file of 'tail head' lines (default: ring)"
+        ),
+    )
+    group.add_argument(
+        "--weights",
+        type=weights_spec,
+        metavar="high=W,low=W",
+        help="Share of the resource per priority class in the weighted fair starvation fix (default: high=0.7,low=0.3)",
+    )
+
+
+def scale_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Return the constructor options for the scale and policy flags that were given."""
+    options = {}
+    for flag, option in {**SCALE_OPTIONS, **POLICY_OPTIONS}.items():
+        value = getattr(args, flag.replace("-", "_"))
+        if value is not None:
+            options[option] = value
+    return options
+
+
+def graph_spec(text: str) -> str:
+    kind, _, parameter = text.partition(":")
+    if kind in GRAPH_GENERATORS:
+        if parameter and not parameter.isdigit():
+            raise argparse.ArgumentTypeError(f"parameter of {kind} must be an integer, got {parameter!r}")
+    elif not os.path.isfile(text):
+        raise argparse.ArgumentTypeError(f"not a graph generator ({', '.join(GRAPH_GENERATORS)}) or an existing file: {text!r}")
+    return text
+
+
+def weights_spec(text: str) -> Dict[str, float]:
+    weights = {}
+    for part in text.split(","):
+        name, sep, value = part.partition("=")
+        if not sep or name not in PRIORITY_CLASSES:
+            raise argparse.ArgumentTypeError(f"expected CLASS=WEIGHT with CLASS one of {', '.join(PRIORITY_CLASSES)}, got {part!r}")
+        weights[name] = positive_float(value)
+    return weights
+
+
+def positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def non_negative_int(text: str) -> int:
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0, got {value}")
+    return value
+
+
+def positive_float(text: str) -> float:
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be positive, got {value}")
+    return value
+
+
+def parse_sweep(text: str) -> Tuple[str, List[int]]:
+    """Parse KNOB=V1,V2,... into the knob name and its values."""
+    knob, sep, values = text.partition("=")
+    if not sep or knob not in SCALE_OPTIONS:
+        raise argparse.ArgumentTypeError(f"expected KNOB=V1,V2,... with KNOB one of {', '.join(SCALE_OPTIONS)}")
+    try:
+        return knob, [positive_int(v) for v in values.split(",")]
+    except (ValueError, argparse.ArgumentTypeError):
+        raise argparse.ArgumentTypeError(f"invalid sweep values {values!r}, expected positive integers") from None
+
+
+def add_clock_arguments(parser: argparse.ArgumentParser):
+    """Add the --clock and --seed options shared by the run and bench modes."""
+    parser.add_argument(
+        "--clock",
+        choices=["real", "virtual"],
+        default="real",
+        help="Time source: real wall-clock time, or a deterministic simulated clock "
+        "that runs long scenarios in a fraction of the time (default: real)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed the random module and the virtual clock for reproducible runs",
+    )
+
+
+def add_diagnostic_arguments(parser: argparse.ArgumentParser) -> argparse._ArgumentGroup:
+    """Add the options that wrap the example's locks with diagnostics, returning their group."""
+    group = parser.add_argument_group("diagnostics", "Wrap the locks an example creates (thread backend only)")
+    group.add_argument(
+        "--instrument-locks",
+        action="store_true",
+        help="Record attempts, timeouts, wait and hold times per lock and per thread, and print a contention report after the run",
+    )
+    return group
+
+
+def wrap_clock(clock: Any, args: argparse.Namespace) -> Tuple[Any, List[Callable[[], str]]]:
+    """Wrap the clock with the requested diagnostics; return it and the report functions to call after the run."""
+    reports: List[Callable[[], str]] = []
+    if args.detect_deadlocks:
+        from examples.common.deadlock_detector import DetectingClock
+
+        # Innermost, so instrumented wait times include the detector's slices
+        clock = DetectingClock(clock, args.detect_deadlocks)
+        reports.append(clock.detector.report)
+    if args.lockdep:
+        from examples.common.lockdep import LockdepClock
+
+        clock = LockdepClock(clock)
+        reports.append(clock.validator.report)
+    if args.instrument_locks:
+        from examples.common.instrument import InstrumentedClock
+
+        clock = InstrumentedClock(clock)
+        reports.append(clock.profiler.report)
+    if args.trace:
+        from examples.common.trace import TracingClock
+
+        clock = TracingClock(clock)
+        reports.append(functools.partial(clock.tracer.export, args.trace))
+    if args.detect_livelock:
+        from examples.common.livelock_watchdog import WatchdogClock
+
+        # Outermost, so every wrapper's attempt counts once
+        clock = WatchdogClock(clock, args.detect_livelock)
+        reports.append(clock.watchdog.report)
+    return clock, reports
+
+
+def list_examples() -> None:
+    """Print every registered example without importing any of them."""
+    examples = available_examples()
+    width = max(len(name) for name in examples)
+    for name, target in examples.items():
+        print(f"{name:<{width}}  {target}")
+
+
+def build_bench_parser() -> argparse.ArgumentParser:
+    """Build the parser for the benchmark subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="pyconc.py bench",
+        description="Benchmark example throughput and latency",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python3 pyconc.py bench -o baseline.json
+  python3 pyconc.py bench -e deadlock-fix-waiter -e livelock-fix-priority -r 5
+  python3 pyconc.py bench --baseline baseline.json --threshold 0.15
+  python3 pyconc.py bench -e deadlock-fix-waiter --philosophers 100
+  python3 pyconc.py bench -e starvation --backend thread --backend process --backend asyncio
+  python3 pyconc.py bench -e deadlock-fix-waiter -e deadlock-fix-waiter-polling --sweep philosophers=5,100,10000
+  python3 pyconc.py bench -e 'deadlock-fix-*' --table --clock virtual -d 60 -r 1
+        """,
+    )
+    parser.add_argument(
+        "-e",
+        "--example",
+        action="append",
+        metavar="NAME",
+        help="Example to benchmark, may be repeated or a glob such as 'deadlock-fix-*' (default: all built-in examples)",
+    )
+    parser.add_argument("-d", "--duration", type=float, default=2.0, help="Duration of each run in seconds (default: 2)")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of runs per example (default: 3)")
+    parser.add_argument("-o", "--output", metavar="FILE", help="Write the JSON report to FILE instead of stdout")
+    parser.add_argument("--baseline", metavar="FILE", help="Compare against a previously saved JSON report")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Allowed fractional throughput drop against the baseline (default: 0.10)",
+    )
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=BACKENDS,
+        dest="backends",
+        help="Backend to benchmark, may be repeated to compare backends on the same workload (default: thread)",
+    )
+    parser.add_argument(
+        "--sweep",
+        metavar="KNOB=V1,V2,...",
+        type=parse_sweep,
+        help="Benchmark every example at each value of a scale knob and print a comparison table, e.g. --sweep philosophers=5,100,10000",
+    )
+    parser.add_argument(
+        "--table",
+        action="store_true",
+        help="Also print a comparison table: throughput, fairness, work per worker and max wait of each example",
+    )
+    add_scale_arguments(parser)
+    add_clock_arguments(parser)
+    add_diagnostic_arguments(parser)
+    parser.set_defaults(seed=0)
+    return parser
+
+
+def write_report(report: dict, path: Optional[str]):
+    """Write a JSON report to path, or to stdout when no path is given."""
+    output = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+
+
+def bench_main(argv: List[str]) -> int:
+    """Run the benchmark subcommand."""
+    # Deferred import keeps the plain example runner free of the benchmark code
+    from examples.common.bench import compare, format_backends, format_results, format_sweep_comparison, run_benchmark_sweep, run_benchmarks
+
+    parser = build_bench_parser()
+    args = parser.parse_args(argv)
+
+    names: List[str] = []
+    known = list(available_examples())
+    for pattern in args.example or list(EXAMPLES):
+        matches = fnmatch.filter(known, pattern)
+        if not matches:
+            parser.error(f"unknown example {pattern!r} (use pyconc.py --list to see available examples)")
+        names.extend(name for name in matches if name not in names)
+
+    backends = args.backends or ["thread"]
+    if args.clock == "virtual" and backends != ["thread"]:
+        parser.error("only the thread backend can run on the virtual clock")
+
+    if args.sweep:
+        if len(backends) > 1 or args.baseline or args.instrument_locks:
+            parser.error("--sweep takes a single --backend and cannot be combined with --baseline or --instrument-locks")
+        flag, values = args.sweep
+        options = scale_options(args)
+        options.pop(SCALE_OPTIONS[flag], None)
+        report = run_benchmark_sweep(names, SCALE_OPTIONS[flag], values, args.duration, args.repeat, args.seed, args.clock, backends[0], **options)
+        write_report(report, args.output)
+        print(format_sweep_comparison(report["sweep"], flag), file=sys.stderr)
+        return 0
+
+    report = run_benchmarks(
+        names, args.duration, args.repeat, args.seed, args.clock, backends, instrument_locks=args.instrument_locks, **scale_options(args)
+    )
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(report, baseline, args.threshold)
+        report["regressions"] = regressions
+
+    write_report(report, args.output)
+
+    if args.table:
+        print(format_results(report["results"]), file=sys.stderr)
+    if report.get("backends"):
+        print(format_backends(report["backends"], backends), file=sys.stderr)
+
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['example']}: {regression['current']:.2f}/s vs baseline "
+            f"{regression['baseline']:.2f}/s ({regression['change']:+.1%})",
+            file=sys.stderr,
+        )
+    return 1 if regressions else 0
+
+
+def sweep_main(name: str, flag: str, values: List[int], duration: float, seed: int, clock_kind: str, backend: str, options: Dict[str, Any]) -> int:
+    """Run the sweep mode and print the throughput-vs-concurrency table."""
+    from examples.common.bench import format_sweep, run_sweep
+
+    try:
+        rows = run_sweep(name, SCALE_OPTIONS[flag], values, duration, seed, clock_kind, backend, **options)
+    except KeyboardInterrupt:
+        print("\n\nInterrupted by user. Exiting...")
+        return 0
+    except Exception as e:
+        print(f"\nError running sweep: {e}")
+        return 1
+
+    print(f"{name}: {duration}s per point, backend={backend}, clock={clock_kind}, seed={seed}")
+    print(format_sweep(rows, flag))
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main function to handle command line arguments and run examples."""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "bench":
+        return bench_main(argv[1:])
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.list:
+        list_examples()
+        return 0
+    if args.backend != "thread" and args.clock == "virtual":
+        parser.error("only the thread backend can run on the virtual clock")
+    if args.backend != "thread" and (args.instrument_locks or args.detect_deadlocks or args.detect_livelock or args.lockdep or args.trace):
+        parser.error("lock diagnostics are only available on the thread backend")
+
+    try:
+        example_class = load_example(args.example, args.backend)
+    except KeyError:
+        parser.error(f"unknown example {args.example!r} (use --list to see available examples)")
+    except (ImportError, AttributeError, ValueError) as e:
+        print(f"Error loading example {args.example!r}: {e}")
+        return 1
+
+    options = scale_options(args)
+    for flag, option in {**SCALE_OPTIONS, **POLICY_OPTIONS}.items():
+        if option in options and not accepts_option(example_class, option):
+            print(f"Note: {args.example} does not take --{flag}; ignoring it")
+
+    if args.sweep:
+        flag, values = args.sweep
+        if not accepts_option(example_class, SCALE_OPTIONS[flag]):
+            parser.error(f"{args.example} does not take --{flag}, so it cannot be swept")
+        return sweep_main(args.example, flag, values, args.duration, args.seed or 0, args.clock, args.backend, options)
+
+    from examples.common.clock import make_clock
+    from examples.common.log import LEVELS, configure, log
 
-    args = parser.parse_args()
+    configure(LEVELS[args.log_level], quiet=args.quiet)
+    if args.seed is not None:
+        random.seed(args.seed)
+    clock, reports = wrap_clock(make_clock(args.clock, seed=args.seed or 0), args)
 
     print("Python Concurrency Examples")
     print("=" * 50)
 
     try:
-        if args.example == "deadlock":
-            deadlock_example: Any = DeadlockExample()
-            deadlock_example.run(args.duration)
-        elif args.example == "deadlock-fix-resource-ordering":
-            resource_ordering_example: Any = DeadlockFixResourceOrdering()
-            resource_ordering_example.run(args.duration)
-        elif args.example == "deadlock-fix-timeout":
-            timeout_example: Any = DeadlockFixTimeout()
-            timeout_example.run(args.duration)
-        elif args.example == "deadlock-fix-asymmetric-behavior":
-            asymmetric_example: Any = DeadlockFixAsymmetricBehavior()
-            asymmetric_example.run(args.duration)
-        elif args.example == "deadlock-fix-waiter":
-            waiter_example: Any = DeadlockFixWaiter()
-            waiter_example.run(args.duration)
-        elif args.example == "livelock":
-            livelock_example: Any = LivelockExample()
-            livelock_example.run(args.duration)
-        elif args.example == "livelock-fix-random-backoff":
-            backoff_example: Any = LivelockFixRandomBackoff()
-            backoff_example.run(args.duration)
-        elif args.example == "livelock-fix-priority":
-            priority_example: Any = LivelockFixPriority()
-            priority_example.run(args.duration)
-        elif args.example == "starvation":
-            starvation_example: Any = StarvationExample()
-            starvation_example.run(args.duration)
-        elif args.example == "starvation-fix-fair-scheduling":
-            fair_scheduling_example: Any = StarvationFixFairScheduling()
-            fair_scheduling_example.run(args.duration)
-        elif args.example == "starvation-fix-aging":
-            aging_example: Any = StarvationFixAging()
-            aging_example.run(args.duration)
-        elif args.example == "threadpool":
-            threadpool_example: Any = ThreadPoolExample()
-            threadpool_example.run(args.duration)
-        elif args.example == "threadpool-polling-periodic":
-            periodic_example: Any = ThreadPoolPollingPeriodic()
-            periodic_example.run(args.duration)
-        elif args.example == "threadpool-polling-adaptive":
-            adaptive_example: Any = ThreadPoolPollingAdaptive()
-            adaptive_example.run(args.duration)
-        elif args.example == "threadpool-polling-event-driven":
-            event_driven_example: Any = ThreadPoolPollingEventDriven()
-            event_driven_example.run(args.duration)
-        elif args.example == "threadpool-polling-batch":
-            batch_example: Any = ThreadPoolPollingBatch()
-            batch_example.run(args.duration)
+        example: Any = create_example(example_class, clock=clock, **options)
+        if args.detect_livelock and getattr(example, "metrics", None) is not None:
+            clock.watchdog.watch(example.metrics)
+        example.run(args.duration)
+        log.flush()
+        for report in reports:
+            print(report())
 
     except KeyboardInterrupt:
         print("\n\nInterrupted by user. Exiting...")
     except Exception as e:
         print(f"\nError running example: {e}")
         return 1
+    finally:
+        if clock.virtual:
+            clock.close()
+        log.flush()
 
+    if log.dropped:
+        print(f"Log buffer overflowed: {log.dropped} messages dropped (use --log-level or --quiet)")
     return 0
 
 
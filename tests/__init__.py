@@ -1,3 +1,15 @@
 """
 Test suite for PyConc - Python Concurrency Examples
 """
+
+import unittest
+
+from examples.common.log import OFF, log
+
+
+class QuietLogTestCase(unittest.TestCase):
+    """A test case that turns the examples' log off for each test and restores its level afterwards."""
+
+    def setUp(self):
+        level, log.level = log.level, OFF
+        self.addCleanup(setattr, log, "level", level)
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for the process and asyncio backends
+"""
+
+import contextlib
+import io
+import multiprocessing
+import unittest
+from examples.common.backends import SharedCounters, measure_lock_overhead, shard
+from examples.common.clock import VirtualClock
+from examples.deadlock.deadlock_backends import DeadlockFixSemaphoreProcess, DeadlockFixTimeoutProcess
+from examples.registry import BACKEND_EXAMPLES, EXAMPLES, has_backend, load_example, resolve
+from examples.starvation.starvation_backends import StarvationExampleAsyncio, StarvationExampleProcess
+
+
+def _count_to(counters, index, n):
+    for _ in range(n):
+        counters.increment(index)
+    counters.close()
+
+
+class TestBackends(unittest.TestCase):
+    """Test cases for the backend implementations of each family."""
+
+    def test_backend_targets_resolve(self):
+        """Test that every backend example names a built-in example and loads."""
+        for backend, targets in BACKEND_EXAMPLES.items():
+            for name in targets:
+                self.assertIn(name, EXAMPLES)
+                self.assertTrue(has_backend(name, backend))
+                self.assertIsNotNone(load_example(name, backend))
+
+    def test_missing_backend(self):
+        """Test that unknown names and unsupported backends raise different errors."""
+        self.assertEqual(resolve("deadlock", "thread"), EXAMPLES["deadlock"])
+        self.assertFalse(has_backend("deadlock", "process"))
+        with self.assertRaises(ValueError):
+            resolve("deadlock", "asyncio")
+        with self.assertRaises(KeyError):
+            resolve("no-such-example", "asyncio")
+
+    def test_backends_make_progress(self):
+        """Test that every backend example records work in a short run."""
+        for backend, targets in BACKEND_EXAMPLES.items():
+            for name in targets:
+                with self.subTest(backend=backend, example=name):
+                    example = load_example(name, backend)()
+                    example.run(duration=1)
+                    self.assertGreater(example.metrics.count, 0)
+
+    def test_starvation_access_stats(self):
+        """Test that process and asyncio workers' waits and holds reach the parent, one grant per critical section."""
+        for example_class in (StarvationExampleProcess, StarvationExampleAsyncio):
+            with self.subTest(example=example_class.__name__):
+                example = example_class()
+                with contextlib.redirect_stdout(io.StringIO()) as output:
+                    example.run(duration=1)
+                self.assertEqual(set(example.access.workers), {"high-0", "high-1", "high-2", "low-0", "low-1"})
+                holds = sum(access.hold.count for access in example.access.workers.values())
+                self.assertEqual(holds, example.metrics.count)
+                self.assertIn("Longest starvation streak", output.getvalue())
+
+    def test_virtual_clock_is_rejected(self):
+        """Test that real processes and event loops refuse the virtual clock."""
+        with VirtualClock() as clock:
+            for backend in BACKEND_EXAMPLES:
+                with self.assertRaises(ValueError):
+                    load_example("starvation", backend)(clock=clock)
+
+
+class TestShardedProcesses(unittest.TestCase):
+    """Test cases for philosophers sharded over processes with shared-memory counters."""
+
+    def test_shard(self):
+        """Test that shards are contiguous, cover every worker once and differ in size by at most one."""
+        self.assertEqual(shard(10, 3), [range(0, 4), range(4, 7), range(7, 10)])
+        self.assertEqual(shard(2, 8), [range(0, 1), range(1, 2)])
+        self.assertEqual(shard(0, 4), [range(0, 0)])
+
+    def test_shared_counters_between_processes(self):
+        """Test that counts written by child processes are seen by the parent without a Manager."""
+        counters = SharedCounters(3)
+        try:
+            children = [multiprocessing.Process(target=_count_to, args=(counters, i, 1000 * (i + 1))) for i in range(3)]
+            for child in children:
+                child.start()
+            for child in children:
+                child.join()
+            self.assertEqual(counters.tolist(), [1000, 2000, 3000])
+            self.assertEqual(len(counters), 3)
+        finally:
+            counters.unlink()
+
+    def test_per_process_meals(self):
+        """Test that meals counted in shared memory match the metrics each shard reported."""
+        for cls in (DeadlockFixTimeoutProcess, DeadlockFixSemaphoreProcess):
+            with self.subTest(cls.__name__):
+                example = cls(num_philosophers=6, num_processes=3)
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    example.run(duration=2)
+                self.assertEqual(example.num_processes, 3)
+                self.assertEqual(sum(example.meals), example.metrics.count)
+                self.assertEqual({i: n for i, n in enumerate(example.meals) if n}, example.metrics.per_worker)
+                self.assertEqual(len(example.shard_throughput(2.0)), 3)
+                self.assertIn("Process 2 (philosophers 4-5)", output.getvalue())
+
+    def test_measure_lock_overhead(self):
+        """Test that the lock microbenchmark reports every case."""
+        results = measure_lock_overhead(iterations=200)
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(cost > 0 for cost in results.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,988 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared infrastructure in examples.common
+"""
+
+import contextlib
+import io
+import json
+import os
+import queue
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from examples.common.access_stats import AccessStats
+from examples.common import bench
+from examples.common.bench import bench_example, compare, format_results, format_sweep, format_sweep_comparison, run_benchmark_sweep, run_sweep
+from examples.common.clock import VirtualClock, VirtualDeadlockError
+from examples.common.fair_lock import FairLock, measure_handoff
+from examples.common.grant_monitor import HandOffMonitor
+from examples.common.histogram import Histogram, format_percentiles
+from examples.common.indexed_heap import IndexedHeap
+from examples.common.instrument import InstrumentedClock, InstrumentedLock, LockProfiler, measure_overhead
+from examples.common.lockdep import LockdepClock, LockOrderValidator, ValidatedLock
+from examples.common.log import INFO, RingBufferLog
+from examples.common.metrics import WorkMetrics, jain_index, percentile
+from examples.common.multilock import LockSet, acquire_all, lock_rank, rank_by_position, release_all
+from examples.common.rw_lock import PHASE_FAIR, READER_PREFERENCE, WRITER_PREFERENCE, ReaderWriterLock
+from examples.common import multilock
+from examples.common.topology import (
+    ConflictGraph,
+    greedy_coloring,
+    grid,
+    load_graph,
+    make_graph,
+    neighbour_lists,
+    power_law,
+    random_regular,
+    ring,
+    save_graph,
+)
+from examples.common.trace import ACQUIRE, ACQUIRED, RELEASE, TracedLock, Tracer, TracingClock
+from examples.livelock import LivelockExample, LivelockFixRandomBackoff
+from tests import QuietLogTestCase
+
+
+class TestWorkMetrics(unittest.TestCase):
+    """Test cases for work metrics."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile(values, 100), 100.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_record_and_summary(self):
+        """Test that records are counted per worker and summarized."""
+        metrics = WorkMetrics("meals")
+        for i in range(10):
+            metrics.record(0.1 * i, i % 2)
+
+        summary = metrics.summary(elapsed=2.0)
+        self.assertEqual(summary["count"], 10)
+        self.assertEqual(summary["throughput"], 5.0)
+        self.assertEqual(metrics.per_worker, {0: 5, 1: 5})
+        self.assertAlmostEqual(summary["latency"]["max"], 0.9)
+
+    def test_fairness(self):
+        """Test Jain's index, counting expected workers that never recorded."""
+        self.assertEqual(jain_index([3, 3, 3]), 1.0)
+        self.assertAlmostEqual(jain_index([9, 0, 0]), 1 / 3)
+        self.assertAlmostEqual(jain_index([9], n=3), 1 / 3)
+        self.assertEqual(jain_index([]), 0.0)
+
+        metrics = WorkMetrics("meals")
+        for i in range(4):
+            metrics.record(0.1, i % 2)
+        self.assertEqual(metrics.fairness(), 1.0)
+        metrics.num_workers = 4
+        self.assertEqual(metrics.fairness(), 0.5)
+
+    def test_events(self):
+        """Test that events other than completed work are tallied per worker."""
+        metrics = WorkMetrics("meals")
+        metrics.tally("retries", 0)
+        metrics.tally("retries", 1, n=3)
+        self.assertEqual(metrics.event_count("retries"), 4)
+        self.assertEqual(metrics.events["retries"], {0: 1, 1: 3})
+        self.assertEqual(metrics.event_count("timeouts"), 0)
+        self.assertEqual(metrics.count, 0)
+
+    def test_merge(self):
+        """Test that merging another worker's metrics adds its samples, work and events."""
+        metrics, other = WorkMetrics("meals"), WorkMetrics("")
+        metrics.record(0.1, 0)
+        metrics.tally("timeouts", 0)
+        other.record(0.2, 0)
+        other.record(0.3, 1)
+        other.tally("timeouts", 0, n=2)
+        metrics.merge(other)
+        self.assertEqual(sorted(metrics.latencies), [0.1, 0.2, 0.3])
+        self.assertEqual(metrics.per_worker, {0: 2, 1: 1})
+        self.assertEqual(metrics.events["timeouts"], {0: 3})
+
+    def test_histogram_metrics(self):
+        """Test that histogram metrics count and summarize without keeping samples, and merge either kind."""
+        metrics, samples = WorkMetrics("meals", histogram=True), WorkMetrics("meals")
+        for i in range(1, 11):
+            metrics.record(0.1 * i, i % 2)
+        samples.record(2.0, 0)
+        metrics.merge(samples)
+        metrics.merge(WorkMetrics("meals", histogram=True))
+        self.assertEqual(metrics.latencies, [])
+        self.assertEqual(metrics.count, 11)
+        self.assertEqual(metrics.per_worker, {0: 6, 1: 5})
+        summary = metrics.summary(elapsed=11.0)
+        self.assertEqual(summary["throughput"], 1.0)
+        self.assertAlmostEqual(summary["latency"]["p50"], 0.6, delta=0.6 / 32)
+        self.assertAlmostEqual(summary["latency"]["max"], 2.0)
+        with self.assertRaises(ValueError):
+            samples.merge(metrics)
+
+
+class TestHistogram(unittest.TestCase):
+    """Test cases for the log-linear histogram."""
+
+    def test_bucket_bounds(self):
+        """Test that every value falls inside its bucket's bounds."""
+        histogram = Histogram()
+        for nanos in list(range(0, 5000)) + [10**6, 10**9, 123456789, 2**40]:
+            index = histogram._index(nanos)
+            self.assertLessEqual(histogram._lowest(index), nanos)
+            self.assertLessEqual(nanos, histogram._highest(index))
+
+    def test_pages_allocated_on_first_use(self):
+        """Test that recording lands in the value's bucket and allocates only the pages of magnitudes seen."""
+        histogram = Histogram()
+        self.assertEqual(sum(page is not None for page in histogram._pages), 0)
+        for nanos in (0, 40, 10**6, 10**9, 123456789, 2**41 - 1):
+            single = Histogram()
+            single.record_nanos(nanos)
+            self.assertEqual(list(single._nonzero()), [(single._index(nanos), 1)])
+        for _ in range(1000):
+            histogram.record(0.2)
+            histogram.record(0.25)
+        self.assertEqual(sum(page is not None for page in histogram._pages), 1)
+        self.assertEqual(histogram.merge(Histogram()).count, 2000)
+
+    def test_percentiles_within_bucket_width(self):
+        """Test that percentiles are within about 3% of the exact values."""
+        histogram = Histogram()
+        values = [i * 1e-5 for i in range(1, 10001)]
+        for value in values:
+            histogram.record(value)
+        self.assertEqual(histogram.count, 10000)
+        for q in (50, 90, 99, 99.9):
+            exact = percentile(values, q)
+            self.assertAlmostEqual(histogram.percentile(q), exact, delta=exact * 0.035)
+        self.assertAlmostEqual(histogram.summary()["max"], 0.1)
+
+    def test_merge(self):
+        """Test that merged histograms match one histogram fed all values."""
+        left, right, combined = Histogram(), Histogram(), Histogram()
+        for i in range(1000):
+            (left if i % 2 else right).record(i * 1e-4)
+            combined.record(i * 1e-4)
+        merged = Histogram.merged([left, right])
+        self.assertEqual(merged.summary(), combined.summary())
+
+    def test_format_percentiles(self):
+        """Test that the per-worker table has a row per histogram with its count and max."""
+        fast, slow = Histogram(), Histogram()
+        fast.record(0.001)
+        for _ in range(3):
+            slow.record(2.0)
+        lines = format_percentiles({"fast": fast, "slow": slow}, (50, 99.9)).splitlines()
+        self.assertEqual(lines[0].split(), ["worker", "count", "p50", "p99.9", "max"])
+        self.assertEqual(lines[2].split()[:2], ["slow", "3"])
+        self.assertTrue(lines[2].endswith("2.000s"))
+
+
+class TestAccessStats(unittest.TestCase):
+    """Test cases for the per-worker wait and hold histograms."""
+
+    def test_waits_holds_and_streak(self):
+        """Test that a wait spans retries, and counts the grants to others made during it."""
+        with VirtualClock(jitter=0) as clock:
+            stats = AccessStats(clock)
+            slow, fast = stats.worker("slow"), stats.worker("fast")
+            stats.waiting(slow)
+            for _ in range(3):
+                stats.waiting(fast)
+                clock.sleep(0.5)
+                stats.waiting(slow)  # a retry does not restart the wait
+                stats.acquired(fast)
+                clock.sleep(0.25)
+                self.assertAlmostEqual(stats.released(fast), 0.25)
+            self.assertAlmostEqual(stats.acquired(slow), 2.25)
+            stats.released(slow)
+        self.assertEqual((slow.wait.count, fast.wait.count, fast.hold.count), (1, 3, 3))
+        self.assertEqual(stats.grants[0], 4)
+        self.assertIs(stats.longest_streak(), slow)
+        self.assertEqual((slow.longest_streak, fast.longest_streak), (3, 0))
+        report = stats.report()
+        for text in ("Wait for the resource:", "Time holding it:", "p99.9", "all", "slow was passed over 3 times in a row, waiting 2.250s"):
+            self.assertIn(text, report)
+
+    def test_report_lists_the_worst_workers(self):
+        """Test that with many workers the report lists only those with the longest waits, but merges all of them."""
+        with VirtualClock(jitter=0) as clock:
+            stats = AccessStats(clock)
+            for i in range(30):
+                access = stats.worker(f"w{i}")
+                stats.waiting(access)
+                clock.sleep(0.01 * i)
+                stats.acquired(access)
+                stats.released(access)
+        lines = stats.report(limit=3).splitlines()
+        self.assertEqual([line.split()[0] for line in lines[2:6]], ["w29", "w28", "w27", "all"])
+        self.assertEqual(lines[5].split()[1], "30")
+        self.assertIn("(27 more workers not listed)", lines)
+
+
+class TestFairLock(unittest.TestCase):
+    """Test cases for the FIFO hand-off lock."""
+
+    def test_waiters_served_in_arrival_order(self):
+        """Test that queued threads get the lock in the order they asked, and a newcomer cannot barge in."""
+        with VirtualClock(jitter=0) as clock:
+            lock = FairLock("resource", clock=clock)
+            order = []
+
+            def waiter(name: str, delay: float):
+                clock.sleep(delay)
+                with lock:
+                    order.append(name)
+                    clock.sleep(1.0)
+
+            def barger():
+                clock.sleep(1.5)
+                # Free for an instant between hand-offs under a plain lock, never under FairLock
+                self.assertFalse(lock.acquire(blocking=False))
+
+            lock.acquire()
+            threads = [clock.Thread(target=waiter, args=(f"w{i}", 0.1 * (i + 1)), name=f"w{i}") for i in range(4)]
+            threads.append(clock.Thread(target=barger, name="barger"))
+            for thread in threads:
+                thread.start()
+            clock.sleep(1.0)
+            lock.release()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(order, ["w0", "w1", "w2", "w3"])
+        self.assertEqual(lock.handoffs, 4)
+        self.assertFalse(lock.locked())
+
+    def test_timeout_leaves_the_queue(self):
+        """Test that a waiter that times out is removed and the lock goes to the next one."""
+        with VirtualClock(jitter=0) as clock:
+            lock = FairLock(clock=clock)
+            results = {}
+
+            def waiter(name: str, timeout: float):
+                results[name] = lock.acquire(timeout=timeout)
+                if results[name]:
+                    lock.release()
+
+            lock.acquire()
+            threads = [clock.Thread(target=waiter, args=("impatient", 0.5)), clock.Thread(target=waiter, args=("patient", 5.0))]
+            for thread in threads:
+                thread.start()
+            clock.sleep(1.0)
+            self.assertEqual(lock.waiting(), 1)
+            lock.release()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(results, {"impatient": False, "patient": True})
+        with self.assertRaises(RuntimeError):
+            lock.release()
+
+    def test_measure_handoff(self):
+        """Test that the microbenchmark reports both locks with a fair FairLock."""
+        results = measure_handoff(threads=3, duration=0.2)
+        self.assertEqual(set(results), {"threading.Lock", "FairLock"})
+        self.assertGreater(results["FairLock"]["throughput"], 0)
+        self.assertGreater(results["FairLock"]["fairness"], 0.9)
+
+
+class LastInFirstOut(HandOffMonitor):
+    """A hand-off monitor whose policy serves the latest waiter first."""
+
+    def __init__(self, num_workers: int, clock=None):
+        super().__init__(num_workers, clock=clock)
+        self.stack = []
+
+    def enqueue(self, worker_id: int):
+        self.stack.append(worker_id)
+
+    def dequeue(self) -> int:
+        return self.stack.pop()
+
+    def waiting(self) -> bool:
+        return bool(self.stack)
+
+    def withdraw(self, worker_id: int):
+        self.stack.remove(worker_id)
+
+
+class TestGrantMonitor(unittest.TestCase):
+    """Test cases for the grant monitor base."""
+
+    def test_hand_off_follows_policy_and_stop_withdraws(self):
+        """Test that release hands over in the policy's order and stop() turns away the waiters left."""
+        with VirtualClock(jitter=0) as clock:
+            monitor = LastInFirstOut(4, clock=clock)
+            order, refused = [], []
+
+            def worker(worker_id: int):
+                clock.sleep(0.1 * worker_id)
+                if not monitor.request(worker_id):
+                    refused.append(worker_id)
+                    return
+                order.append(worker_id)
+                clock.sleep(1.0)
+                if worker_id != 2:
+                    monitor.release(worker_id)
+
+            threads = [clock.Thread(target=worker, args=(i,), name=f"worker-{i}") for i in range(4)]
+            for thread in threads:
+                thread.start()
+            clock.sleep(5.0)
+            monitor.stop()
+            for thread in threads:
+                thread.join()
+        # Worker 0 takes it free, then the latest waiter goes first; worker 2 never releases
+        self.assertEqual(order, [0, 3, 2])
+        self.assertEqual(refused, [1])
+        self.assertEqual((monitor.holder, monitor.handoffs, monitor.stack), (2, 2, []))
+
+
+class TestReaderWriterLock(unittest.TestCase):
+    """Test cases for the reader-writer lock policies."""
+
+    def admission_order(self, policy: str):
+        """Hold a read lock while a writer, a reader and a second writer arrive; return when each got in."""
+        with VirtualClock(jitter=0) as clock:
+            lock = ReaderWriterLock(policy, clock=clock)
+            order = []
+
+            def worker(name: str, delay: float):
+                clock.sleep(delay)
+                with lock.for_writing() if name.startswith("w") else lock.for_reading():
+                    order.append((name, round(clock.time(), 6)))
+                    clock.sleep(1.0)
+
+            lock.acquire_read()
+            threads = [clock.Thread(target=worker, args=args) for args in (("w1", 0.1), ("r", 0.2), ("w2", 0.3))]
+            for thread in threads:
+                thread.start()
+            clock.sleep(1.0)
+            lock.release_read()
+            for thread in threads:
+                thread.join()
+        self.assertEqual((lock.readers, lock.writing, lock.waiting_readers, lock.waiting_writers), (0, False, 0, 0))
+        self.assertEqual(lock.grants[0], 4)
+        return order
+
+    def test_reader_preference_passes_waiting_writers(self):
+        """Test that a reader joins the readers in while a writer waits."""
+        self.assertEqual(self.admission_order(READER_PREFERENCE), [("r", 0.2), ("w1", 1.2), ("w2", 2.2)])
+
+    def test_writer_preference_serves_writers_first(self):
+        """Test that a reader waits behind every waiting writer, including one that came later."""
+        self.assertEqual(self.admission_order(WRITER_PREFERENCE), [("w1", 1.0), ("w2", 2.0), ("r", 3.0)])
+
+    def test_phase_fair_alternates(self):
+        """Test that a reader waits for the writer ahead of it, then goes before the next one."""
+        self.assertEqual(self.admission_order(PHASE_FAIR), [("w1", 1.0), ("r", 2.0), ("w2", 3.0)])
+
+    def test_queued_writer_keeps_its_grant(self):
+        """Test that a writer arriving just after the lock is handed to a queued writer waits its turn."""
+        with VirtualClock(jitter=0) as clock:
+            lock = ReaderWriterLock(WRITER_PREFERENCE, clock=clock)
+            order = []
+
+            def writer():
+                with lock.for_writing():
+                    order.append("queued")
+                    clock.sleep(1.0)
+
+            lock.acquire_read()
+            thread = clock.Thread(target=writer, name="queued")
+            thread.start()
+            clock.sleep(0.5)
+            # Hands the lock to the queued writer, which has not run yet
+            lock.release_read()
+            with lock.for_writing():
+                order.append("barger")
+            thread.join()
+        self.assertEqual(order, ["queued", "barger"])
+        self.assertEqual((lock.writing, lock.waiting_writers, lock.grants[0]), (False, 0, 3))
+
+    def test_readers_share_writers_do_not(self):
+        """Test that readers hold the lock together, and a release without an acquire is an error."""
+        with VirtualClock(jitter=0) as clock:
+            lock = ReaderWriterLock(clock=clock)
+            lock.acquire_read()
+            lock.acquire_read()
+            self.assertEqual(lock.readers, 2)
+            lock.release_read()
+            lock.release_read()
+            with lock.for_writing():
+                self.assertTrue(lock.writing)
+            with self.assertRaises(RuntimeError):
+                lock.release_read()
+            with self.assertRaises(RuntimeError):
+                lock.release_write()
+        with self.assertRaises(ValueError):
+            ReaderWriterLock("first-come")
+
+
+class TestIndexedHeap(unittest.TestCase):
+    """Test cases for the indexed min-heap."""
+
+    def test_pops_in_key_order(self):
+        """Test that items come out smallest key first, matching a sort, after random pushes, updates and removals."""
+        rng = random.Random(3)
+        heap = IndexedHeap(200)
+        expected = {}
+        for _ in range(2000):
+            item = rng.randrange(200)
+            if item in expected and rng.random() < 0.2:
+                heap.remove(item)
+                del expected[item]
+            else:
+                expected[item] = rng.random()
+                heap.push(item, expected[item])
+            self.assertEqual(len(heap), len(expected))
+        popped = []
+        while heap:
+            item = heap.pop()
+            popped.append(expected.pop(item))
+            self.assertNotIn(item, heap)
+        self.assertEqual(popped, sorted(popped))
+        self.assertEqual(expected, {})
+
+    def test_one_entry_per_item(self):
+        """Test that pushing an item again changes its key in place instead of adding a second entry."""
+        heap = IndexedHeap(3)
+        heap.push(0, 5.0)
+        heap.push(1, 3.0)
+        heap.push(2, 4.0)
+        heap.push(0, 1.0)  # decrease-key
+        self.assertEqual(len(heap), 3)
+        self.assertEqual(heap.peek(), (0, 1.0))
+        heap.push(0, 9.0)
+        self.assertEqual([heap.pop(), heap.pop(), heap.pop()], [1, 2, 0])
+        with self.assertRaises(IndexError):
+            heap.pop()
+        with self.assertRaises(KeyError):
+            heap.remove(1)
+
+
+class TestInstrumentedLock(unittest.TestCase):
+    """Test cases for lock instrumentation."""
+
+    def test_counts_and_timeouts(self):
+        """Test that attempts, successes and timeouts are counted per lock."""
+        profiler = LockProfiler()
+        lock = InstrumentedLock(threading.Lock(), profiler, "resource")
+        with lock:
+            pass
+        self.assertTrue(lock.acquire())
+        self.assertFalse(lock.acquire(timeout=0.01))
+        lock.release()
+
+        stats = profiler.per_lock()["resource"]
+        self.assertEqual((stats.attempts, stats.acquired, stats.timeouts), (3, 2, 1))
+        self.assertEqual(stats.hold.count, 2)
+        self.assertGreater(stats.failed_wait, 0)
+
+    def test_virtual_wait_and_hold_times(self):
+        """Test that waits and holds are measured on the wrapped clock, per thread."""
+        with VirtualClock(jitter=0) as clock:
+            wrapped = InstrumentedClock(clock)
+            lock = wrapped.Lock("fork-0")
+
+            def holder():
+                with lock:
+                    clock.sleep(2.0)
+
+            def waiter():
+                clock.sleep(0.5)
+                with lock:
+                    pass
+
+            threads = [clock.Thread(target=holder, name="holder"), clock.Thread(target=waiter, name="waiter")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        per_thread = wrapped.profiler.per_thread()
+        self.assertAlmostEqual(per_thread["holder"].hold.percentile(100), 2.0, delta=0.07)
+        self.assertAlmostEqual(per_thread["waiter"].wait.percentile(100), 1.5, delta=0.05)
+        report = wrapped.profiler.report()
+        self.assertIn("fork-0", report)
+        self.assertIn("waiter", report)
+
+    def test_overhead_is_measured(self):
+        """Test that the overhead microbenchmark runs."""
+        result = measure_overhead(iterations=1000)
+        self.assertGreater(result["instrumented"], 0)
+
+
+class TestLockSet(unittest.TestCase):
+    """Test cases for rank-ordered, all-or-nothing multi-lock acquisition."""
+
+    def test_rank_order(self):
+        """Test that locks are taken by natural name order, numbers as numbers, once each."""
+        clock = LockdepClock(VirtualClock())
+        forks = [clock.Lock(f"fork-{i}") for i in (10, 2, 9)]
+        lock_set = LockSet(forks + [forks[0]], clock=clock)
+        self.assertEqual([lock.name for lock in lock_set.locks], ["fork-2", "fork-9", "fork-10"])
+        self.assertLess(lock_rank(forks[1]), lock_rank(forks[0]))
+        by_position = LockSet(forks[::-1], key=rank_by_position(forks))
+        self.assertEqual(by_position.locks, forks)
+        clock.close()
+
+    def test_timeout_backs_out(self):
+        """Test that a timed acquisition that cannot get every lock holds none of them."""
+        with VirtualClock(jitter=0, resolution=0) as clock:
+            locks = [clock.Lock() for _ in range(4)]
+            locks[2].acquire()
+            lock_set = LockSet(locks, key=rank_by_position(locks), clock=clock)
+            self.assertFalse(lock_set.acquire(timeout=0.5))
+            self.assertEqual(clock.time(), 0.5)
+            self.assertEqual([lock.locked() for lock in locks], [False, False, True, False])
+            self.assertEqual(lock_set.backed_out, 2)
+
+            with self.assertRaises(TimeoutError):
+                with LockSet(locks, timeout=0.25, clock=clock):
+                    pass
+            self.assertEqual(sum(lock.locked() for lock in locks), 1)
+
+            locks[2].release()
+            self.assertTrue(acquire_all(locks, timeout=0.5, clock=clock))
+            self.assertTrue(all(lock.locked() for lock in locks))
+            release_all(locks)
+            self.assertFalse(any(lock.locked() for lock in locks))
+
+    def test_exception_backs_out(self):
+        """Test that an exception while acquiring releases the locks already taken."""
+
+        class Interrupted:
+            name = "z-interrupted"
+
+            def acquire(self, *args):
+                raise KeyboardInterrupt
+
+        first = threading.Lock()
+        with self.assertRaises(KeyboardInterrupt):
+            LockSet([Interrupted(), first]).acquire()
+        self.assertFalse(first.locked())
+
+    def test_many_workers_many_locks(self):
+        """Test that workers taking overlapping random subsets of locks never deadlock or invert."""
+        clock = LockdepClock(VirtualClock(seed=4))
+        locks = [clock.Lock(f"resource-{i}") for i in range(6)]
+        completed = []
+
+        def worker(worker_id):
+            rng = random.Random(worker_id)
+            for round_number in range(30):
+                chosen = rng.sample(locks, rng.randint(2, 5))
+                lock_set = LockSet(chosen, clock=clock)
+                # Half the workers use all-or-nothing timeouts, as in the livelock examples
+                if worker_id % 2 and not lock_set.acquire(timeout=0.05):
+                    clock.sleep(rng.uniform(0.01, 0.05))
+                    continue
+                if not worker_id % 2:
+                    lock_set.acquire()
+                clock.sleep(0.01)
+                lock_set.release()
+                completed.append(worker_id)
+
+        with clock.clock:
+            threads = [clock.Thread(target=worker, args=(i,), name=f"worker-{i}") for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(clock.validator.violations, [])
+        self.assertEqual(set(completed), set(range(8)))
+        self.assertTrue(all(completed.count(i) == 30 for i in range(0, 8, 2)))
+        self.assertFalse(any(lock.locked() for lock in locks))
+
+    def test_measure_overhead(self):
+        """Test that the microbenchmark reports every method for each lock count."""
+        results = multilock.measure_overhead(iterations=100, counts=(1, 2))
+        self.assertEqual(set(results), {1, 2})
+        self.assertEqual(set(results[2]), {"nested", "lock_set", "timed", "acquire_all"})
+
+
+class TestLockdep(QuietLogTestCase):
+    """Test cases for the lock-order validator."""
+
+    def test_flags_opposite_lock_orders(self):
+        """Test that workers taking lock1/lock2 in opposite orders are flagged once."""
+        with VirtualClock(seed=0) as clock:
+            wrapped = LockdepClock(clock)
+            LivelockExample(clock=wrapped).run(duration=5)
+
+        violations = wrapped.validator.violations
+        self.assertEqual(len(violations), 1)
+        self.assertEqual(sorted(violations[0].locks()), ["lock1", "lock2"])
+        self.assertEqual({edge[2] for edge in violations[0].cycle}, {"worker-1", "worker-2"})
+        self.assertIn("livelock_problem.py", "".join(violations[0].cycle[0][3]))
+
+    def test_consistent_order_is_clean(self):
+        """Test that always taking lock1 before lock2 learns one ordering and no inversion."""
+        with VirtualClock(seed=0) as clock:
+            wrapped = LockdepClock(clock)
+            LivelockFixRandomBackoff(num_workers=4, clock=wrapped).run(duration=5)
+        self.assertEqual(wrapped.validator.violations, [])
+        self.assertEqual(wrapped.validator.num_edges, 1)
+
+    def test_inversion_found_without_contention(self):
+        """Test that a three-lock cycle is caught in a single thread, before anything blocks."""
+        validator = LockOrderValidator()
+        a, b, c = (ValidatedLock(threading.Lock(), validator, name) for name in "abc")
+        for first, second in ((a, b), (b, c)):
+            with first, second:
+                pass
+        self.assertEqual(validator.violations, [])
+        with c, a:
+            pass
+        self.assertEqual(len(validator.violations), 1)
+        self.assertEqual(validator.violations[0].locks(), ["a", "b", "c"])
+        self.assertEqual(len(validator.held()), 0)
+
+    def test_trylock_adds_no_order(self):
+        """Test that non-blocking attempts are not treated as ordering."""
+        validator = LockOrderValidator()
+        a, b = ValidatedLock(threading.Lock(), validator, "a"), ValidatedLock(threading.Lock(), validator, "b")
+        with a:
+            self.assertTrue(b.acquire(blocking=False))
+            b.release()
+        self.assertEqual(validator.num_edges, 0)
+
+
+class TestTopology(unittest.TestCase):
+    """Test cases for conflict graphs in CSR arrays."""
+
+    def test_ring_matches_left_and_right_forks(self):
+        """Test that philosopher i of the ring has forks i then i+1, and neighbours either side."""
+        graph = ring(6)
+        self.assertEqual(graph.num_edges, 6)
+        for i in range(6):
+            self.assertEqual(list(graph.forks(i)), [i, (i + 1) % 6])
+            self.assertEqual(sorted(graph.neighbours(i)), sorted([(i - 1) % 6, (i + 1) % 6]))
+        self.assertEqual(list(ring(2).forks(1)), [1, 0])
+        self.assertEqual(list(ring(1).forks(0)), [0, 0])
+
+    def test_generators(self):
+        """Test the shape of each generated graph and that every fork joins the philosophers listing it."""
+        square = grid(12, columns=4)
+        self.assertEqual(square.num_edges, 3 * 3 + 2 * 4)
+        self.assertEqual([square.degree(v) for v in (0, 1, 5)], [2, 3, 4])
+        regular = random_regular(100, 3, seed=2)
+        self.assertEqual({regular.degree(v) for v in range(100)}, {3})
+        edges = regular.edges()
+        self.assertFalse(any(u == v for u, v in edges))
+        self.assertEqual(len({(min(e), max(e)) for e in edges}), len(edges))
+        hubs = power_law(1000, 2, seed=1)
+        self.assertEqual(hubs.num_edges, 2 * 998)
+        self.assertGreater(max(hubs.degree(v) for v in range(1000)), 30)
+        for graph in (square, regular, hubs):
+            for v in range(graph.num_vertices):
+                for fork in graph.forks(v):
+                    self.assertIn(v, (graph.tails[fork], graph.heads[fork]))
+            colors = greedy_coloring(graph)
+            self.assertFalse(any(colors[u] == colors[v] for u, v in graph.edges()))
+        with self.assertRaises(ValueError):
+            random_regular(5, 3)
+
+    def test_make_graph_and_files(self):
+        """Test graph specs and that a saved graph loads back with the same edges."""
+        self.assertEqual(make_graph(None, 5).edges(), ring(5).edges())
+        self.assertEqual(make_graph("grid:3", 9).edges(), grid(9, 3).edges())
+        self.assertEqual({make_graph("random-regular:4", 20).degree(v) for v in range(20)}, {4})
+        with self.assertRaises(ValueError):
+            make_graph("grid:wide", 9)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.txt")
+            save_graph(random_regular(30, 3), path)
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write("\n# trailing comment\n")
+            loaded = make_graph(path, 5)
+            self.assertEqual(loaded.edges(), random_regular(30, 3).edges())
+            self.assertEqual(neighbour_lists(loaded), neighbour_lists(random_regular(30, 3)))
+            with open(path, "w", encoding="utf-8") as fh:
+                fh.write("0 1 2\n")
+            with self.assertRaises(ValueError):
+                load_graph(path)
+        with self.assertRaises(ValueError):
+            ConflictGraph(2, [0], [2])
+
+    def test_large_graphs_build_quickly(self):
+        """Test that 100k-philosopher graphs build in compact arrays within a second."""
+        for kind in ("ring", "grid", "random-regular", "power-law"):
+            started = time.perf_counter()
+            graph = make_graph(kind, 100000)
+            self.assertLess(time.perf_counter() - started, 2.0, kind)
+            self.assertEqual(graph.num_vertices, 100000)
+            self.assertEqual(len(graph.adjacent), 2 * graph.num_edges)
+            self.assertEqual(graph.adjacent.itemsize, 4)
+
+
+class TestTracer(unittest.TestCase):
+    """Test cases for timeline tracing."""
+
+    def test_events_are_compact(self):
+        """Test that events land in the recording thread's arrays in order."""
+        tracer = Tracer()
+        lock = TracedLock(threading.Lock(), tracer, "resource")
+        with lock:
+            pass
+        self.assertEqual(len(tracer.buffers), 1)
+        self.assertEqual(tracer.buffers[0].times.typecode, "q")
+        kinds = [(kind, tracer.names[object_id]) for _, _, kind, object_id in tracer.events()]
+        self.assertEqual(kinds, [(ACQUIRE, "resource"), (ACQUIRED, "resource"), (RELEASE, "resource")])
+
+    def test_chrome_trace_spans(self):
+        """Test that waits, holds, sleeps and tasks become complete events on the right threads."""
+        with VirtualClock(jitter=0) as clock:
+            wrapped = TracingClock(clock)
+            lock = wrapped.Lock("fork-0")
+
+            def holder():
+                with lock:
+                    wrapped.sleep(2.0)
+
+            def waiter():
+                wrapped.sleep(0.5)
+                if not lock.acquire(timeout=0.5):
+                    with lock:
+                        pass
+
+            threads = [clock.Thread(target=holder, name="holder"), clock.Thread(target=waiter, name="waiter")]
+            for thread in threads:
+                thread.start()
+            executor = wrapped.Executor(max_workers=1)
+            executor.submit(wrapped.sleep, 0.25).result()
+            executor.shutdown()
+            for thread in threads:
+                thread.join()
+
+        trace = wrapped.tracer.chrome_trace()
+        json.dumps(trace)
+        tids = {event["args"]["name"]: event["tid"] for event in trace["traceEvents"] if event["ph"] == "M"}
+        spans = {(event["name"], event["tid"]): event for event in trace["traceEvents"] if event["ph"] == "X"}
+        self.assertAlmostEqual(spans["hold fork-0", tids["holder"]]["dur"], 2e6, delta=1e3)
+        self.assertAlmostEqual(spans["wait fork-0 (gave up)", tids["waiter"]]["dur"], 0.5e6, delta=1e3)
+        self.assertAlmostEqual(spans["wait fork-0", tids["waiter"]]["dur"], 1.0e6, delta=1e3)
+        self.assertIn("task", " ".join(name for name, _ in spans))
+
+    def test_export(self):
+        """Test that the trace is written as Chrome Trace Event JSON."""
+        tracer = Tracer()
+        with TracedLock(threading.Lock(), tracer, "resource"):
+            pass
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "trace.json")
+            summary = tracer.export(path)
+            with open(path, encoding="utf-8") as fh:
+                events = json.load(fh)["traceEvents"]
+        self.assertIn("3 events from 1 threads", summary)
+        self.assertEqual({event["ph"] for event in events}, {"M", "X"})
+
+
+class TestRingBufferLog(unittest.TestCase):
+    """Test cases for the buffered log sink."""
+
+    def drain(self, log):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertTrue(log.flush())
+        return output.getvalue().splitlines()
+
+    def test_records_are_formatted_in_order(self):
+        """Test that records from several threads all arrive, in per-thread order."""
+        log = RingBufferLog(capacity=1024)
+
+        def writer(worker_id):
+            for i in range(100):
+                log.debug("worker %d item %d", worker_id, i)
+
+        threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        lines = self.drain(log)
+        self.assertEqual(len(lines), 400)
+        self.assertEqual(log.dropped, 0)
+        for w in range(4):
+            own = [line for line in lines if line.startswith(f"worker {w} ")]
+            self.assertEqual(own, [f"worker {w} item {i}" for i in range(100)])
+
+    def test_level_filtering(self):
+        """Test that records below the level never reach the buffer."""
+        log = RingBufferLog(capacity=16, level=INFO)
+        log.debug("hidden %s", 1)
+        log.info("shown %s", 2)
+        log.error("shown %s", 3)
+        self.assertEqual(self.drain(log), ["shown 2", "shown 3"])
+
+    def test_overflow_is_counted(self):
+        """Test that lapped records are dropped and counted instead of blocking writers."""
+        log = RingBufferLog(capacity=4, interval=60.0)
+        for i in range(10):
+            log.info("message %d", i)
+
+        # The flush marker takes the last slot, so three messages survive
+        self.assertEqual(self.drain(log), ["message 7", "message 8", "message 9"])
+        self.assertEqual(log.dropped, 7)
+
+    def test_capacity_must_be_power_of_two(self):
+        """Test that the capacity is validated."""
+        with self.assertRaises(ValueError):
+            RingBufferLog(capacity=100)
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for the benchmark runner."""
+
+    def test_compare_flags_regressions(self):
+        """Test that only drops past the threshold are reported."""
+        baseline = {"results": {"a": {"throughput": {"mean": 10.0}}, "b": {"throughput": {"mean": 10.0}}}}
+        current = {"results": {"a": {"throughput": {"mean": 9.5}}, "b": {"throughput": {"mean": 8.0}}}}
+        regressions = compare(current, baseline, threshold=0.1)
+        self.assertEqual([r["example"] for r in regressions], ["b"])
+
+    def test_bench_example(self):
+        """Test that a short benchmark run reports throughput."""
+        result = bench_example("deadlock-fix-resource-ordering", duration=0.5, repeat=1, seed=0)
+        self.assertEqual(result["unit"], "meals")
+        self.assertGreater(result["throughput"]["mean"], 0)
+        self.assertGreater(result["samples"], 0)
+
+    def test_bench_example_pools_histogram_metrics(self):
+        """Test that runs whose metrics record into a histogram still report latency percentiles and samples."""
+        runs = []
+        for latencies in ([0.1, 0.2], [0.4]):
+            metrics = WorkMetrics("meals", histogram=True)
+            for latency in latencies:
+                metrics.record(latency, 0)
+            runs.append((metrics, 1.0))
+        with mock.patch.object(bench, "run_once", side_effect=runs):
+            result = bench_example("deadlock-fix-waiter", duration=1, repeat=2, seed=0)
+        self.assertEqual(result["samples"], 3)
+        self.assertAlmostEqual(result["latency"]["p50"], 0.2, delta=0.2 / 32)
+        self.assertAlmostEqual(result["latency"]["max"], 0.4)
+
+    def test_run_sweep(self):
+        """Test that a sweep runs once per value and passes the option through."""
+        rows = run_sweep("starvation", "num_workers", [1, 5, 20], duration=10, seed=0, clock_kind="virtual")
+        self.assertEqual([row["value"] for row in rows], [1, 5, 20])
+        self.assertTrue(all(row["count"] > 0 for row in rows))
+
+        table = format_sweep(rows, "workers")
+        self.assertIn("critical sections per second", table)
+        self.assertEqual(len(table.splitlines()), 6)
+
+    def test_benchmark_sweep(self):
+        """Test that a benchmark sweep compares several examples at each value."""
+        names = ["deadlock-fix-waiter", "deadlock-fix-waiter-polling"]
+        report = run_benchmark_sweep(names, "num_philosophers", [5, 20], duration=10, repeat=1, seed=0, clock_kind="virtual")
+        self.assertEqual(list(report["sweep"]["results"]), ["5", "20"])
+        for by_name in report["sweep"]["results"].values():
+            self.assertEqual(list(by_name), names)
+            self.assertTrue(all(result["throughput"]["mean"] > 0 for result in by_name.values()))
+
+        table = format_sweep_comparison(report["sweep"], "philosophers")
+        self.assertEqual(len(table.splitlines()), 6)
+
+    def test_results_table(self):
+        """Test that results carry work per worker and render one row per example."""
+        results = {
+            name: bench_example(name, duration=20, repeat=2, seed=0, clock_kind="virtual")
+            for name in ("deadlock-fix-semaphore", "deadlock-fix-waiter")
+        }
+        semaphore = results["deadlock-fix-semaphore"]
+        self.assertEqual(semaphore["workers"], 5)
+        self.assertEqual(sorted(semaphore["per_worker"]), ["0", "1", "2", "3", "4"])
+        self.assertEqual(sum(semaphore["per_worker"].values()), semaphore["samples"])
+
+        table = format_results(results)
+        self.assertEqual(len(table.splitlines()), 4)
+        self.assertIn("deadlock-fix-semaphore", table)
+
+    def test_event_rates(self):
+        """Test that tallied events are reported per second alongside throughput."""
+        result = bench_example("deadlock-fix-timeout", duration=20, repeat=1, seed=0, clock_kind="virtual", num_philosophers=10)
+        self.assertGreater(result["events"]["wasted acquisitions"], 0)
+        self.assertGreaterEqual(result["events"]["timeouts"], result["events"]["wasted acquisitions"])
+
+
+class TestVirtualClock(unittest.TestCase):
+    """Test cases for the virtual clock."""
+
+    def test_sleep_advances_virtual_time(self):
+        """Test that long sleeps take virtual, not wall-clock, time."""
+        with VirtualClock(jitter=0, resolution=0) as clock:
+            started = time.perf_counter()
+            clock.sleep(3600)
+            self.assertEqual(clock.time(), 3600)
+            self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_lock_handoff_and_timeout(self):
+        """Test that waiters are served in order and timeouts expire in virtual time."""
+        with VirtualClock(jitter=0, resolution=0) as clock:
+            lock = clock.Lock()
+            order = []
+
+            def worker(worker_id):
+                with lock:
+                    order.append((worker_id, clock.time()))
+                    clock.sleep(1.0)
+
+            threads = [clock.Thread(target=worker, args=(i,)) for i in range(3)]
+            for thread in threads:
+                thread.start()
+            clock.sleep(0.5)
+            self.assertFalse(lock.acquire(timeout=0.25))
+            self.assertEqual(clock.time(), 0.75)
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(order, [(0, 0.0), (1, 1.0), (2, 2.0)])
+
+    def test_tiny_timeouts_advance_time(self):
+        """Test that a timeout shorter than the resolution still moves time on."""
+        with VirtualClock(start=1.0, jitter=0) as clock:
+            semaphore = clock.Semaphore(0)
+            deadline = clock.time() + 1e-14
+            waits = 0
+            while clock.time() < deadline:
+                semaphore.acquire(timeout=deadline - clock.time())
+                waits += 1
+                self.assertLess(waits, 100)
+
+    def test_queue_timeout(self):
+        """Test that queue gets block in virtual time and raise Empty on timeout."""
+        with VirtualClock(jitter=0, resolution=0) as clock:
+            items = clock.Queue()
+            clock.Thread(target=lambda: (clock.sleep(2.0), items.put("item"))).start()
+            self.assertEqual(items.get(timeout=5.0), "item")
+            self.assertEqual(clock.time(), 2.0)
+            with self.assertRaises(queue.Empty):
+                items.get(timeout=1.0)
+            self.assertEqual(clock.time(), 3.0)
+
+    def test_executor_as_completed(self):
+        """Test that futures complete in virtual-time order."""
+        with VirtualClock(jitter=0, resolution=0) as clock:
+            executor = clock.Executor(max_workers=3)
+            futures = [executor.submit(lambda d: (clock.sleep(d), d)[1], d) for d in (3.0, 1.0, 2.0)]
+            self.assertEqual([f.result() for f in clock.as_completed(futures)], [1.0, 2.0, 3.0])
+            executor.shutdown()
+
+    def test_virtual_deadlock_is_reported(self):
+        """Test that waiting with nothing left to run raises instead of hanging."""
+        with VirtualClock() as clock:
+            event = clock.Event()
+            with self.assertRaises(VirtualDeadlockError):
+                event.wait()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,13 +5,42 @@ Tests for deadlock examples
 
 import unittest
 import time
+import threading
+from examples.common.clock import VirtualClock
+from examples.common.deadlock_detector import DeadlockDetector, DetectingClock, TrackedLock
+from examples.common.lockdep import LockdepClock
+from examples.common.topology import random_regular
+from examples.common.retry import RETRY_POLICIES, AdaptiveTimeout, DecorrelatedJitterBackoff, ExponentialBackoff, FullJitterBackoff, make_retry_policy
 from examples.deadlock import (
     DeadlockExample,
     DeadlockFixResourceOrdering,
     DeadlockFixTimeout,
     DeadlockFixAsymmetricBehavior,
+    DeadlockFixChandyMisra,
+    DeadlockFixSemaphore,
     DeadlockFixWaiter,
+    DeadlockFixWaiterPolling,
 )
+from tests import QuietLogTestCase
+
+
+class NeighbourExclusionMixin:
+    """Runs a philosophers example with clock.sleep wrapped to check that no two neighbours ever eat at once."""
+
+    def assert_neighbours_never_eat_together(self, example, clock, duration: int = 60):
+        """Run example for duration on clock, checking its eating array against its graph's edges at every sleep."""
+        edges, violations = example.graph.edges(), []
+        original_sleep = clock.sleep
+
+        def checked_sleep(seconds):
+            eating = example.eating
+            if any(eating[u] and eating[v] for u, v in edges):
+                violations.append(clock.time())
+            original_sleep(seconds)
+
+        clock.sleep = checked_sleep
+        example.run(duration=duration)
+        self.assertEqual(violations, [])
 
 
 class TestDeadlockExamples(unittest.TestCase):
@@ -47,6 +76,12 @@ class TestDeadlockExamples(unittest.TestCase):
         self.assertIsNotNone(example)
         self.assertEqual(example.num_philosophers, 5)
 
+    def test_deadlock_fix_semaphore_creation(self):
+        """Test that the seat-limiting semaphore fix can be created."""
+        example = DeadlockFixSemaphore()
+        self.assertIsNotNone(example)
+        self.assertEqual(example.num_philosophers, 5)
+
     def test_custom_philosopher_count(self):
         """Test that examples can be created with custom philosopher count."""
         example = DeadlockExample(num_philosophers=10)
@@ -60,6 +95,308 @@ class TestDeadlockExamples(unittest.TestCase):
         # Give threads time to clean up
         time.sleep(0.1)
 
+    def test_virtual_clock_long_run(self):
+        """Test that an hour of simulated time runs quickly and reproducibly."""
+        counts = []
+        for _ in range(2):
+            with VirtualClock(seed=1) as clock:
+                example = DeadlockFixWaiter(clock=clock)
+                example.run(duration=3600)
+                self.assertGreaterEqual(clock.time(), 3600)
+            counts.append(dict(example.metrics.per_worker))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(len(counts[0]), 5)
+
+
+class TestWaiterMonitor(NeighbourExclusionMixin, unittest.TestCase):
+    """Test cases for the condition-variable waiter."""
+
+    def test_neighbours_never_eat_together(self):
+        """Test that the eating array never has two adjacent philosophers set."""
+        with VirtualClock(seed=2) as clock:
+            example = DeadlockFixWaiter(num_philosophers=7, clock=clock)
+            self.assert_neighbours_never_eat_together(example, clock)
+        self.assertEqual(len(example.metrics.per_worker), 7)
+
+    def test_refused_philosophers_wake_without_polling(self):
+        """Test that refused philosophers are woken by their neighbours instead of every 100 ms."""
+        results = {}
+        for cls in (DeadlockFixWaiter, DeadlockFixWaiterPolling):
+            with VirtualClock(seed=1) as clock:
+                example = cls(num_philosophers=5, clock=clock)
+                example.run(duration=600)
+            results[cls] = example.metrics.summary(600)
+        monitor, polling = results[DeadlockFixWaiter], results[DeadlockFixWaiterPolling]
+        self.assertGreater(monitor["throughput"], polling["throughput"])
+        self.assertLess(monitor["latency"]["p50"], polling["latency"]["p50"])
+
+    def test_stop_wakes_waiting_philosophers(self):
+        """Test that run() returns promptly with many philosophers blocked on their conditions."""
+        with VirtualClock(seed=0) as clock:
+            example = DeadlockFixWaiter(num_philosophers=200, clock=clock)
+            example.run(duration=5)
+            self.assertLess(clock.time(), 5 + 1.0)
+            self.assertFalse(any(thread.is_alive() for thread in example.philosophers))
+
+
+class TestSemaphoreSeats(unittest.TestCase):
+    """Test cases for the seat-limiting semaphore fix."""
+
+    def test_survives_simultaneous_grab(self):
+        """Test that philosophers who all reach for their left fork at once still eat.
+
+        Without jitter every philosopher acts at the same instant, which
+        deadlocks the problem example for good.
+        """
+        with VirtualClock(jitter=0) as clock:
+            example = DeadlockFixSemaphore(num_philosophers=5, clock=clock)
+            seats, seated, most = example.seats, [0], [0]
+
+            class CountingSeats:
+                def acquire(self):
+                    seats.acquire()
+                    seated[0] += 1
+                    most[0] = max(most[0], seated[0])
+
+                def release(self):
+                    seated[0] -= 1
+                    seats.release()
+
+            example.seats = CountingSeats()
+            example.run(duration=60)
+        self.assertEqual(most[0], 4)
+        self.assertEqual(len(example.metrics.per_worker), 5)
+        self.assertGreater(example.metrics.count, 100)
+        self.assertGreater(example.metrics.fairness(), 0.95)
+
+
+class TestConflictGraphs(NeighbourExclusionMixin, unittest.TestCase):
+    """Test cases for the fixes running on conflict graphs other than the ring."""
+
+    def test_fixes_on_random_regular_graph(self):
+        """Test that every fix that holds on any graph feeds every philosopher with three forks each."""
+        graph = random_regular(20, 3, seed=5)
+        for cls in (DeadlockFixResourceOrdering, DeadlockFixTimeout, DeadlockFixWaiter, DeadlockFixWaiterPolling, DeadlockFixChandyMisra):
+            with self.subTest(cls.__name__), VirtualClock(seed=1) as clock:
+                example = cls(graph=graph, clock=clock)
+                example.run(duration=60)
+                self.assertEqual(example.num_philosophers, 20)
+                self.assertEqual(len(example.metrics.per_worker), 20)
+
+    def test_dense_random_regular_graphs(self):
+        """Test that dense random regular graphs, up to the complete graph, are built simple and regular for any seed."""
+        for num_vertices, degree in ((5, 4), (6, 5), (6, 4)):
+            for seed in range(6):
+                with self.subTest(num_vertices=num_vertices, degree=degree, seed=seed):
+                    graph = random_regular(num_vertices, degree, seed=seed)
+                    pairs = {tuple(sorted(edge)) for edge in graph.edges()}
+                    self.assertEqual(len(pairs), graph.num_edges)
+                    self.assertTrue(all(u != v for u, v in pairs))
+                    self.assertEqual([graph.degree(v) for v in range(num_vertices)], [degree] * num_vertices)
+        self.assertEqual(random_regular(5, 4).num_edges, 10)
+
+    def test_neighbours_never_eat_together(self):
+        """Test that the waiter and Chandy-Misra never let two philosophers sharing a fork eat at once."""
+        for cls in (DeadlockFixWaiter, DeadlockFixChandyMisra):
+            with self.subTest(cls.__name__), VirtualClock(seed=2) as clock:
+                example = cls(num_philosophers=30, graph="power-law:2", clock=clock)
+                self.assert_neighbours_never_eat_together(example, clock)
+                self.assertEqual(len(example.metrics.per_worker), 30)
+
+    def test_grid_forks_follow_the_graph(self):
+        """Test that each grid philosopher takes exactly the forks of its edges."""
+        example = DeadlockFixResourceOrdering(num_philosophers=9, graph="grid", clock=VirtualClock())
+        self.assertEqual(len(example.forks), 12)
+        for pid in range(9):
+            touching = [fork for fork, edge in enumerate(example.graph.edges()) if pid in edge]
+            self.assertEqual(sorted(example.graph.forks(pid)), touching)
+        self.assertEqual([example.graph.degree(pid) for pid in (0, 1, 4)], [2, 3, 4])
+        example.clock.close()
+
+
+class TestRetryPolicies(unittest.TestCase):
+    """Test cases for the timeout fix's retry policies."""
+
+    def test_backoff_delays(self):
+        """Test the delay each backoff policy picks after consecutive failures."""
+        exponential = ExponentialBackoff(delay=0.01, cap=0.1)
+        self.assertEqual([exponential.delay(0, attempt, 0.0) for attempt in (1, 2, 3)], [0.01, 0.02, 0.04])
+        self.assertEqual(exponential.delay(0, 1000, 0.0), 0.1)
+
+        full_jitter = FullJitterBackoff(delay=0.01, cap=0.1)
+        delays = [full_jitter.delay(0, 3, 0.0) for _ in range(200)]
+        self.assertTrue(all(0.0 <= delay <= 0.04 for delay in delays))
+        self.assertGreater(len(set(delays)), 100)
+
+        decorrelated = DecorrelatedJitterBackoff(delay=0.01, cap=0.1)
+        self.assertTrue(all(0.01 <= decorrelated.delay(0, 5, 0.02) <= 0.06 for _ in range(200)))
+        self.assertTrue(all(decorrelated.delay(0, 5, 1.0) <= 0.1 for _ in range(200)))
+
+    def test_adaptive_timeout_learns_hold_time(self):
+        """Test that the adaptive timeout settles just above a steady hold time, per resource."""
+        policy = AdaptiveTimeout(num_resources=2, timeout=0.1)
+        self.assertEqual(policy.timeout(0), 0.1)
+        for _ in range(100):
+            policy.observe(0, 0.2)
+        self.assertAlmostEqual(policy.timeout(0), 0.2, delta=0.01)
+        self.assertEqual(policy.timeout(1), 0.1)
+        for _ in range(100):
+            policy.observe(1, 0.001)
+        self.assertEqual(policy.timeout(1), policy.min_timeout)
+
+    def test_make_retry_policy(self):
+        """Test that policies are made by name and unknown names are rejected."""
+        for name in RETRY_POLICIES:
+            self.assertEqual(make_retry_policy(name, 5).name, name)
+        self.assertEqual(len(make_retry_policy("adaptive", 7).mean), 7)
+        policy = ExponentialBackoff()
+        self.assertIs(make_retry_policy(policy, 5), policy)
+        with self.assertRaises(ValueError):
+            make_retry_policy("linear", 5)
+
+    def test_adaptive_wastes_fewer_acquisitions(self):
+        """Test that learning the hold time gives back far fewer forks than the fixed 0.1 s timeout."""
+        results = {}
+        for policy in ("fixed", "adaptive"):
+            with VirtualClock(seed=1) as clock:
+                example = DeadlockFixTimeout(num_philosophers=20, retry_policy=policy, clock=clock)
+                example.run(duration=30)
+            results[policy] = example.metrics
+        fixed, adaptive = results["fixed"], results["adaptive"]
+        self.assertGreater(fixed.event_count("wasted acquisitions"), 100)
+        self.assertLess(adaptive.event_count("wasted acquisitions"), fixed.event_count("wasted acquisitions") / 10)
+        self.assertGreater(adaptive.count, 0.9 * fixed.count)
+
+
+class TestChandyMisra(NeighbourExclusionMixin, unittest.TestCase):
+    """Test cases for the message-passing Chandy-Misra philosophers."""
+
+    def test_neighbours_never_eat_together(self):
+        """Test that no two philosophers sharing a fork are ever eating at once."""
+        with VirtualClock(seed=3) as clock:
+            example = DeadlockFixChandyMisra(num_philosophers=7, clock=clock)
+            self.assert_neighbours_never_eat_together(example, clock)
+        self.assertGreater(example.metrics.fairness(), 0.95)
+
+    def test_initial_priorities_are_acyclic(self):
+        """Test that every edge starts with the fork on exactly one side and colors are proper."""
+        example = DeadlockFixChandyMisra(num_philosophers=9, clock=VirtualClock())
+        for u, v in example.edges:
+            self.assertNotEqual(example.priority[u][0], example.priority[v][0])
+        seats = [example.seat(i) for i in range(9)]
+        for pid, seat in enumerate(seats):
+            for k, (neighbour, _, _) in enumerate(example.ports[pid]):
+                other = [n for n, _, _ in example.ports[neighbour]].index(pid)
+                self.assertEqual(seat.fork[k] + seats[neighbour].fork[other], 1)
+                self.assertEqual(seat.token[k] + seats[neighbour].token[other], 1)
+        example.clock.close()
+
+    def test_keeps_up_with_waiter(self):
+        """Test that throughput without a shared lock matches the monitor waiter as the table grows."""
+        results = {}
+        for cls in (DeadlockFixChandyMisra, DeadlockFixWaiter):
+            with VirtualClock(seed=1) as clock:
+                example = cls(num_philosophers=100, clock=clock)
+                example.run(duration=30)
+            results[cls] = example.metrics.summary(30)["throughput"]
+        self.assertGreater(results[DeadlockFixChandyMisra], 0.9 * results[DeadlockFixWaiter])
+
+    def test_stop_wakes_waiting_philosophers(self):
+        """Test that run() returns promptly with philosophers blocked on their doorbells."""
+        with VirtualClock(seed=0) as clock:
+            example = DeadlockFixChandyMisra(num_philosophers=200, clock=clock)
+            example.run(duration=5)
+            self.assertLess(clock.time(), 5 + 1.0)
+            self.assertFalse(any(thread.is_alive() for thread in example.philosophers))
+
+
+class TestDeadlockDetector(QuietLogTestCase):
+    """Test cases for the wait-for graph deadlock detector."""
+
+    def start_philosophers(self, example, clock):
+        # Without jitter every philosopher picks up its left fork at once
+        for i in range(example.num_philosophers):
+            clock.Thread(target=example.philosopher, args=(i,), name=f"philosopher-{i}").start()
+
+    def test_detects_dining_philosophers_cycle(self):
+        """Test that the philosopher -> fork -> philosopher cycle is reported with stacks."""
+        with VirtualClock(jitter=0) as clock:
+            wrapped = DetectingClock(clock, threshold=0.5)
+            example = DeadlockExample(clock=wrapped)
+            self.start_philosophers(example, clock)
+            clock.sleep(3.0)
+
+        detector = wrapped.detector
+        self.assertEqual(len(detector.deadlocks), 1)
+        deadlock = detector.deadlocks[0]
+        self.assertEqual(sorted(deadlock.threads), [f"philosopher-{i}" for i in range(5)])
+        for thread, fork in deadlock.edges:
+            self.assertEqual(fork, f"fork-{(int(thread.split('-')[1]) + 1) % 5}")
+        self.assertIn("philosopher-0 -> fork-1 -> philosopher-1", deadlock.cycle())
+        self.assertIn("deadlock_problem.py", "".join(deadlock.stacks["philosopher-0"]))
+        self.assertLessEqual(deadlock.detected_at, 0.1 + 0.5 + 0.01)
+        self.assertIn("1 deadlock(s) detected", detector.report())
+
+    def test_thousands_of_locks(self):
+        """Test that a cycle through thousands of forks is found once, one search per thread."""
+        with VirtualClock(jitter=0) as clock:
+            wrapped = DetectingClock(clock, threshold=0.5)
+            example = DeadlockExample(num_philosophers=2000, clock=wrapped)
+            self.start_philosophers(example, clock)
+            clock.sleep(2.0)
+
+        detector = wrapped.detector
+        self.assertEqual(len(detector.deadlocks), 1)
+        self.assertEqual(len(detector.deadlocks[0].edges), 2000)
+        self.assertLessEqual(detector.deadlocks[0].detected_at, 0.1 + 0.5 + 0.01)
+        self.assertLessEqual(detector.searches, 2000)
+
+    def test_no_false_positive_on_fix(self):
+        """Test that contended but deadlock-free philosophers are never reported."""
+        with VirtualClock(seed=1) as clock:
+            wrapped = DetectingClock(clock, threshold=0.05)
+            example = DeadlockFixResourceOrdering(num_philosophers=20, clock=wrapped)
+            example.run(duration=60)
+        self.assertEqual(wrapped.detector.deadlocks, [])
+        self.assertGreater(wrapped.detector.searches, 0)
+
+    def test_timeouts_are_kept(self):
+        """Test that a timed acquisition longer than the threshold still times out."""
+        detector = DeadlockDetector(threshold=0.01)
+        lock = TrackedLock(threading.Lock(), detector, "resource")
+        self.assertTrue(lock.acquire())
+        self.assertEqual(lock.owner, threading.get_ident())
+        started = time.monotonic()
+        self.assertFalse(lock.acquire(timeout=0.05))
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+        # Waiting on a lock the thread holds itself is a cycle of one
+        self.assertEqual(len(detector.deadlocks), 1)
+        lock.release()
+        self.assertIsNone(lock.owner)
+
+
+class TestLockOrder(QuietLogTestCase):
+    """Test cases for lock-order validation of the philosophers."""
+
+    def test_fork_ring_flagged_before_deadlock(self):
+        """Test that left-then-right forks are flagged even on a run that never deadlocks."""
+        with VirtualClock(seed=1) as clock:
+            wrapped = LockdepClock(clock)
+            example = DeadlockExample(clock=wrapped)
+            example.run(duration=20)
+        self.assertGreater(example.metrics.count, 0)
+        violations = wrapped.validator.violations
+        self.assertEqual(len(violations), 1)
+        self.assertEqual(sorted(violations[0].locks()), [f"fork-{i}" for i in range(5)])
+
+    def test_resource_ordering_is_clean(self):
+        """Test that lower-numbered-fork-first never inverts the learned order."""
+        with VirtualClock(seed=1) as clock:
+            wrapped = LockdepClock(clock)
+            DeadlockFixResourceOrdering(num_philosophers=20, clock=wrapped).run(duration=20)
+        self.assertEqual(wrapped.validator.violations, [])
+        self.assertEqual(wrapped.validator.num_edges, 20)
+
 
 if __name__ == "__main__":
     unittest.main()
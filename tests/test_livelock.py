@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for livelock examples scaled to N workers and locks
+"""
+
+import unittest
+from examples.common.clock import VirtualClock
+from examples.common.lock_sets import conflicts, lock_sets
+from examples.common.livelock_watchdog import PROGRESS, CountingLock, ProgressWatchdog, WatchdogClock, measure_overhead
+from examples.common.priorities import split_priorities
+from examples.livelock import LivelockExample, LivelockFixArbiter, LivelockFixPriority, LivelockFixRandomBackoff
+from examples.livelock.livelock_scaling import format_lock_set_scaling, scale_lock_sets
+from examples.starvation import StarvationExample
+from tests import QuietLogTestCase
+
+
+class TestScaledWorkers(unittest.TestCase):
+    """Test cases for the worker-count knobs."""
+
+    def test_default_worker_counts(self):
+        """Test that the defaults match the original two-worker and 3+2 setups."""
+        self.assertEqual(LivelockExample().num_workers, 2)
+        self.assertEqual(LivelockFixPriority().num_workers, 2)
+        self.assertEqual(LivelockFixRandomBackoff().num_workers, 2)
+        example = StarvationExample()
+        self.assertEqual((example.num_high_priority, example.num_low_priority), (3, 2))
+
+    def test_starvation_split(self):
+        """Test that the high/low split scales and can be overridden."""
+        example = StarvationExample(num_workers=100)
+        self.assertEqual((example.num_high_priority, example.num_low_priority), (60, 40))
+        example = StarvationExample(num_workers=4, num_low_priority=10)
+        self.assertEqual((example.num_high_priority, example.num_low_priority), (0, 4))
+        self.assertEqual(split_priorities(5), (3, 2))
+        self.assertEqual(split_priorities(5, -1), (5, 0))
+
+    def test_many_workers_run(self):
+        """Test that a large pool of workers is started and makes progress."""
+        with VirtualClock(seed=0) as clock:
+            example = LivelockFixPriority(num_workers=16, clock=clock)
+            example.run(duration=60)
+        self.assertEqual(len(example.workers), 16)
+        self.assertGreater(example.metrics.count, 0)
+        self.assertTrue(set(example.metrics.per_worker) <= set(range(1, 17)))
+
+
+class TestLockSets(QuietLogTestCase):
+    """Test cases for N workers sharing M locks."""
+
+    def test_lock_sets(self):
+        """Test that the default is the classic two-lock setup and larger sets are reproducible."""
+        self.assertEqual(lock_sets(3, 2), [(0, 1)] * 3)
+        sets = lock_sets(50, 10, 3, seed=7)
+        self.assertEqual(sets, lock_sets(50, 10, 3, seed=7))
+        self.assertTrue(all(len(needed) == 3 and list(needed) == sorted(set(needed)) for needed in sets))
+        self.assertEqual(lock_sets(4, 3, 10), [(0, 1, 2)] * 4)
+        self.assertEqual(conflicts([(0, 1), (1, 2), (3, 4)]), [1, 1, 0])
+        with self.assertRaises(ValueError):
+            lock_sets(2, 0)
+
+    def test_many_locks_make_progress(self):
+        """Test that both fixes complete work with every worker needing a random subset of the locks."""
+        for cls in (LivelockFixRandomBackoff, LivelockFixPriority, LivelockFixArbiter):
+            with self.subTest(cls.__name__):
+                with VirtualClock(seed=0) as clock:
+                    example = cls(num_workers=16, num_locks=8, locks_per_worker=3, clock=clock)
+                    example.run(duration=60)
+                self.assertEqual(len(example.locks), 8)
+                self.assertEqual(len(example.metrics.per_worker), 16)
+
+    def test_priority_token_rotates(self):
+        """Test that with every worker needing every lock, the token shares work evenly and wastes nothing."""
+        with VirtualClock(seed=0) as clock:
+            example = LivelockFixPriority(num_workers=8, clock=clock)
+            example.run(duration=60)
+        counts = example.metrics.per_worker
+        self.assertEqual(len(counts), 8)
+        self.assertLessEqual(max(counts.values()) - min(counts.values()), 2)
+        self.assertEqual(example.metrics.event_count("wasted acquisitions"), 0)
+
+    def test_problem_counts_wasted_acquisitions(self):
+        """Test that the polite workers' given-back locks are counted."""
+        with VirtualClock(jitter=0) as clock:
+            example = LivelockExample(num_workers=4, num_locks=3, clock=clock)
+            example.run(duration=5)
+        self.assertEqual(example.lock_sets, lock_sets(4, 3))
+        self.assertGreater(example.metrics.event_count("wasted acquisitions"), 0)
+
+    def test_scaling_benchmark(self):
+        """Test that the scaling benchmark has a row per example, worker and lock count."""
+        rows = scale_lock_sets(workers=(2, 4), locks=(2, 4), duration=10)
+        self.assertEqual(len(rows), 12)
+        self.assertTrue(all(row["throughput"] > 0 for row in rows))
+        self.assertIn("wasted/s", format_lock_set_scaling(rows))
+
+
+class TestArbiter(QuietLogTestCase):
+    """Test cases for the arbiter that grants whole lock sets."""
+
+    def test_grants_are_fifo_among_conflicts(self):
+        """Test that a waiting request keeps its locks from later ones, while disjoint requests go past it."""
+        example = LivelockFixArbiter(num_workers=4, num_locks=4)
+        example.lock_sets = [(0, 1), (1, 2), (2, 3), (3,)]
+        with example.monitor:
+            example.busy[0] = 1  # worker 1 cannot be granted yet
+            example.waiting.extend([1, 2, 4])
+            example.grant_sets()
+            # Worker 2 needs lock 1, which worker 1 is waiting for; worker 4 conflicts with nobody waiting
+            self.assertEqual(list(example.waiting), [1, 2])
+            self.assertEqual(list(example.granted), [0, 0, 0, 0, 1])
+            example.busy[0] = 0
+            example.grant_sets()
+            self.assertEqual(list(example.waiting), [2])
+            self.assertEqual(list(example.busy), [1, 1, 0, 1])
+
+    def test_no_partial_sets_and_bounded_waits(self):
+        """Test that with every worker needing both locks, turns go round in order and nothing is wasted."""
+        with VirtualClock(seed=0) as clock:
+            wrapped = WatchdogClock(clock, window=2.0)
+            example = LivelockFixArbiter(num_workers=8, clock=wrapped)
+            example.run(duration=60)
+        counts = example.metrics.per_worker
+        self.assertEqual(len(counts), 8)
+        self.assertLessEqual(max(counts.values()) - min(counts.values()), 1)
+        # Each worker waits for the other seven sections, and never takes a lock it must give back
+        self.assertLess(max(example.metrics.latencies), 8 * 0.2 + 0.05)
+        for name, (attempts, acquired, _) in wrapped.watchdog.totals().items():
+            if name.startswith("worker-"):
+                self.assertEqual(attempts, acquired)
+
+
+class TestLivelockWatchdog(QuietLogTestCase):
+    """Test cases for the livelock progress watchdog."""
+
+    def watched_run(self, example_class, clock, **kwargs) -> ProgressWatchdog:
+        wrapped = WatchdogClock(clock, window=2.0)
+        example = example_class(clock=wrapped, **kwargs)
+        wrapped.watchdog.watch(example.metrics)
+        example.run(duration=10)
+        wrapped.watchdog.stop()
+        return wrapped.watchdog
+
+    def test_detects_lockstep_livelock(self):
+        """Test that workers retrying in lockstep are reported once, with both workers."""
+        with VirtualClock(jitter=0) as clock:
+            watchdog = self.watched_run(LivelockExample, clock)
+        self.assertEqual(len(watchdog.livelocks), 1)
+        livelock = watchdog.livelocks[0]
+        self.assertEqual(livelock.workers, ["worker-1", "worker-2"])
+        self.assertAlmostEqual(livelock.detected_at, 2.5)
+        self.assertTrue(all(attempts >= 4 for attempts, _ in livelock.churn.values()))
+        self.assertEqual(set(watchdog.ratios().values()), {0.0})
+        self.assertIn("worker-1 (", watchdog.report())
+
+    def test_fix_is_not_flagged(self):
+        """Test that workers that back off and complete work are not reported."""
+        with VirtualClock(seed=1) as clock:
+            watchdog = self.watched_run(LivelockFixRandomBackoff, clock, num_workers=4)
+        self.assertEqual(watchdog.livelocks, [])
+        self.assertGreater(watchdog.samples, 10)
+        self.assertIn("no livelock detected", watchdog.report())
+
+    def test_starvation_is_not_livelock(self):
+        """Test that a thread spinning while another completes work is not reported."""
+        with VirtualClock() as clock:
+            watchdog = ProgressWatchdog(clock, window=1.0, slices=2)
+            lock = CountingLock(clock.Lock("lock"), watchdog, "lock")
+            done = []
+
+            def spinner():
+                while not done:
+                    if lock.acquire(timeout=0.01):
+                        lock.release()
+                    clock.sleep(0.05)
+
+            def worker():
+                for _ in range(20):
+                    watchdog.counters()[PROGRESS] += 1
+                    clock.sleep(0.1)
+                done.append(True)
+
+            threads = [clock.Thread(target=spinner, name="spinner"), clock.Thread(target=worker, name="worker")]
+            watchdog.start()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            watchdog.stop()
+        self.assertEqual(watchdog.livelocks, [])
+        self.assertEqual(watchdog.ratios().get("spinner"), 0.0)
+
+    def test_overhead_is_measured(self):
+        """Test that the overhead measurement returns a cost for both locks."""
+        overhead = measure_overhead(iterations=1000)
+        self.assertGreater(overhead["plain"], 0)
+        self.assertGreater(overhead["counting"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the example registry and command line interface
+"""
+
+import contextlib
+import io
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+import pyconc
+from examples import registry
+
+
+class TestExampleRegistry(unittest.TestCase):
+    """Test cases for the lazy example registry."""
+
+    def test_builtin_targets_resolve(self):
+        """Test that every built-in target names a class with a run method."""
+        for name in registry.EXAMPLES:
+            example_class = registry.load_example(name)
+            self.assertTrue(callable(getattr(example_class, "run", None)), name)
+
+    def test_unknown_example(self):
+        """Test that unknown names raise KeyError."""
+        with mock.patch.object(registry, "plugin_examples", return_value={}):
+            with self.assertRaises(KeyError):
+                registry.resolve("no-such-example")
+
+    def test_plugin_examples(self):
+        """Test that entry point examples are resolved but cannot shadow built-ins."""
+        plugins = {
+            "custom": "examples.deadlock.deadlock_problem:DeadlockExample",
+            "deadlock": "examples.livelock.livelock_problem:LivelockExample",
+        }
+        with mock.patch.object(registry, "plugin_examples", return_value=plugins):
+            self.assertEqual(registry.resolve("custom"), plugins["custom"])
+            self.assertEqual(registry.resolve("deadlock"), registry.EXAMPLES["deadlock"])
+            self.assertIn("custom", registry.available_examples())
+
+    def test_invalid_target(self):
+        """Test that malformed targets are rejected."""
+        with self.assertRaises(ValueError):
+            registry.load_target("examples.deadlock")
+
+    def test_help_and_list_do_not_import_examples(self):
+        """Test that -h and --list leave every example module unimported."""
+        for flag in ("-h", "--list"):
+            code = (
+                "import sys, pyconc\n"
+                "try:\n"
+                f"    pyconc.main([{flag!r}])\n"
+                "except SystemExit:\n"
+                "    pass\n"
+                "loaded = [m for m in sys.modules if m.startswith('examples.') and m != 'examples.registry']\n"
+                "sys.stderr.write(repr(loaded))\n"
+            )
+            result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+            self.assertEqual(result.stderr, "[]", flag)
+
+    def test_scale_flags_validate_counts(self):
+        """Test that count flags reject out-of-range values instead of clamping them."""
+        parser = pyconc.build_parser()
+        self.assertEqual(parser.parse_args(["-e", "starvation", "--low-priority", "0"]).low_priority, 0)
+        for argv in (["--low-priority", "-3"], ["--workers", "0"]):
+            with self.subTest(argv=argv), contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                parser.parse_args(["-e", "starvation", *argv])
+
+    def test_package_exports_are_lazy(self):
+        """Test that an exported class imports only its own module, once, and unknown names still raise."""
+        code = (
+            "import sys, examples\n"
+            "from examples.starvation import StarvationFixAging\n"
+            "import examples.starvation as package\n"
+            "loaded = sorted(m for m in sys.modules if m.startswith('examples.') and m != 'examples.registry')\n"
+            "assert package.__dict__['StarvationFixAging'] is StarvationFixAging is examples.StarvationFixAging\n"
+            "try:\n"
+            "    package.NoSuchExample\n"
+            "except AttributeError:\n"
+            "    sys.stderr.write(repr(loaded))\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertIn("'examples.starvation.starvation_fix_aging'", result.stderr)
+        self.assertNotIn("'examples.starvation.starvation_problem'", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
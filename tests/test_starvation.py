@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tests for starvation examples
+"""
+
+import contextlib
+import io
+import unittest
+from examples.common.clock import VirtualClock
+from examples.common.histogram import Histogram
+from examples.common.rw_lock import READER_PREFERENCE, RW_POLICIES
+from examples.starvation import (
+    StarvationFixAging,
+    StarvationFixAgingSweep,
+    StarvationFixFairScheduling,
+    StarvationFixFairSchedulingRace,
+    StarvationFixPhaseFair,
+    StarvationFixWeightedFair,
+    StarvationFixWriterPreference,
+    StarvationReadersWriters,
+)
+from examples.starvation.starvation_fix_aging import soak
+from examples.starvation.starvation_rw_scaling import format_reader_scaling, scale_readers
+from tests import QuietLogTestCase
+
+
+class TestFairScheduling(QuietLogTestCase):
+    """Test cases for the FIFO fair scheduling fix."""
+
+    def test_turns_and_waits_are_bounded(self):
+        """Test that workers take turns, so each waits at most for the others' work, unlike the racing version."""
+        with VirtualClock(seed=0) as clock:
+            example = StarvationFixFairScheduling(num_workers=5, clock=clock)
+            example.run(duration=60)
+        with VirtualClock(seed=0) as clock:
+            race = StarvationFixFairSchedulingRace(num_workers=5, clock=clock)
+            race.run(duration=60)
+
+        waits = [access.wait for access in example.access.workers.values()]
+        counts = [histogram.count for histogram in waits]
+        self.assertLessEqual(max(counts) - min(counts), 1)
+        # The other four workers' work times are at most 0.15 + 0.2 + 0.25 + 0.3 s
+        worst = max(histogram.max for histogram in waits) / 1e9
+        self.assertLess(worst, 0.95)
+        self.assertGreater(max(access.wait.max for access in race.access.workers.values()) / 1e9, worst)
+        # Served in turn: nobody is passed over by more than the four others
+        self.assertLessEqual(example.access.longest_streak().longest_streak, 4)
+        self.assertGreater(race.access.longest_streak().longest_streak, 4)
+        self.assertGreater(example.resource.handoffs, 0)
+        self.assertIn("worker-4", example.access.report())
+
+
+class TestAging(QuietLogTestCase):
+    """Test cases for the indexed-heap aging fix."""
+
+    def test_aged_waiter_outranks_newcomer(self):
+        """Test that a low-priority waiter is served before a high-priority one that arrived more than 2/aging_rate later."""
+        with VirtualClock(jitter=0) as clock:
+            example = StarvationFixAging(num_workers=4, num_low_priority=1, clock=clock)
+            order = []
+
+            def waiter(worker_id: int, delay: float):
+                clock.sleep(delay)
+                if example.request(worker_id):
+                    order.append(worker_id)
+                    example.release(worker_id)
+
+            self.assertTrue(example.request(0))
+            # Low-priority worker 3 asks at 1.0 and worker 1 at 2.0: 3 is still behind; worker 2 asks at 3.5 and is behind 3
+            threads = [clock.Thread(target=waiter, args=args) for args in ((3, 1.0), (1, 2.0), (2, 3.5))]
+            for thread in threads:
+                thread.start()
+            clock.sleep(4.0)
+            self.assertAlmostEqual(example.effective_priority(3), 3.0)
+            self.assertAlmostEqual(example.effective_priority(2), 2.5)
+            example.release(0)
+            for thread in threads:
+                thread.join()
+        self.assertEqual(order, [1, 3, 2])
+        self.assertEqual(example.handoffs, 3)
+        self.assertIsNone(example.holder)
+
+    def test_set_priority_moves_a_waiter(self):
+        """Test that raising a queued worker's base priority moves it to the head of the queue."""
+        with VirtualClock(jitter=0) as clock:
+            example = StarvationFixAging(num_workers=3, num_low_priority=2, clock=clock)
+            order = []
+
+            def waiter(worker_id: int, delay: float):
+                clock.sleep(delay)
+                if example.request(worker_id):
+                    order.append(worker_id)
+                    example.release(worker_id)
+
+            example.request(0)
+            threads = [clock.Thread(target=waiter, args=args) for args in ((1, 0.5), (2, 1.0))]
+            for thread in threads:
+                thread.start()
+            clock.sleep(1.5)
+            example.set_priority(2, 10.0)
+            self.assertEqual(len(example.queue), 2)
+            example.release(0)
+            for thread in threads:
+                thread.join()
+        self.assertEqual(order, [2, 1])
+
+    def test_every_worker_served_and_queue_bounded(self):
+        """Test that low-priority workers are served, with waits bounded, while the sweeping version's queue keeps growing."""
+        with VirtualClock(seed=0) as clock:
+            example = StarvationFixAging(num_workers=5, clock=clock)
+            example.run(duration=120)
+        with VirtualClock(seed=0) as clock:
+            sweep = StarvationFixAgingSweep(num_workers=5, clock=clock)
+            sweep.run(duration=120)
+
+        self.assertEqual(len(example.metrics.per_worker), 5)
+        self.assertLessEqual(example.max_waiting, 4)
+        self.assertGreater(example.handoffs, 0)
+        self.assertLess(max(example.metrics.latencies), 3.0)
+        self.assertGreater(len(sweep.priority_queue), 5 * 50)
+
+    def test_soak_memory_is_flat(self):
+        """Test that after start-up memory stays within a fixed budget however many sections complete."""
+        rows = soak(num_workers=500, duration=800, samples=4)
+        self.assertEqual([row["time"] for row in rows], [200, 400, 600, 800])
+        # At most one queue entry per worker, and the scheduler's arrays are sized once
+        self.assertTrue(all(row["waiting"] < 500 for row in rows))
+        self.assertGreater(rows[-1]["sections"] - rows[1]["sections"], 1000)
+        # A few KB of interpreter noise, not bytes per section: one float each would be over 30 KB here
+        self.assertLess(max(row["memory"] for row in rows[1:]) - rows[1]["memory"], 8 * 1024)
+
+
+class TestWeightedFair(QuietLogTestCase):
+    """Test cases for the deficit round-robin weighted fair fix."""
+
+    def test_shares_follow_weights(self):
+        """Test that each class gets its weighted share of the held time overall and in every full window."""
+        for weights in (None, {"high": 9, "low": 1}, {"high": 1, "low": 1}):
+            with VirtualClock(seed=0) as clock:
+                example = StarvationFixWeightedFair(weights=weights, report_interval=5.0, clock=clock)
+                example.run(duration=60)
+            total = sum(example.held.values())
+            for name, target in example.targets.items():
+                self.assertAlmostEqual(example.held[name] / total, target, delta=0.02)
+                for _, shares in example.shares[1:-1]:
+                    self.assertAlmostEqual(shares[name], target, delta=0.03)
+            self.assertEqual(len(example.shares), 12)
+            self.assertEqual(len(example.metrics.per_worker), 5)
+            self.assertIn("overall", example.share_report())
+
+    def test_weights_must_be_positive(self):
+        """Test that a zero weight, which would starve its class, is rejected, as is an unknown class."""
+        with self.assertRaises(ValueError):
+            StarvationFixWeightedFair(weights={"low": 0})
+        with self.assertRaises(ValueError):
+            StarvationFixWeightedFair(weights={"medium": 1})
+
+
+class TestReadersWriters(QuietLogTestCase):
+    """Test cases for the readers and writers starvation example and its fixes."""
+
+    def run_example(self, example_class, **options):
+        with VirtualClock(seed=0) as clock:
+            example = example_class(clock=clock, **options)
+            example.run(duration=30)
+        return example
+
+    def test_completion_line_uses_short_name(self):
+        """Test that each example ends with "<short name> example completed." rather than its banner."""
+        for example_class in (StarvationReadersWriters, StarvationFixWriterPreference, StarvationFixPhaseFair):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output), VirtualClock(seed=0) as clock:
+                example_class(num_readers=2, num_writers=1, clock=clock).run(duration=1)
+            self.assertEqual(output.getvalue().strip().splitlines()[-1], f"{example_class.name} example completed.")
+
+    def test_reader_preference_starves_writers(self):
+        """Test that overlapping readers keep the writers out for most of the run."""
+        example = self.run_example(StarvationReadersWriters, num_readers=16)
+        self.assertLessEqual(example.completed(example.writer_access), 4)
+        longest = max(access.wait.max for access in example.writer_access.workers.values()) / 1e9
+        self.assertGreater(longest, 20)
+
+    def test_fixes_bound_writer_waits(self):
+        """Test that writer preference and phase-fair keep writers writing, and readers reading, with short waits."""
+        for example_class in (StarvationFixWriterPreference, StarvationFixPhaseFair):
+            example = self.run_example(example_class, num_readers=16)
+            self.assertGreater(example.completed(example.writer_access), 100)
+            self.assertGreater(example.completed(example.reader_access), 1000)
+            writers = Histogram.merged(access.wait for access in example.writer_access.workers.values())
+            readers = Histogram.merged(access.wait for access in example.reader_access.workers.values())
+            self.assertLess(writers.percentile(99), 0.5)
+            self.assertLess(readers.max / 1e9, 0.5)
+            self.assertEqual(len(example.reader_access.workers), 16)
+
+    def test_reader_scaling(self):
+        """Test that the scaling table has a row per policy and reader count, and reader preference starves writers."""
+        rows = scale_readers(readers=(4, 32), duration=10)
+        self.assertEqual([(row["readers"], row["policy"]) for row in rows], [(n, policy) for n in (4, 32) for policy in RW_POLICIES])
+        for row in rows:
+            self.assertGreater(row["reads"], 0)
+            if row["readers"] == 32 and row["policy"] != READER_PREFERENCE:
+                self.assertGreater(row["writes"], 5)
+        self.assertIn("writer p99", format_reader_scaling(rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ Tests for threadpool examples
 
 import unittest
 import time
+from examples.common.clock import VirtualClock
 from examples.threadpool import (
     ThreadPoolExample,
     ThreadPoolPollingPeriodic,
@@ -73,6 +74,13 @@ class TestThreadPoolExamples(unittest.TestCase):
         self.assertEqual(example.batch_size, 5)
         self.assertEqual(example.max_wait_time, 2.0)
 
+    def test_virtual_clock_adaptive_run(self):
+        """Test that adaptive polling can be simulated for a long virtual duration."""
+        with VirtualClock() as clock:
+            example = ThreadPoolPollingAdaptive(clock=clock)
+            example.run(duration=600)
+        self.assertGreater(example.metrics.count, 100)
+
 
 if __name__ == "__main__":
     unittest.main()